@@ -0,0 +1,411 @@
+import random
+
+import numpy as np
+
+from get_eligible_employees import SIM_SLOTS
+
+try:
+    from scipy.optimize import Bounds, LinearConstraint, linear_sum_assignment, milp
+    from scipy.sparse import coo_matrix
+except ImportError:
+    # scipy is optional; daily_assignment falls back to the greedy rota without
+    # it, and match_day uses _hungarian below
+    milp = None
+    linear_sum_assignment = None
+
+# Fallback pool a SIM slot may draw from when its own shift group can't fill it
+SLOT_FALLBACKS = {"morning": "morning_fallback", "night": "night_fallback"}
+FAIRNESS_TASKS = ("hypercare", "sim", "dor", "eod")
+
+# Solver wall-clock limit in seconds
+TIME_LIMIT = 10.0
+
+# Objective weights, largest first: fill seats, then keep the week's rules,
+# then fairness against total_counts / the current cycle. Hypercare on
+# back-to-back days is a hard constraint in optimise_week; W_CONSECUTIVE only
+# scores rotas that break it (rota_search.score_assignments)
+W_UNFILLED = 1000.0     # each required seat left empty
+W_CONSECUTIVE = 100.0   # hypercare on back-to-back days
+W_FALLBACK = 5.0        # SIM taken from a fallback pool
+W_CYCLE = 20.0          # someone who already did the task this cycle
+W_MAX_COUNT = 10.0      # highest total_counts per task after the week
+W_COUNT = 1.0           # per assignment, scaled by how far above the team minimum
+W_TIE = 0.01            # random tie-break so equal candidates rotate
+
+
+def milp_available():
+    """True if scipy.optimize.milp can be imported."""
+    return milp is not None
+
+
+class _Model:
+    """Sparse MILP builder: binary/continuous columns and row constraints."""
+
+    def __init__(self):
+        self.cost = []
+        self.integrality = []
+        self.upper = []
+        self.rows, self.cols, self.vals = [], [], []
+        self.row_lb, self.row_ub = [], []
+
+    def var(self, cost, binary=True):
+        self.cost.append(cost)
+        self.integrality.append(1 if binary else 0)
+        self.upper.append(1.0 if binary else np.inf)
+        return len(self.cost) - 1
+
+    def row(self, terms, lb=-np.inf, ub=np.inf):
+        r = len(self.row_lb)
+        for col, val in terms:
+            self.rows.append(r)
+            self.cols.append(col)
+            self.vals.append(val)
+        self.row_lb.append(lb)
+        self.row_ub.append(ub)
+
+    def solve(self, time_limit):
+        n = len(self.cost)
+        constraints = []
+        if self.row_lb:
+            A = coo_matrix((self.vals, (self.rows, self.cols)), shape=(len(self.row_lb), n)).tocsr()
+            constraints.append(LinearConstraint(A, self.row_lb, self.row_ub))
+        res = milp(
+            c=np.array(self.cost),
+            constraints=constraints,
+            integrality=np.array(self.integrality),
+            bounds=Bounds(np.zeros(n), np.array(self.upper)),
+            options={"time_limit": time_limit},
+        )
+        return res.x
+
+
+def optimise_week(days, history, time_limit=None):
+    """
+    Assign hypercare, SIM slots, DOR and EOD for a whole week as one MILP.
+
+    Hard rules: at most one of these tasks per person per day, one person per
+    SIM slot / DOR / EOD, nobody on hypercare two days running, and a morning
+    SIM from the fallback pool means the mid SIM must not also come from it.
+    Soft (weighted, see W_*): fill every seat, prefer a slot's own shift
+    group, prefer people who haven't done the task this cycle, and keep
+    total_counts even.
+
+    Args:
+        days (list): One dict per day, in order:
+            {"date", "day", "groups" (filtered shift lists from get_filtered_shifts),
+             "hypercare_pool" (working hypercare members), "hypercare_required",
+             "dor" (False on days without a DOR call)}
+        history (dict): {login: {"total_counts": {...}, "task_flags": {...}}}
+        time_limit (float): Seconds (default TIME_LIMIT)
+
+    Returns:
+        list or None: Per day {"hypercare": [...], "sim": {slot: login or "NA"},
+                      "dor": login/None, "eod": login/None}; None if scipy is
+                      missing or the solver found no solution in time.
+    """
+    if milp is None:
+        return None
+
+    model = _Model()
+    # (day, login) -> columns of every special task, for the one-task-per-day rule
+    by_person_day = {}
+    # task -> login -> columns, for fairness
+    by_task_login = {task: {} for task in FAIRNESS_TASKS}
+    # (var, day, task, slot, login) for reading the solution back
+    choices = []
+
+    def counts(login, task):
+        return history.get(login, {}).get("total_counts", {}).get(task, 0)
+
+    def done(login, task):
+        return bool(history.get(login, {}).get("task_flags", {}).get(task))
+
+    def pool_floor(task, pool):
+        return min((counts(p, task) for p in pool), default=0)
+
+    def choose(k, task, slot, login, extra_cost, floor):
+        cost = extra_cost + W_COUNT * (counts(login, task) - floor) / 10.0
+        cost += W_TIE * random.random()
+        v = model.var(cost)
+        by_person_day.setdefault((k, login), []).append(v)
+        by_task_login[task].setdefault(login, []).append(v)
+        choices.append((v, k, task, slot, login))
+        return v
+
+    def seat(columns, seats):
+        # sum(columns) + unfilled == seats
+        if seats <= 0:
+            return
+        short = model.var(W_UNFILLED, binary=False)
+        model.row([(c, 1.0) for c in columns] + [(short, 1.0)], lb=seats, ub=seats)
+
+    hypercare_vars = []
+    for k, info in enumerate(days):
+        groups = info["groups"]
+
+        # Hypercare
+        pool = list(dict.fromkeys(info.get("hypercare_pool", [])))
+        floor = pool_floor("hypercare", pool)
+        day_vars = {login: choose(k, "hypercare", None, login, 0.0, floor) for login in pool}
+        hypercare_vars.append(day_vars)
+        seat(list(day_vars.values()), info.get("hypercare_required", 0))
+
+        # SIM, one per slot
+        morning_fallback = set(groups.get("morning_fallback", []))
+        fallback_morning_cols, mid_from_fallback_cols = [], []
+        for slot in SIM_SLOTS:
+            primary = list(dict.fromkeys(groups.get(slot, [])))
+            fallback = [p for p in dict.fromkeys(groups.get(SLOT_FALLBACKS.get(slot), [])) if p not in primary]
+            floor = pool_floor("sim", primary + fallback)
+            cols = []
+            for login in primary:
+                v = choose(k, "sim", slot, login, 0.0, floor)
+                cols.append(v)
+                if slot == "mid" and login in morning_fallback:
+                    mid_from_fallback_cols.append(v)
+            for login in fallback:
+                v = choose(k, "sim", slot, login, W_FALLBACK, floor)
+                cols.append(v)
+                if slot == "morning":
+                    fallback_morning_cols.append(v)
+            seat(cols, 1 if cols else 0)
+        if fallback_morning_cols and mid_from_fallback_cols:
+            model.row([(c, 1.0) for c in fallback_morning_cols + mid_from_fallback_cols], ub=1)
+
+        # DOR from morning/mid/night, only on DOR days
+        if info.get("dor", True):
+            pool = list(dict.fromkeys(groups.get("morning", []) + groups.get("mid", []) + groups.get("night", [])))
+            floor = pool_floor("dor", pool)
+            seat([choose(k, "dor", None, login, 0.0, floor) for login in pool], 1 if pool else 0)
+
+        # EOD from the later mid shifts and night
+        pool = list(dict.fromkeys(
+            [p for p in groups.get("mid", []) if p not in morning_fallback] + groups.get("night", [])
+        ))
+        floor = pool_floor("eod", pool)
+        seat([choose(k, "eod", None, login, 0.0, floor) for login in pool], 1 if pool else 0)
+
+    # One special task per person per day
+    for cols in by_person_day.values():
+        if len(cols) > 1:
+            model.row([(c, 1.0) for c in cols], ub=1)
+
+    # Cycle: every assignment beyond a person's first this cycle (counting the
+    # ones already made before the week) costs W_CYCLE
+    for task, per_login in by_task_login.items():
+        for login, cols in per_login.items():
+            free = 0 if done(login, task) else 1
+            if len(cols) > free:
+                repeats = model.var(W_CYCLE, binary=False)
+                model.row([(c, 1.0) for c in cols] + [(repeats, -1.0)], ub=free)
+
+    # No hypercare on consecutive days (hard: a seat is left empty instead)
+    for k in range(len(days) - 1):
+        for login, v in hypercare_vars[k].items():
+            w = hypercare_vars[k + 1].get(login)
+            if w is not None:
+                model.row([(v, 1.0), (w, 1.0)], ub=1)
+
+    # Fairness: minimise each task's highest total after the week
+    for task, per_login in by_task_login.items():
+        if not per_login:
+            continue
+        top = model.var(W_MAX_COUNT, binary=False)
+        for login, cols in per_login.items():
+            # counts + sum(cols) <= top
+            model.row([(c, 1.0) for c in cols] + [(top, -1.0)], ub=-counts(login, task))
+
+    if not choices:
+        x = np.zeros(0)
+    else:
+        x = model.solve(TIME_LIMIT if time_limit is None else time_limit)
+        if x is None:
+            return None
+
+    plan = []
+    for info in days:
+        plan.append({
+            "hypercare": [],
+            "sim": {slot: "NA" for slot in SIM_SLOTS},
+            "dor": None if info.get("dor", True) else "No DOR",
+            "eod": None,
+        })
+    for v, k, task, slot, login in choices:
+        if x[v] < 0.5:
+            continue
+        if task == "hypercare":
+            plan[k]["hypercare"].append(login)
+        elif task == "sim":
+            plan[k]["sim"][slot] = login
+        else:
+            plan[k][task] = login
+    return plan
+
+
+# Seats filled by match_day, in order
+DAY_SEATS = [("sim", slot) for slot in SIM_SLOTS] + [("dor", None), ("eod", None)]
+# Cost of a person who can't take a seat; far above leaving the seat empty
+_FORBIDDEN = 1e9
+
+
+def _hungarian(cost):
+    """
+    Min-cost assignment of every row to a distinct column (rows <= columns).
+
+    Shortest augmenting path Hungarian method, O(rows^2 * columns), used when
+    scipy's linear_sum_assignment is not available.
+
+    Returns:
+        np.ndarray: Column index for each row
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)   # row (1-based) holding each column
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            free = ~used
+            free[0] = False
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    columns = np.empty(n, dtype=np.int64)
+    for j in range(1, m + 1):
+        if owner[j]:
+            columns[owner[j] - 1] = j - 1
+    return columns
+
+
+def _assign(cost):
+    if linear_sum_assignment is not None:
+        rows, columns = linear_sum_assignment(cost)
+        return columns[np.argsort(rows)]
+    return _hungarian(cost)
+
+
+def _seat_pools(groups, dor, mid_excludes_fallback):
+    """{seat: (primary logins, fallback logins)} for one day."""
+    morning_fallback = set(groups.get("morning_fallback", []))
+    pools = {}
+    for slot in SIM_SLOTS:
+        primary = list(dict.fromkeys(groups.get(slot, [])))
+        if slot == "mid" and mid_excludes_fallback:
+            primary = [p for p in primary if p not in morning_fallback]
+        fallback = [p for p in dict.fromkeys(groups.get(SLOT_FALLBACKS.get(slot), [])) if p not in primary]
+        pools[("sim", slot)] = (primary, fallback)
+    pools[("dor", None)] = (
+        list(dict.fromkeys(groups.get("morning", []) + groups.get("mid", []) + groups.get("night", []))) if dor else [],
+        [],
+    )
+    pools[("eod", None)] = (
+        list(dict.fromkeys([p for p in groups.get("mid", []) if p not in morning_fallback] + groups.get("night", []))),
+        [],
+    )
+    return pools
+
+
+def task_pools(info):
+    """
+    (task, logins) for every non-empty pool optimise_week draws a seat from on
+    one day: hypercare, each SIM slot (own group plus fallback), DOR and EOD.
+
+    Args:
+        info (dict): One entry of optimise_week's `days`
+
+    Returns:
+        list: [(task, [logins]), ...]
+    """
+    pools = [("hypercare", list(dict.fromkeys(info.get("hypercare_pool", []))))]
+    seat_pools = _seat_pools(info["groups"], info.get("dor", True), mid_excludes_fallback=False)
+    pools.extend((task, primary + fallback) for (task, _slot), (primary, fallback) in seat_pools.items())
+    return [(task, pool) for task, pool in pools if pool]
+
+
+def _solve_day(pools, exclude, history, allow_morning_fallback=True):
+    people = [p for p in dict.fromkeys(
+        login for primary, fallback in pools.values() for login in primary + fallback
+    ) if p not in exclude]
+    column = {login: j for j, login in enumerate(people)}
+    n_seats = len(DAY_SEATS)
+
+    # People first, then one "leave empty" column per seat
+    cost = np.full((n_seats, len(people) + n_seats), _FORBIDDEN)
+    cost[np.arange(n_seats), len(people) + np.arange(n_seats)] = W_UNFILLED
+    for r, (task, slot) in enumerate(DAY_SEATS):
+        primary, fallback = pools[(task, slot)]
+        if not (allow_morning_fallback or slot != "morning"):
+            fallback = []
+        logins = [p for p in primary + fallback if p not in exclude]
+        if not logins:
+            continue
+        counts = np.array([history.get(p, {}).get("total_counts", {}).get(task, 0) for p in logins], dtype=float)
+        done = np.array([bool(history.get(p, {}).get("task_flags", {}).get(task)) for p in logins])
+        row = W_COUNT * (counts - counts.min()) / 10.0 + W_CYCLE * done + W_TIE * np.array([random.random() for _ in logins])
+        row += W_FALLBACK * np.array([p not in primary for p in logins])
+        cost[r, [column[p] for p in logins]] = row
+
+    columns = _assign(cost)
+    picks = {}
+    total = 0.0
+    for r, j in enumerate(columns):
+        total += cost[r, j]
+        picks[DAY_SEATS[r]] = people[j] if j < len(people) else None
+    return picks, total
+
+
+def match_day(groups, history, hypercare_today=(), dor=True):
+    """
+    Fill one day's SIM slots, DOR and EOD as a min-cost bipartite matching.
+
+    Each seat is matched to a distinct person, so an early pick can never
+    starve a later seat. Cost per (seat, person) comes from lifetime counts
+    and cycle flags (same weights as optimise_week), with a penalty for
+    fallback pools and for leaving a seat empty. If the best matching takes
+    the morning SIM from the fallback pool, the day is re-solved with the mid
+    SIM restricted to the later mid shifts (as the greedy rota does) and the
+    cheaper of that and "no morning fallback" is kept.
+
+    Args:
+        groups (dict): Filtered shift lists for the day (get_filtered_shifts)
+        history (dict): {login: {"total_counts": {...}, "task_flags": {...}}}
+        hypercare_today (list): People on hypercare, excluded from every seat
+        dor (bool): False on days without a DOR call
+
+    Returns:
+        dict: {"sim": {slot: login or "NA"}, "dor": login/None ("No DOR" if
+              dor is False), "eod": login/None}
+    """
+    exclude = set(hypercare_today)
+    picks, _ = _solve_day(_seat_pools(groups, dor, False), exclude, history)
+    morning = picks[("sim", "morning")]
+    if morning is not None and morning not in groups.get("morning", []):
+        restricted = _solve_day(_seat_pools(groups, dor, True), exclude, history)
+        no_fallback = _solve_day(_seat_pools(groups, dor, False), exclude, history, allow_morning_fallback=False)
+        picks = min(restricted, no_fallback, key=lambda result: result[1])[0]
+
+    return {
+        "sim": {slot: picks[("sim", slot)] or "NA" for slot in SIM_SLOTS},
+        "dor": picks[("dor", None)] if dor else "No DOR",
+        "eod": picks[("eod", None)],
+    }
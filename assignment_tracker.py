@@ -0,0 +1,295 @@
+import heapq
+import json
+import random
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fairness_decay import DEFAULT_HALF_LIFE, decayed_add, decayed_from_ordinals, decayed_value
+
+# Dates older than this are dropped from each person/task history when it is loaded
+HISTORY_WEEKS = 52
+
+
+def _parse_date(value):
+    """datetime from a datetime or ISO string, or None if it can't be parsed."""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_datetime(current_date):
+    """current_date as passed to can_assign/select: a datetime or "Mon 01/05/2026" string; None if unparsable."""
+    if isinstance(current_date, str):
+        try:
+            return datetime.strptime(current_date, "%a %m/%d/%Y")
+        except ValueError:
+            return None
+    return current_date
+
+
+def _to_ordinal(value):
+    """Day ordinal of a datetime or ISO date string, or None if it can't be parsed."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value.toordinal()
+    return None
+
+
+# === ASSIGNMENT HISTORY MANAGEMENT ===
+class AssignmentTracker:
+    """
+    Track assignment history to ensure fair rotation.
+
+    history is the JSON document: {"<person>_<task>": {"dates": [iso, ...],
+    "last_date": iso, "total_count": n}}. Alongside it the tracker keeps each
+    key's dates as a sorted list of day ordinals, parsed once when history is
+    loaded or assigned, so window counts are a bisect instead of a re-parse.
+    Dates older than HISTORY_WEEKS are pruned at that point, once per session.
+
+    With fairness="decayed", selection ranks people by a decayed count kept in
+    each record ("decayed": [score, ordinal, half_life], see fairness_decay.py;
+    only built and saved in that mode) instead of the weeks_for_count window. half_lives maps task types
+    ('Hypercare', 'SIMs_AM', ...) to days; others use DEFAULT_HALF_LIFE.
+
+    For min_days_gap checks each task type also gets, on first use, an index of
+    everyone's last assignment (parsed once) in time order. "Who had this task
+    after date X" - i.e. who is not yet eligible again - is then a bisect and
+    a slice, kept in step by record_assignment.
+    """
+
+    def __init__(self, history_file='assignment_history.json', fairness="window", half_lives=None):
+        self.history_file = history_file
+        self.fairness = fairness
+        self.half_lives = dict(half_lives or {})
+        self.history = self.load_history()
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, history):
+        # Replacing the document (e.g. with a copy for a preview) rebuilds the index
+        self._history = history
+        self._build_index()
+
+    def _build_index(self):
+        cutoff = (datetime.now() - timedelta(weeks=HISTORY_WEEKS)).toordinal()
+        self._ordinals = {}
+        self._last_by_task = {}
+        for key, record in self._history.items():
+            kept, ordinals = [], []
+            for date_str in record.get('dates', []):
+                ordinal = _to_ordinal(date_str)
+                if ordinal is not None and ordinal > cutoff:
+                    kept.append(date_str)
+                    ordinals.append(ordinal)
+            record['dates'] = kept
+            ordinals.sort()
+            self._ordinals[key] = ordinals
+
+            if self.fairness == "decayed":
+                life = self._half_life(key)
+                if not record.get('decayed') or record['decayed'][2] != life:
+                    record['decayed'] = decayed_from_ordinals(ordinals, life)
+
+    def load_history(self):
+        """Load assignment history from file"""
+        if Path(self.history_file).exists():
+            try:
+                with open(self.history_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def save_history(self):
+        """Save assignment history to file"""
+        with open(self.history_file, 'w') as f:
+            json.dump(self.history, f, indent=2)
+
+    def _key(self, person, task_type):
+        return f"{person}_{task_type}"
+
+    def _half_life(self, key):
+        for task_type, life in self.half_lives.items():
+            if key.endswith(f"_{task_type}"):
+                return life
+        return DEFAULT_HALF_LIFE
+
+    def get_decayed_count(self, person, task_type, current_date):
+        """Decayed assignment count for a person on `current_date` (a datetime)"""
+        record = self.history.get(self._key(person, task_type))
+        if not record:
+            return 0.0
+        return decayed_value(record.get('decayed'), current_date.toordinal())
+
+    def _last_index(self, task_type):
+        """({person: last datetime}, sorted last datetimes, persons in that order) for a task type."""
+        index = self._last_by_task.get(task_type)
+        if index is None:
+            suffix = f"_{task_type}"
+            last = {}
+            for key, record in self._history.items():
+                if key.endswith(suffix) and 'last_date' in record:
+                    # handle possible non-iso strings (treated as never assigned)
+                    last_date = _parse_date(record['last_date'])
+                    if last_date is not None:
+                        last[key[:-len(suffix)]] = last_date
+            order = sorted(last.items(), key=lambda item: item[1])
+            index = (last, [t for _, t in order], [p for p, _ in order])
+            self._last_by_task[task_type] = index
+        return index
+
+    def _set_last(self, person, task_type, last_date):
+        index = self._last_by_task.get(task_type)
+        if index is None:
+            return
+        last, times, people = index
+        previous = last.pop(person, None)
+        if previous is not None:
+            i = bisect_left(times, previous)
+            while people[i] != person:
+                i += 1
+            del times[i], people[i]
+        if last_date is not None:
+            last[person] = last_date
+            i = bisect_right(times, last_date)
+            times.insert(i, last_date)
+            people.insert(i, person)
+
+    def assigned_since(self, task_type, since):
+        """People whose last task_type assignment is after `since` (a datetime)"""
+        _, times, people = self._last_index(task_type)
+        return people[bisect_right(times, since):]
+
+    def get_last_assignment(self, person, task_type):
+        """Get the last assignment date for a person and task type"""
+        return self._last_index(task_type)[0].get(person)
+
+    def get_assignment_count(self, person, task_type, weeks=52):
+        """Get assignment count for a person in the last N weeks (default 52 weeks), by day"""
+        ordinals = self._ordinals.get(self._key(person, task_type))
+        if not ordinals:
+            return 0
+        cutoff = (datetime.now() - timedelta(weeks=weeks)).toordinal()
+        return len(ordinals) - bisect_right(ordinals, cutoff)
+
+    def record_assignment(self, person, task_type, date):
+        """Record a new assignment"""
+        key = self._key(person, task_type)
+        if key not in self.history:
+            self.history[key] = {'dates': [], 'total_count': 0}
+            self._ordinals[key] = []
+
+        date_str = date.isoformat() if isinstance(date, datetime) else date
+        self.history[key]['dates'].append(date_str)
+        self.history[key]['last_date'] = date_str
+        self._set_last(person, task_type, _parse_date(date_str))
+        self.history[key]['total_count'] = self.history[key].get('total_count', 0) + 1
+
+        ordinal = _to_ordinal(date_str)
+        if ordinal is not None:
+            if self.fairness == "decayed":
+                life = self._half_life(key)
+                decayed = self.history[key].get('decayed')
+                if not decayed or decayed[2] != life:
+                    decayed = decayed_from_ordinals(self._ordinals[key], life)
+                self.history[key]['decayed'] = decayed_add(decayed, ordinal, life)
+            else:
+                # Only kept with fairness="decayed"; a stale one is rebuilt on load
+                self.history[key].pop('decayed', None)
+            insort(self._ordinals[key], ordinal)
+
+    def can_assign(self, person, task_type, current_date, min_days_gap=5):
+        """Check if a person can be assigned to a task (enforces min days gap)"""
+        last_assignment = self.get_last_assignment(person, task_type)
+        if last_assignment is None:
+            return True
+
+        current_date = _as_datetime(current_date)
+        if current_date is None:
+            return True
+
+        # min_days_gap indicates the minimal number of days between assignments.
+        # For "no consecutive days" use min_days_gap=2 (e.g., last = yesterday -> days_since_last=1 -> cannot assign)
+        days_since_last = (current_date - last_assignment).days
+        return days_since_last >= min_days_gap
+
+    def blocked_on(self, task_type, current_date, min_days_gap=5):
+        """
+        People who can't take task_type on current_date because their last
+        assignment was fewer than min_days_gap days before it (range query on
+        the last-assignment index; same rule as can_assign).
+
+        Returns:
+            set
+        """
+        current_date = _as_datetime(current_date)
+        if current_date is None:
+            return set()
+        # (current - last).days >= gap  <=>  last <= current - gap days
+        return set(self.assigned_since(task_type, current_date - timedelta(days=min_days_gap)))
+
+    def get_eligible_sorted(self, people_list, task_type, current_date, min_days_gap=5, weeks_for_count=52):
+        """Get eligible people sorted by assignment count (fairness)"""
+        blocked = self.blocked_on(task_type, current_date, min_days_gap)
+        eligible = []
+        for person in people_list:
+            if person not in blocked:
+                count = self.get_assignment_count(person, task_type, weeks=weeks_for_count)
+                eligible.append((person, count))
+
+        # Sort by count (ascending) - people with fewer assignments first
+        eligible.sort(key=lambda x: (x[1], x[0]))
+        return [person for person, count in eligible]
+
+    def select(self, candidates, task_type, current_date, slots=1, gaps=(5, 0), weeks_for_count=52):
+        """
+        Pick up to `slots` people for one task on one day.
+
+        Each candidate's assignment count and gap level (index of the first
+        entry in `gaps` whose min_days_gap they meet, from one blocked_on
+        range query per gap) is computed once. Only people at the strictest
+        level anyone reaches are considered - the relaxed-gap fallback - and
+        they are served from a heap ordered by fewest assignments (window or
+        decayed count, see fairness), ties broken at random, so picking k of
+        n costs O(n + k log n).
+
+        Args:
+            gaps (tuple): min_days_gap values to try, strictest first
+            weeks_for_count (int): Count window for fairness
+
+        Returns:
+            list: Selected people, fewest assignments first
+        """
+        current_date = _as_datetime(current_date)
+        blocked = [self.blocked_on(task_type, current_date, gap) for gap in gaps]
+
+        heap = []
+        for person in dict.fromkeys(candidates):
+            level = next((i for i, people in enumerate(blocked) if person not in people), None)
+            if level is None:
+                continue
+            if self.fairness == "decayed" and current_date is not None:
+                count = self.get_decayed_count(person, task_type, current_date)
+            else:
+                count = self.get_assignment_count(person, task_type, weeks=weeks_for_count)
+            heap.append((level, count, random.random(), person))
+        if not heap:
+            return []
+
+        heapq.heapify(heap)
+        best_level = heap[0][0]
+        chosen = []
+        while heap and len(chosen) < slots and heap[0][0] == best_level:
+            chosen.append(heapq.heappop(heap)[3])
+        return chosen
@@ -15,10 +15,20 @@ a = Analysis(
         ('parse_json.py', '.'),
         ('test_dataextraction_holiday.py', '.'),
         ('coverage.py', '.'),
+        ('coverage_gaps.py', '.'),
         ('daily_assignment.py', '.'),
+        ('assignment_optimizer.py', '.'),
+        ('hypercare_solver.py', '.'),
+        ('rota_search.py', '.'),
         ('debugger.py', '.'),
         ('create_shift_lists.py', '.'),
         ('get_eligible_employees.py', '.'),
+        ('fairness_decay.py', '.'),
+        ('sqlite_store.py', '.'),
+        ('journal_store.py', '.'),
+        ('input_cache.py', '.'),
+        ('shift_parser.py', '.'),
+        ('login_to_name_mapper.py', '.'),
         ('holiday_tracker.xlsx', '.'),
         ('logo1.png','.'),
         ('icon.png','.'),
@@ -32,6 +42,7 @@ a = Analysis(
         'streamlit.runtime.scriptrunner.script_runner',
         'pandas',
         'openpyxl',
+        'scipy.optimize',
         'altair',
         'watchdog',
         'tornado',
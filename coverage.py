@@ -1,4 +1,28 @@
 import re
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from shift_parser import parse_shift
+
+DAY_MINUTES = 24 * 60
+# Timelines run over two days so shifts that end after midnight stay in one array
+HORIZON_MINUTES = 2 * DAY_MINUTES
+# Legacy rule used by calculate_coverage_from_shifts: an end at or before 08:30 is next day
+LEGACY_OVERNIGHT_CUTOFF = 8 * 60 + 30
+
+# Summary of one day's timeline (all times in minutes from 00:00 of the day)
+DayCoverage = namedtuple("DayCoverage", [
+    "headcount",      # np.ndarray, people on shift per slot over HORIZON_MINUTES
+    "resolution",     # minutes per slot
+    "intervals",      # [(start, end), ...] where headcount > 0
+    "gaps",           # [(start, end), ...] inside the window where headcount == 0
+    "min_headcount",  # lowest headcount inside the window (0 if empty)
+    "max_headcount",  # highest headcount anywhere
+    "hours",          # {"current_day": h, "next_day": h} covered hours either side of midnight
+])
+
 
 def parse_time_to_minutes(time_str):
     """Convert time string like '06:30' or '23:30' to minutes since midnight"""
@@ -18,14 +42,214 @@ def minutes_to_str(m):
     return f"{h:02d}:{mi:02d}"
 
 
+def shift_intervals(all_shift_times, overnight_cutoff=None):
+    """
+    Parse shift strings into (start, end) minute intervals on a two-day axis.
+
+    A segment whose end is at or before its start runs past midnight, so its
+    end moves into the next day. Split shifts give one interval per segment.
+
+    Args:
+        all_shift_times (list): Shift strings like ["06:30-15:00", "23:30-08:30"]
+        overnight_cutoff (int): Also treat any end <= this many minutes as next day
+                                (the old calculate_coverage_from_shifts rule)
+
+    Returns:
+        np.ndarray: int32 array of shape (n, 2)
+    """
+    intervals = []
+    for shift_time in all_shift_times:
+        for start, end in parse_shift(shift_time):
+            if end <= start or (overnight_cutoff is not None and end <= overnight_cutoff):
+                end += DAY_MINUTES
+            intervals.append((start, end))
+    return np.array(intervals, dtype=np.int32).reshape(-1, 2)
+
+
+def headcount(starts, ends, resolution=1, horizon=HORIZON_MINUTES):
+    """
+    Headcount per slot from shift start/end minutes, via a difference array.
+
+    Works on any batch shape: starts/ends of shape (..., n) give counts of
+    shape (..., slots), so every day of a month or every candidate rota can
+    be evaluated in one call. Entries with start < 0 are ignored (no shift).
+    A slot counts someone if any part of it falls inside their shift.
+
+    Args:
+        starts, ends (array-like): Minutes on the two-day axis (end > start)
+        resolution (int): Minutes per slot, e.g. 1 or 15
+        horizon (int): Minutes covered by the result (default two days)
+
+    Returns:
+        np.ndarray: int32 counts of shape (..., horizon // resolution)
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    slots = -(-horizon // resolution)
+    batch_shape = starts.shape[:-1]
+
+    on_shift = starts >= 0
+    first = np.clip(starts // resolution, 0, slots)
+    last = np.clip(-(-ends // resolution), 0, slots)
+    weight = (on_shift & (last > first)).astype(np.int32)
+
+    # One extra column absorbs ends at the horizon; rows are laid end to end
+    width = slots + 1
+    rows = np.arange(int(np.prod(batch_shape, dtype=np.int64))).reshape(batch_shape + (1,)) * width
+    diff = np.zeros(rows.size * width, dtype=np.int32)
+    np.add.at(diff, (rows + first).ravel(), weight.ravel())
+    np.add.at(diff, (rows + last).ravel(), -weight.ravel())
+    return np.cumsum(diff.reshape(batch_shape + (width,)), axis=-1)[..., :slots]
+
+
+def _runs(mask):
+    """[(first, end), ...] slot runs where mask is True."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def summarise_headcount(counts, resolution=1, window=None):
+    """
+    Intervals, gaps, min/max and hours split at midnight for one day's counts.
+
+    Args:
+        counts (np.ndarray): One row from headcount()
+        resolution (int): Minutes per slot used to build counts
+        window (tuple): (start, end) minutes that should be covered; gaps and
+                        min_headcount are measured inside it. Defaults to the
+                        span from the first covered slot to the last.
+
+    Returns:
+        DayCoverage
+    """
+    covered = counts > 0
+    intervals = [(a * resolution, b * resolution) for a, b in _runs(covered)]
+
+    if window is None and intervals:
+        window = (intervals[0][0], intervals[-1][1])
+    gaps = []
+    min_headcount = 0
+    if window is not None:
+        lo = window[0] // resolution
+        hi = -(-window[1] // resolution)
+        inside = counts[lo:hi]
+        if inside.size:
+            min_headcount = int(inside.min())
+            gaps = [((lo + a) * resolution, (lo + b) * resolution) for a, b in _runs(inside == 0)]
+
+    midnight = DAY_MINUTES // resolution
+    hours = {
+        "current_day": int(covered[:midnight].sum()) * resolution / 60,
+        "next_day": int(covered[midnight:].sum()) * resolution / 60,
+    }
+    return DayCoverage(
+        headcount=counts,
+        resolution=resolution,
+        intervals=intervals,
+        gaps=gaps,
+        min_headcount=min_headcount,
+        max_headcount=int(counts.max()) if counts.size else 0,
+        hours=hours,
+    )
+
+
+def coverage_timeline(all_shift_times, resolution=1, window=None):
+    """
+    Coverage timeline for one day's shift times.
+
+    Args:
+        all_shift_times (list): Shift strings of everyone working that day
+        resolution (int): Minutes per slot (1 or 15 are typical)
+        window (tuple): (start, end) minutes that should be covered, e.g.
+                        (6 * 60 + 30, 24 * 60 + 8 * 60 + 30); see summarise_headcount
+
+    Returns:
+        DayCoverage
+    """
+    intervals = shift_intervals(all_shift_times)
+    counts = headcount(intervals[:, 0], intervals[:, 1], resolution)
+    return summarise_headcount(counts, resolution, window)
+
+
+def _day_number(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%d/%m/%Y").toordinal()
+    return value.toordinal()
+
+
+def rolling_coverage(days, resolution=15):
+    """
+    Coverage per day over a date range, with overnight shifts counted on the
+    day they spill into.
+
+    All shifts go into one timeline spanning the whole range (a single
+    difference array and cumsum), so a month or quarter costs one sweep.
+
+    Args:
+        days (list): (date, shift_times) pairs; date is a date/datetime or
+                     DD/MM/YYYY string, shift_times the shift strings of
+                     everyone working that day. Dates need not be contiguous.
+        resolution (int): Minutes per slot; must divide a day evenly
+
+    Returns:
+        list: One dict per input day, in input order:
+              {"date", "window" (first start-last end of that day's own
+              shifts, or "No Coverage"), "hours" (covered hours within the
+              calendar day), "pct", "min_headcount", "max_headcount"}
+    """
+    if DAY_MINUTES % resolution:
+        raise ValueError(f"resolution must divide {DAY_MINUTES} minutes, got {resolution}")
+    days = list(days)
+    if not days:
+        return []
+
+    numbers = [_day_number(date) for date, _ in days]
+    first_day = min(numbers)
+    span = max(numbers) - first_day + 2  # one spare day for the last night's spill
+
+    starts, ends, windows = [], [], []
+    for number, (_, shift_times) in zip(numbers, days):
+        intervals = shift_intervals(shift_times or [])
+        offset = (number - first_day) * DAY_MINUTES
+        starts.append(intervals[:, 0] + offset)
+        ends.append(intervals[:, 1] + offset)
+        if len(intervals):
+            windows.append(f"{minutes_to_str(int(intervals[:, 0].min()))}-{minutes_to_str(int(intervals[:, 1].max()))}")
+        else:
+            windows.append("No Coverage")
+
+    per_day = DAY_MINUTES // resolution
+    counts = headcount(np.concatenate(starts), np.concatenate(ends), resolution, span * per_day * resolution)
+    counts = counts.reshape(span, per_day)
+    covered_hours = (counts > 0).sum(axis=1) * resolution / 60
+
+    result = []
+    for number, (date, _), window in zip(numbers, days, windows):
+        row = number - first_day
+        hours = float(covered_hours[row])
+        result.append({
+            "date": date,
+            "window": window,
+            "hours": hours,
+            "pct": hours / 24 * 100,
+            "min_headcount": int(counts[row].min()),
+            "max_headcount": int(counts[row].max()),
+        })
+    return result
+
+
 def calculate_coverage_from_shifts(all_shift_times, test=False):
     """
     Calculate coverage string and hours breakdown from a list of shift times.
-    
+
+    Keeps the original rule that any end at or before 08:30 is next day, since
+    callers also pass earlier coverage strings back in. Use coverage_timeline()
+    for headcount and gaps.
+
     Args:
         all_shift_times (list): List of shift time strings like ["06:30-15:00", "23:30-08:30"]
         test (bool): If True, enables print statements for debugging
-    
+
     Returns:
         tuple: (coverage_str, hours_breakdown)
             - coverage_str (str): Coverage window like "06:30-23:00" or "No Coverage"
@@ -33,85 +257,28 @@ def calculate_coverage_from_shifts(all_shift_times, test=False):
     """
     coverage_str = "No Coverage"
     hours_breakdown = {"current_day": 0, "next_day": 0}
-    
+
     if not all_shift_times:
         return coverage_str, hours_breakdown
-    
-    earliest_start = None
-    latest_end = None
-    
+
+    intervals = shift_intervals(all_shift_times, overnight_cutoff=LEGACY_OVERNIGHT_CUTOFF)
     if test:
-        print(f"Processing shift times:")
-    
-    for shift_time in all_shift_times:
-        # Parse shift time like "06:30-15:00" or "23:30-8:30"
-        shift_time = shift_time.replace('\xa0', ' ').strip()
-        parts = re.split(r'[-–]', shift_time)  # Handle both - and –
-        
-        if test:
-            print(f"  Shift: {shift_time}")
-        
-        if len(parts) == 2:
-            start_str = parts[0].strip()
-            end_str = parts[1].strip()
-            
-            start_mins = parse_time_to_minutes(start_str)
-            end_mins = parse_time_to_minutes(end_str)
-            
-            if start_mins is not None and end_mins is not None:
-                # Handle overnight shifts (end < start means it crosses midnight)
-                if end_mins <= parse_time_to_minutes("8:30"):  # 8:30 AM threshold to avoid misinterpretation
-                    if test:
-                        print(f"Overnight shift detected (end < start)")
-                    # Add 24 hours to end time for comparison
-                    end_mins += 24 * 60
-                    
-                    if test:
-                        print(f"Adjusted end time: {end_mins} minutes")
-                        
-                if earliest_start is None or start_mins < earliest_start:
-                    earliest_start = start_mins
-                    if test:
-                        print(f"New earliest start: {earliest_start} minutes")
-                
-                if latest_end is None or end_mins > latest_end:
-                    latest_end = end_mins
-                    if test:
-                        print(f"New latest end: {latest_end} minutes")
-    
-    if earliest_start is not None and latest_end is not None:
-        # Convert back to time strings
-        start_str = minutes_to_str(earliest_start)
-        end_str = minutes_to_str(latest_end)
-        
-        coverage_str = f"{start_str}-{end_str}"
-        
+        print(f"Processing shift times: {all_shift_times}")
+        print(f"  Intervals (minutes): {intervals.tolist()}")
+
+    if len(intervals):
+        earliest_start = int(intervals[:, 0].min())
+        latest_end = int(intervals[:, 1].max())
+        coverage_str = f"{minutes_to_str(earliest_start)}-{minutes_to_str(latest_end)}"
+
+        # Hours are for the whole span, split at midnight
+        midnight = DAY_MINUTES
+        hours_breakdown["current_day"] = (min(latest_end, midnight) - earliest_start) / 60
+        hours_breakdown["next_day"] = max(latest_end - midnight, 0) / 60
+
         if test:
-            print(f"Coverage calculation:")
-            print(f"  Earliest start: {earliest_start} minutes ({start_str})")
-            print(f"  Latest end: {latest_end} minutes ({end_str})")
             print(f"  Coverage string: {coverage_str}")
-        
-        # Calculate hours split between days
-        midnight = 24 * 60  # Midnight in minutes
-        
-        if latest_end <= midnight:
-            # No overnight coverage
-            hours_breakdown["current_day"] = (latest_end - earliest_start) / 60
-            
-            hours_breakdown["next_day"] = 0
-            if test:
-                print(f"  No overnight coverage")
-                print(f"  Current day hours: {hours_breakdown['current_day']:.2f}")
-        else:
-            # Coverage extends past midnight
-            # Current day: from start to midnight
-            hours_breakdown["current_day"] = (midnight - earliest_start) / 60
-            # Next day: from midnight to end
-            hours_breakdown["next_day"] = (latest_end - midnight) / 60
-            if test:
-                print(f"  Coverage extends past midnight")
-                print(f"  Current day hours: {hours_breakdown['current_day']:.2f}")
-                print(f"  Next day hours: {hours_breakdown['next_day']:.2f}")
-    
-    return coverage_str, hours_breakdown
\ No newline at end of file
+            print(f"  Current day hours: {hours_breakdown['current_day']:.2f}")
+            print(f"  Next day hours: {hours_breakdown['next_day']:.2f}")
+
+    return coverage_str, hours_breakdown
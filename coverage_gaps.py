@@ -0,0 +1,189 @@
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from coverage import DAY_MINUTES, _runs, headcount, minutes_to_str
+from gnatt_coverage import COVERAGE_TASKS, _assigned_logins
+from parse_json import DAYS, ShiftCatalog
+
+# Minimum people on each task at every moment of the day's window
+DEFAULT_REQUIRED = {"hypercare": 1, "sim": 1, "wims": 1}
+# People on these tasks are never suggested for another task
+EXCLUSIVE_TASKS = ("hypercare",)
+
+# A stretch of the day where a task has fewer people than required (minutes from 00:00)
+Gap = namedtuple("Gap", ["date", "task", "start", "end", "headcount", "required"])
+# Suggested logins to add to gap.task; closed is False if they only narrow the gap
+GapFix = namedtuple("GapFix", ["gap", "logins", "closed"])
+
+
+class ShiftIntervalIndex:
+    """
+    Shift intervals of one day's candidates, sorted by start, for cover queries.
+
+    Candidates are everyone with a classified shift that day - including the
+    morning_fallback / night_fallback pools of get_shift_groups_for_day - who
+    is working and not excluded.
+    """
+
+    def __init__(self, logins, starts, ends):
+        order = np.argsort(starts, kind="stable")
+        self.logins = np.asarray(logins, dtype=object)[order]
+        self.starts = np.asarray(starts, dtype=np.int64)[order]
+        self.ends = np.asarray(ends, dtype=np.int64)[order]
+
+    @classmethod
+    def for_day(cls, catalog, day, working=None, exclude=()):
+        """
+        Args:
+            catalog (ShiftCatalog): Compiled schedule
+            day (str): Day abbreviation (Mon, Tue, ...)
+            working (set): Logins not on holiday (None = everyone)
+            exclude (set): Logins that must not be suggested
+        """
+        d = catalog.day_ids.get(str(day).strip())
+        if d is None:
+            return cls([], [], [])
+        starts = catalog.start[:, d].astype(np.int64)
+        ends = catalog.end[:, d].astype(np.int64)
+        mask = (starts >= 0) & ((catalog.shift_class[:, d] >= 0) | (catalog.fallback_class[:, d] >= 0))
+        if working is not None:
+            mask &= np.array([login in working for login in catalog.logins], dtype=bool)
+        if exclude:
+            mask &= np.array([login not in exclude for login in catalog.logins], dtype=bool)
+        ends = np.where(ends <= starts, ends + DAY_MINUTES, ends)
+        return cls(catalog.logins[mask], starts[mask], ends[mask])
+
+    def __len__(self):
+        return len(self.logins)
+
+    def cover(self, start, end, layers=1):
+        """
+        Fewest logins whose shifts cover [start, end) `layers` times over.
+
+        Greedy interval cover (optimal for one layer): from the current point,
+        take the unused shift that has started and reaches furthest. If nobody
+        is on at the current point, skip ahead to the next shift start.
+
+        Returns:
+            tuple: (logins, closed) - closed is False if some of the window
+                   could not be covered
+        """
+        used = np.zeros(len(self.logins), dtype=bool)
+        chosen = []
+        closed = True
+        for _ in range(layers):
+            point = start
+            while point < end:
+                # Shifts are sorted by start, so those already on are a prefix
+                started = np.searchsorted(self.starts, point, side="right")
+                reach = np.where(used[:started], -1, self.ends[:started])
+                best = int(np.argmax(reach)) if started else -1
+                if best < 0 or reach[best] <= point:
+                    closed = False
+                    later = np.flatnonzero(~used & (self.starts > point) & (self.starts < end))
+                    if not len(later):
+                        break
+                    point = int(self.starts[later[0]])
+                    continue
+                used[best] = True
+                chosen.append(self.logins[best])
+                point = int(self.ends[best])
+        return chosen, closed
+
+
+def _level_runs(counts, need):
+    """Runs of slots below `need`, split wherever the headcount changes."""
+    for a, b in _runs(counts < need):
+        cuts = np.flatnonzero(np.diff(counts[a:b])) + 1 + a
+        edges = [a] + cuts.tolist() + [b]
+        yield from zip(edges[:-1], edges[1:])
+
+
+def _working_set(working, date_str):
+    if working is None:
+        return None
+    if hasattr(working, "working_on"):
+        return set(working.working_on(date_str))
+    return set(working.get(date_str, ()))
+
+
+def find_coverage_gaps(date_assignments, schedule_data, dates=None, tasks=COVERAGE_TASKS,
+                       required=None, working=None, window=None, resolution=15):
+    """
+    Under-staffed windows per day and task, each with the smallest set of
+    extra people found to close it.
+
+    Args:
+        date_assignments (dict): {date_str (DD/MM/YYYY): day record}, e.g. from
+                                 get_week_assignments(dates)
+        schedule_data: schedule dict or a ShiftCatalog compiled from it
+        dates (list): Dates to check (default: every date in date_assignments)
+        tasks (tuple): Tasks to check
+        required (dict): {task: people needed at once} (default DEFAULT_REQUIRED)
+        working: HolidayIndex or {date_str: logins}; None treats everyone as working
+        window (tuple): (start, end) minutes to cover; default is the span of
+                        every working shift that day
+        resolution (int): Minutes per slot
+
+    Returns:
+        dict: {date_str: [GapFix, ...]} in task then time order
+    """
+    catalog = ShiftCatalog.of(schedule_data)
+    required = dict(DEFAULT_REQUIRED, **(required or {}))
+    dates = list(date_assignments) if dates is None else list(dates)
+    result = {}
+
+    for date_str in dates:
+        day = DAYS[datetime.strptime(date_str, '%d/%m/%Y').weekday()]
+        record = date_assignments.get(date_str) or {}
+        working_today = _working_set(working, date_str)
+        team = ShiftIntervalIndex.for_day(catalog, day, working_today)
+        result[date_str] = []
+        if not len(team):
+            continue
+
+        day_window = window or (int(team.starts.min()), int(team.ends.max()))
+        lo = day_window[0] // resolution
+        hi = -(-day_window[1] // resolution)
+        exclusive = {login for task in EXCLUSIVE_TASKS for login in _assigned_logins(record.get(task))}
+
+        for task in tasks:
+            need = required.get(task, 1)
+            assigned = set(_assigned_logins(record.get(task)))
+            on_task = np.isin(team.logins, list(assigned)) if assigned else np.zeros(len(team), dtype=bool)
+            counts = headcount(team.starts[on_task], team.ends[on_task], resolution)[lo:hi]
+
+            candidates = None
+            for a, b in _level_runs(counts, need):
+                gap = Gap(
+                    date=date_str,
+                    task=task,
+                    start=(lo + a) * resolution,
+                    end=(lo + b) * resolution,
+                    headcount=int(counts[a]),
+                    required=need,
+                )
+                if candidates is None:
+                    candidates = ShiftIntervalIndex.for_day(
+                        catalog, day, working_today, exclude=assigned | (exclusive if task not in EXCLUSIVE_TASKS else set())
+                    )
+                logins, closed = candidates.cover(gap.start, gap.end, layers=need - gap.headcount)
+                result[date_str].append(GapFix(gap=gap, logins=logins, closed=closed))
+
+    return result
+
+
+def describe_gap(fix):
+    """One-line summary of a GapFix for display."""
+    gap = fix.gap
+    text = (f"{gap.task.upper()} {minutes_to_str(gap.start)}-{minutes_to_str(gap.end)}: "
+            f"{gap.headcount}/{gap.required} on task")
+    if fix.logins:
+        text += f" - add {', '.join(fix.logins)}"
+        if not fix.closed:
+            text += " (partly covers it)"
+    else:
+        text += " - nobody working can cover it"
+    return text
@@ -1,20 +1,24 @@
 
-from parse_json import get_shift_groups_for_day
-from test_dataextraction_holiday import check_if_person_working_today
+from parse_json import ShiftCatalog
+from test_dataextraction_holiday import HolidayIndex
 
 from coverage import calculate_coverage_from_shifts
 from datetime import datetime, timedelta
 import os
 import pandas as pd
 
-def get_filtered_shifts(schedule_data, df, excel_date, test=False,working_codes=[]):
+def get_filtered_shifts(schedule_data, df, excel_date, test=False,working_codes=[], holidays=None):
     """
     Returns a dictionary of shift types mapped to employees who are working on a specific date.
     Args:
-        schedule_data (dict): Already loaded schedule JSON.
+        schedule_data (dict): Already loaded schedule JSON, or a ShiftCatalog compiled
+                              from it (pass one when calling this for several dates).
         df (pd.DataFrame): Holiday tracker Excel sheet loaded as a DataFrame.
         excel_date (str): Date string in DD/MM/YYYY format.
         test (bool): If True, enables print statements and testing output.
+        working_codes (list): Tracker codes that count as working (default: WORKING_CODES).
+        holidays (HolidayIndex): Prebuilt index of `df`. Pass one when calling this
+                                 for several dates so the sheet is parsed only once.
     Returns:
         dict: {shift_type: [employee_logins]} for those actually working on the date.
         str: Coverage string like "06:30-23:00" or "06:30-08:00" for overnight
@@ -32,8 +36,12 @@ def get_filtered_shifts(schedule_data, df, excel_date, test=False,working_codes=
         print(f"Parsed date: {date_obj}")
         print(f"Day abbreviation: {day_abbr}")
     
+    if holidays is None:
+        holidays = HolidayIndex(df, working_codes)
+
     # Get shift groups for the day
-    shift_lists = get_shift_groups_for_day(schedule_data, day_abbr)
+    catalog = ShiftCatalog.of(schedule_data)
+    shift_lists = catalog.groups(day_abbr)
     
     if test:
         print(f"Shift groups for {day_abbr}:")
@@ -42,6 +50,7 @@ def get_filtered_shifts(schedule_data, df, excel_date, test=False,working_codes=
                 print(f"  {shift_type}: {len(names)} employees - {names}")
     
     # Filter by employees actually working
+    working_today = set(holidays.working_on(excel_date))
     filtered = {}
     all_shift_times = []  # Collect all shift times from working employees
     
@@ -59,17 +68,15 @@ def get_filtered_shifts(schedule_data, df, excel_date, test=False,working_codes=
              print(f"{shift_type.upper()} Shift:")
         
         for login in names:
-            status = check_if_person_working_today(excel_date, login, df)
-            
             if test:
-                print(f"  {login}: {status}")
+                print(f"  {login}: {holidays.status(login, excel_date)}")
             
-            if status == "Working":
+            if login in working_today:
                 filtered[shift_type].append(login)
                 
-                # Get this person's shift time from schedule_data
-                if login in schedule_data and day_abbr in schedule_data[login]:
-                    shift_time = schedule_data[login][day_abbr]
+                # Get this person's shift time from the catalog
+                shift_time = catalog.shift_time(login, day_abbr)
+                if shift_time:
                     all_shift_times.append(shift_time)
                     if test:
                         print(f"-> Added to {shift_type}, shift time: {shift_time}")
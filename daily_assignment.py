@@ -1,103 +1,51 @@
 
 
 from create_shift_lists import get_filtered_shifts
-from get_eligible_employees import get_eligible_employees, mark_employee_assigned, unmark_employee_assigned
+from test_dataextraction_holiday import HolidayIndex
+from parse_json import ShiftCatalog
+from get_eligible_employees import get_eligible_employees, get_employee_history, mark_employee_assigned, unmark_employee_assigned, mark_many, task_store_session, get_date_assignment
+from assignment_optimizer import match_day, milp_available, optimise_week, task_pools
+from hypercare_solver import solve_hypercare_week
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
 from debugger import get_debug_logs, clear_logs, get_all_logs, log_debug as log_message
-def build_hypercare_weekly_assignments(eligible_by_day, week_dates, week_days):
+
+# Default hypercare seats per day
+HYPERCARE_REQUIREMENTS = {
+    "Sun": 1, "Sat": 1, "Thu": 1,
+    "Mon": 2, "Tue": 2, "Wed": 2, "Fri": 2
+}
+# "auto" uses the MILP optimiser when scipy is installed, else the greedy rota
+ENGINES = ("auto", "milp", "matching", "greedy")
+
+def build_hypercare_weekly_assignments(eligible_by_day, week_dates, week_days, custom_requirements=None, previous=()):
     """
     Build hypercare assignments ensuring no consecutive day assignments.
     People CAN be assigned multiple times in the same week, just not on back-to-back days.
-    Uses constraint-based greedy assignment (most constrained days first).
+    Solved by hypercare_solver (branch and bound, most seats filled). If the
+    requirements can't all be met, days are left short rather than putting
+    anyone on back-to-back days, and the reasons are printed.
     Does NOT mark assignments - that's done later in generate_daily_assignments.
     
-    Priority system:
-    - Level 1 (highest): Days where available slots exactly match requirements
-    - Level 2: Days with shortages (fewer people than needed)
-    - Level 3 (lowest): Days with surplus (more people than needed)
-    
     Args:
         eligible_by_day: List of eligible employees per day
         week_dates: List of date strings in DD/MM/YYYY format
         week_days: List of day abbreviations (Mon, Tue, etc.)
+        custom_requirements: Optional {day abbreviation: seats}; other days use
+                             HYPERCARE_REQUIREMENTS (1 for Sun/Sat/Thu, 2 for others)
+        previous: Logins on hypercare the day before week_dates[0]; kept off the first day
     """
-    n_days = len(week_days)
-    assignments = [None] * n_days
-    
-    # Default requirements: 1 for Sun/Sat/Thu, 2 for others
-    requirements_by_day = {
-        "Sun": 1, "Sat": 1, "Thu": 1,
-        "Mon": 2, "Tue": 2, "Wed": 2, "Fri": 2
-    }
-    
-    # Make a working copy to modify
-    working_eligible = [day[:] for day in eligible_by_day]
-    
-    # Build priority queue based on constraint level
-    priority = []
-    for day_idx in range(n_days):
-        day_name = week_days[day_idx]
-        required = requirements_by_day.get(day_name, 2)
-        num_eligible = len(working_eligible[day_idx])
-        
-        # Calculate constraint levels:
-        # Level 1 (highest priority): exact match (slots == required)
-        # Level 2: shortage (slots < required)
-        # Level 3 (lowest priority): surplus (slots > required)
-        
-        if num_eligible == required:
-            constraint_level = 1  # Exact match - highest priority
-            constraint_score = 0
-        elif num_eligible < required:
-            constraint_level = 2  # Shortage - second priority
-            constraint_score = required - num_eligible  # How short we are
-        else:
-            constraint_level = 3  # Surplus - lowest priority
-            constraint_score = num_eligible - required  # How much surplus
-        
-        priority.append((constraint_level, constraint_score, day_idx, required))
-    
-    # Sort by constraint level first, then by score within each level
-    priority.sort()
-    
-    # Process days in priority order
-    for constraint_level, constraint_score, day_idx, required in priority:
-        eligible = working_eligible[day_idx]
-        
-        # Filter out people assigned YESTERDAY and TOMORROW (avoid consecutive days)
-        filtered = eligible[:]
-        
-        # Remove people assigned yesterday
-        if day_idx > 0 and assignments[day_idx - 1] is not None:
-            filtered = [p for p in filtered if p not in assignments[day_idx - 1]]
-        
-        # Remove people assigned tomorrow (if already assigned)
-        if day_idx < n_days - 1 and assignments[day_idx + 1] is not None:
-            filtered = [p for p in filtered if p not in assignments[day_idx + 1]]
-        
-        # If filtering removes everyone, use original list
-        if not filtered:
-            filtered = eligible[:]
-        
-        # Assign based on availability
-        if len(filtered) == 0:
-            assignments[day_idx] = []  # No one available
-        elif len(filtered) <= required:
-            # Not enough people - take everyone available
-            assignments[day_idx] = filtered[:]
-        else:
-            # Enough people - sample randomly
-            assignments[day_idx] = random.sample(filtered, k=required)
-        
-        # DO NOT remove assigned people from future days
-        # They can be assigned again, just not consecutively
-    
-    return assignments
+    requirements_by_day = dict(HYPERCARE_REQUIREMENTS, **(custom_requirements or {}))
+    requirements = [requirements_by_day.get(day_name, 2) for day_name in week_days]
+
+    plan = solve_hypercare_week(eligible_by_day, requirements, list(week_dates), previous)
+    for problem in plan.problems:
+        print(f"⚠️ Hypercare: {problem}")
+    return plan.assignments
 
 
-def generate_daily_assignments(schedule_data, df, hypercare_list, custom_requirements=None):
+def generate_daily_assignments(schedule_data, df, hypercare_list, custom_requirements=None, holidays=None, engine="auto"):
     """
     Generate daily assignments for all tasks.
     
@@ -107,17 +55,155 @@ def generate_daily_assignments(schedule_data, df, hypercare_list, custom_require
         hypercare_list: List of people eligible for hypercare
         custom_requirements: Optional dict mapping day names to required hypercare slots
                            Example: {"Mon": 2, "Tue": 3, "Wed": 2, "Thu": 1, "Fri": 4, "Sat": 1, "Sun": 1}
+        holidays: Optional prebuilt HolidayIndex of df (e.g. from input_cache)
+        engine: "milp" solves the whole week with assignment_optimizer;
+                "matching" keeps the greedy weekly hypercare but fills each
+                day's SIM/DOR/EOD seats as a min-cost matching; "greedy" uses
+                the day-by-day random choice; "auto" (default) uses the MILP
+                when scipy is installed. A MILP that finds no solution in its
+                time limit falls back to greedy.
+
+    task_data.json is loaded once for the whole run and written once at the end.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    with task_store_session():
+        if holidays is None:
+            holidays = HolidayIndex(df)
+        catalog = ShiftCatalog.of(schedule_data)
+        return _generate_week(catalog, df, holidays, tracker_dates(df), hypercare_list, custom_requirements, engine)
+
+
+def generate_horizon_assignments(schedule_data, df, hypercare_list, weeks=None, custom_requirements=None, holidays=None, engine="auto"):
     """
-    # Extract week dates
+    Generate assignments for several consecutive weeks in one run.
+
+    The tracker's dates are split into calendar weeks, Sunday to Saturday
+    (see calendar_weeks; a tracker starting mid-week gives a short first
+    week), and each week is generated in turn against the same in-memory
+    task data, so counts, cycle resets and the last day's hypercare carry
+    into the next week exactly as if the weeks had been generated one by one
+    (nobody gets hypercare on a Saturday and the following Sunday). The
+    schedule and tracker are parsed once and task_data.json is written once
+    at the end, so cost grows linearly with the number of weeks.
+
+    Args:
+        schedule_data: Schedule JSON data
+        df: Holiday tracker DataFrame covering the whole horizon (row 0 = dates)
+        hypercare_list: List of people eligible for hypercare
+        weeks: Number of calendar weeks to generate, a short first week
+               included (default: every week in the tracker)
+        custom_requirements, holidays, engine: As for generate_daily_assignments
+
+    Returns:
+        list: Daily assignment dicts for every date, in date order
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    horizon = calendar_weeks(tracker_dates(df))
+    if weeks is not None:
+        horizon = horizon[:weeks]
+
+    daily_assignments = []
+    with task_store_session():
+        if holidays is None:
+            holidays = HolidayIndex(df)
+        catalog = ShiftCatalog.of(schedule_data)
+        for week_dates in horizon:
+            daily_assignments.extend(
+                _generate_week(catalog, df, holidays, week_dates, hypercare_list, custom_requirements, engine)
+            )
+    return daily_assignments
+
+
+def tracker_dates(df):
+    """DD/MM/YYYY dates in row 0 of the holiday tracker, in column order."""
     dates_raw = pd.to_datetime(df.iloc[0], errors="coerce")
-    week_dates = [d.strftime("%d/%m/%Y") for d in dates_raw if not pd.isna(d)]
+    return [d.strftime("%d/%m/%Y") for d in dates_raw if not pd.isna(d)]
+
+
+def calendar_weeks(dates):
+    """
+    Split DD/MM/YYYY dates (in order) into Sunday-to-Saturday weeks.
+
+    Returns:
+        list: One list of dates per calendar week, in order
+    """
+    weeks = []
+    current = None
+    for date_str in dates:
+        day = datetime.strptime(date_str, "%d/%m/%Y")
+        # Sunday on or before the date
+        week_start = day - timedelta(days=(day.weekday() + 1) % 7)
+        if week_start != current:
+            weeks.append([])
+            current = week_start
+        weeks[-1].append(date_str)
+    return weeks
+
+
+def _previous_hypercare(week_dates):
+    """Logins on hypercare the day before the week starts, from task data."""
+    if not week_dates:
+        return []
+    day_before = datetime.strptime(week_dates[0], "%d/%m/%Y") - timedelta(days=1)
+    return list(get_date_assignment(day_before.strftime("%d/%m/%Y"), "hypercare") or [])
+
+
+def _optimise_week(week_dates, week_days, day_lists, hypercare_list, custom_requirements, previous=()):
+    """Run the MILP for the week; None if it is unavailable or found nothing."""
+    requirements = dict(HYPERCARE_REQUIREMENTS, **(custom_requirements or {}))
+    days = []
+    everyone = set()
+    for excel_date, day, filtered_lists in zip(week_dates, week_days, day_lists):
+        working = set()
+        for slot in filtered_lists:
+            working.update(filtered_lists.get(slot, []))
+        everyone |= working
+        days.append({
+            "date": excel_date,
+            "day": day,
+            "groups": filtered_lists,
+            "hypercare_pool": [p for p in hypercare_list if p in working and not (excel_date == week_dates[0] and p in previous)],
+            "hypercare_required": requirements.get(day, 2),
+            "dor": day not in ["Sat", "Sun"],
+        })
+
+    # Start a new cycle for any pool that has all done its task, exactly as
+    # get_eligible_employees does for the greedy rota, before the cycle flags
+    # are read into the costs
+    for info in days:
+        for task, pool in task_pools(info):
+            get_eligible_employees(pool, task, info["date"])
+    history = {login: get_employee_history(login) or {} for login in everyone}
+
+    plan = optimise_week(days, history)
+    if plan is None:
+        print("⚠️ MILP optimiser found no solution in time - using greedy assignment")
+    return plan
+
+
+def _generate_week(catalog, df, holidays, week_dates, hypercare_list, custom_requirements=None, engine="auto"):
+    """One week of generate_daily_assignments; runs inside an open task_store_session."""
     week_days = [datetime.strptime(d, "%d/%m/%Y").strftime("%a") for d in week_dates]
+    # Whoever had hypercare the day before (e.g. last week's Saturday) can't start this week on it
+    previous_hypercare = _previous_hypercare(week_dates)
+
+    # Working people per shift group, once per day
+    day_shifts = [get_filtered_shifts(catalog, df, excel_date, holidays=holidays) for excel_date in week_dates]
+    day_lists = [filtered_lists for filtered_lists, _ in day_shifts]
+
+    plan = None
+    if engine == "milp" and not milp_available():
+        print("⚠️ scipy is not installed - using greedy assignment")
+    elif engine in ("auto", "milp") and milp_available():
+        plan = _optimise_week(week_dates, week_days, day_lists, hypercare_list, custom_requirements, previous_hypercare)
+    if plan is not None:
+        return _apply_plan(plan, week_dates, week_days, day_shifts, catalog)
 
     # Build eligible_by_day for hypercare
     eligible_by_day = []
-    for excel_date, day in zip(week_dates, week_days):
-        filtered_lists, coverage = get_filtered_shifts(schedule_data, df, excel_date)
-        
+    for excel_date, filtered_lists in zip(week_dates, day_lists):
         # Get all working people from all shifts
         all_working = []
         for slot in ["morning", "mid", "night", "midnight"]:
@@ -137,18 +223,22 @@ def generate_daily_assignments(schedule_data, df, hypercare_list, custom_require
         eligible_by_day, 
         week_dates, 
         week_days,
+        custom_requirements,
+        previous_hypercare,
     )
 
+    if engine == "matching":
+        return _match_days(hypercare_assignments, week_dates, week_days, day_shifts, catalog)
+
     # Generate daily assignments
     daily_assignments = []
     
     for i, (excel_date, day) in enumerate(zip(week_dates, week_days)):
-        filtered_lists, coverage = get_filtered_shifts(schedule_data, df, excel_date)
+        filtered_lists, coverage = day_shifts[i]
         hypercare_today = hypercare_assignments[i]
 
         # Mark hypercare assignments FIRST (so they're excluded from other tasks)
-        for person in hypercare_today:
-            mark_employee_assigned(person, "hypercare", str(excel_date))
+        mark_many([(person, "hypercare", str(excel_date)) for person in hypercare_today])
 
 
         # SIM - one per shift slot
@@ -172,6 +262,9 @@ def generate_daily_assignments(schedule_data, df, hypercare_list, custom_require
                 sim_assignments[slot] = "NA"
 
 
+        # Later mid shifts (not in the morning fallback pool); EOD draws from these
+        mid_shift_1130 = [p for p in filtered_lists.get("mid", []) if p not in hypercare_today and p not in filtered_lists.get('morning_fallback', [])]
+
         # === NEW LOGIC: Check if morning fallback is needed ===
         old_mid_sim = sim_assignments.get("mid", None)
         if sim_assignments["morning"] == "NA" and get_eligible_employees(filtered_lists.get("morning_fallback"), "sim", excel_date):
@@ -189,7 +282,7 @@ def generate_daily_assignments(schedule_data, df, hypercare_list, custom_require
             #     mid_shift_1130.remove(old_mid_sim)
             # UNMARK the old mid SIM person
             if old_mid_sim and old_mid_sim != "NA":
-                unmark_employee_assigned(old_mid_sim, "sim", excel_date)
+                unmark_employee_assigned(old_mid_sim, "sim", excel_date, sim_slot="mid")
             if mid_shift_1130:
                 eligible_mid = get_eligible_employees(mid_shift_1130, "sim", excel_date)
                 if eligible_mid:
@@ -242,25 +335,75 @@ def generate_daily_assignments(schedule_data, df, hypercare_list, custom_require
                 EOD_assignment = random.choice(eligible_eod)
                 mark_employee_assigned(EOD_assignment, "eod", str(excel_date))
 
-        # WIMS - everyone working except hypercare
-        all_working = set()
+        daily_assignments.append(_finish_day(
+            excel_date, day, filtered_lists, coverage, catalog,
+            hypercare_today, sim_assignments, DOR_assignment, EOD_assignment
+        ))
+
+    return daily_assignments
+
+
+def _finish_day(excel_date, day, filtered_lists, coverage, catalog, hypercare_today, sim_assignments, dor, eod):
+    """Mark WIMS (everyone working except hypercare) and build the day's assignment dict."""
+    all_working = set()
+    for slot in filtered_lists:
+        all_working.update(filtered_lists.get(slot, []))
+
+    wims_assignments = [p for p in all_working if p not in hypercare_today]
+    mark_many([(person, "wims", excel_date) for person in wims_assignments])
+    return {
+        "date": excel_date,
+        "day": day,
+        "hypercare": hypercare_today,
+        "sim": sim_assignments,
+        "dor": dor,
+        "eod": eod,
+        "wims": list(wims_assignments),
+        "coverage": coverage,
+        # Shift strings of everyone working, for rolling_coverage
+        "shift_times": [t for t in (catalog.shift_time(p, day) for p in sorted(all_working)) if t]
+    }
+
+
+def _mark_day_plan(day_plan, excel_date):
+    """Mark one day's {"hypercare", "sim", "dor", "eod"} choices in a single batch."""
+    batch = [(person, "hypercare", excel_date) for person in day_plan["hypercare"]]
+    batch += [(person, "sim", excel_date, slot) for slot, person in day_plan["sim"].items() if person != "NA"]
+    for task in ("dor", "eod"):
+        if day_plan[task] not in (None, "No DOR"):
+            batch.append((day_plan[task], task, excel_date))
+    mark_many(batch)
+
+
+def _match_days(hypercare_assignments, week_dates, week_days, day_shifts, catalog):
+    """Fill each day's SIM/DOR/EOD seats with match_day, marking as we go so counts carry forward."""
+    daily_assignments = []
+    for hypercare_today, excel_date, day, (filtered_lists, coverage) in zip(
+        hypercare_assignments, week_dates, week_days, day_shifts
+    ):
+        working = set()
         for slot in filtered_lists:
-            all_working.update(filtered_lists.get(slot, []))
-        
-        wims_assignments = [p for p in all_working if p not in hypercare_today]
-        for person in wims_assignments:
-            mark_employee_assigned(person, "wims", excel_date)
-        daily_assignments.append({
-            "date": excel_date,
-            "day": day,
-            "hypercare": hypercare_today,
-            "sim": sim_assignments,
-            "dor": DOR_assignment,
-            "eod": EOD_assignment,
-            "wims": list(wims_assignments),
-            "coverage": coverage
-        })
+            working.update(filtered_lists.get(slot, []))
+        history = {login: get_employee_history(login) or {} for login in working}
+        day_plan = match_day(filtered_lists, history, hypercare_today, dor=day not in ["Sat", "Sun"])
+        day_plan["hypercare"] = hypercare_today
+        _mark_day_plan(day_plan, excel_date)
+        daily_assignments.append(_finish_day(
+            excel_date, day, filtered_lists, coverage, catalog,
+            hypercare_today, day_plan["sim"], day_plan["dor"], day_plan["eod"]
+        ))
+    return daily_assignments
 
+
+def _apply_plan(plan, week_dates, week_days, day_shifts, catalog):
+    """Mark an optimise_week plan and build the daily assignment dicts."""
+    daily_assignments = []
+    for day_plan, excel_date, day, (filtered_lists, coverage) in zip(plan, week_dates, week_days, day_shifts):
+        _mark_day_plan(day_plan, excel_date)
+        daily_assignments.append(_finish_day(
+            excel_date, day, filtered_lists, coverage, catalog,
+            day_plan["hypercare"], day_plan["sim"], day_plan["dor"], day_plan["eod"]
+        ))
     return daily_assignments
 
 
@@ -0,0 +1,66 @@
+import os
+
+# Days for an assignment's weight in a decayed fairness score to halve
+DEFAULT_HALF_LIFE = 90
+HALF_LIFE_DAYS = {"hypercare": 90, "sim": 60, "dor": 60, "eod": 60, "wims": 30}
+
+
+def _env_half_lives():
+    """Per-task overrides from SHIFTSENSE_HALF_LIFE, e.g. "hypercare=45,sim=30"."""
+    overrides = {}
+    for item in os.environ.get("SHIFTSENSE_HALF_LIFE", "").split(","):
+        task, _, days = item.partition("=")
+        if task.strip() and days.strip():
+            overrides[task.strip()] = float(days)
+    return overrides
+
+
+HALF_LIFE_DAYS.update(_env_half_lives())
+
+
+def half_life(task):
+    """Half-life in days for `task` (HALF_LIFE_DAYS, else DEFAULT_HALF_LIFE)."""
+    return HALF_LIFE_DAYS.get(task, DEFAULT_HALF_LIFE)
+
+
+# A decayed counter is [score, ordinal, half_life]: the sum of 0.5 ** (age / half_life)
+# over every assignment, as of day `ordinal`. Adding or removing one assignment and
+# reading the score on any day are O(1); no history is scanned.
+
+def decayed_add(entry, ordinal, half_life, weight=1.0):
+    """
+    Add `weight` (use -1 to remove) for an assignment on day `ordinal`.
+
+    Args:
+        entry (list): [score, ordinal, half_life] or None for an empty counter
+        ordinal (int): Day of the assignment (date.toordinal())
+        half_life (float): Days for the weight to halve
+
+    Returns:
+        list: The updated [score, ordinal, half_life]
+    """
+    if not entry or not entry[0]:
+        return [max(float(weight), 0.0), ordinal, half_life]
+    score, ref, _ = entry
+    if ordinal >= ref:
+        score = score * 0.5 ** ((ordinal - ref) / half_life) + weight
+        ref = ordinal
+    else:
+        score += weight * 0.5 ** ((ref - ordinal) / half_life)
+    return [max(score, 0.0), ref, half_life]
+
+
+def decayed_value(entry, ordinal):
+    """Score of a counter on day `ordinal` (0 for an empty counter)."""
+    if not entry or not entry[0]:
+        return 0.0
+    score, ref, life = entry
+    return score * 0.5 ** ((ordinal - ref) / life)
+
+
+def decayed_from_ordinals(ordinals, half_life):
+    """Build a counter from assignment day ordinals (used once, for existing history)."""
+    entry = [0.0, 0, half_life]
+    for ordinal in sorted(o for o in ordinals if o is not None):
+        entry = decayed_add(entry, ordinal, half_life)
+    return entry
@@ -5,10 +5,11 @@ from datetime import datetime, timedelta
 import random
 from collections import deque
 import io
-import json
-from pathlib import Path
-import math
 import copy
+from input_cache import read_dataframe
+from shift_parser import ShiftBand, classify_shift
+from shift_groups import group_people_by_day
+from assignment_tracker import AssignmentTracker
 
 # Page configuration
 st.set_page_config(
@@ -20,107 +21,6 @@ st.set_page_config(
 st.title("📅 Amazon Rota System Generator")
 st.markdown("Generate weekly task assignments with fair rotation tracking")
 
-# === ASSIGNMENT HISTORY MANAGEMENT ===
-
-class AssignmentTracker:
-    """Track assignment history to ensure fair rotation"""
-    
-    def __init__(self, history_file='assignment_history.json'):
-        self.history_file = history_file
-        self.history = self.load_history()
-    
-    def load_history(self):
-        """Load assignment history from file"""
-        if Path(self.history_file).exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    def save_history(self):
-        """Save assignment history to file"""
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
-    
-    def _key(self, person, task_type):
-        return f"{person}_{task_type}"
-    
-    def get_last_assignment(self, person, task_type):
-        """Get the last assignment date for a person and task type"""
-        key = self._key(person, task_type)
-        if key in self.history and 'last_date' in self.history[key]:
-            try:
-                return datetime.fromisoformat(self.history[key]['last_date'])
-            except:
-                return None
-        return None
-    
-    def get_assignment_count(self, person, task_type, weeks=52):
-        """Get assignment count for a person in the last N weeks (default 52 weeks)"""
-        key = self._key(person, task_type)
-        if key not in self.history:
-            return 0
-        
-        cutoff_date = datetime.now() - timedelta(weeks=weeks)
-        count = 0
-        for date_str in self.history[key].get('dates', []):
-            try:
-                if datetime.fromisoformat(date_str) > cutoff_date:
-                    count += 1
-            except:
-                # handle possible non-iso strings
-                pass
-        return count
-    
-    def record_assignment(self, person, task_type, date):
-        """Record a new assignment"""
-        key = self._key(person, task_type)
-        if key not in self.history:
-            self.history[key] = {'dates': [], 'total_count': 0}
-        
-        date_str = date.isoformat() if isinstance(date, datetime) else date
-        self.history[key]['dates'].append(date_str)
-        self.history[key]['last_date'] = date_str
-        self.history[key]['total_count'] = self.history[key].get('total_count', 0) + 1
-        
-        # Keep only last 52 weeks of history (prevent unbounded growth)
-        cutoff_date = datetime.now() - timedelta(weeks=52)
-        self.history[key]['dates'] = [
-            d for d in self.history[key]['dates']
-            if (lambda ds: (datetime.fromisoformat(ds) > cutoff_date) if isinstance(ds, str) and ds.count("-")>=2 else False)(d)
-        ]
-    
-    def can_assign(self, person, task_type, current_date, min_days_gap=5):
-        """Check if a person can be assigned to a task (enforces min days gap)"""
-        last_assignment = self.get_last_assignment(person, task_type)
-        if last_assignment is None:
-            return True
-        
-        if isinstance(current_date, str):
-            try:
-                current_date = datetime.strptime(current_date, "%a %m/%d/%Y")
-            except:
-                return True
-        
-        days_since_last = (current_date - last_assignment).days
-        # min_days_gap indicates the minimal number of days between assignments.
-        # For "no consecutive days" use min_days_gap=2 (e.g., last = yesterday -> days_since_last=1 -> cannot assign)
-        return days_since_last >= min_days_gap
-    
-    def get_eligible_sorted(self, people_list, task_type, current_date, min_days_gap=5, weeks_for_count=52):
-        """Get eligible people sorted by assignment count (fairness)"""
-        eligible = []
-        for person in people_list:
-            if self.can_assign(person, task_type, current_date, min_days_gap):
-                count = self.get_assignment_count(person, task_type, weeks=weeks_for_count)
-                eligible.append((person, count))
-        
-        # Sort by count (ascending) - people with fewer assignments first
-        eligible.sort(key=lambda x: (x[1], x[0]))
-        return [person for person, count in eligible]
-
 # === SHIFT LEGENDS === (unchanged)
 SHIFT_LEGENDS = {
     'A': {'description': 'AM Shift', 'time': '09:30-18:00', 'type': 'Morning'},
@@ -151,6 +51,20 @@ SHIFT_LEGENDS = {
     'AEW': {'description': 'Associate Experience week', 'time': 'Variable', 'type': 'NA'}
 }
 
+# Classes for shift times not in the legend, by start time (minutes since midnight)
+SHIFT_BANDS = (
+    ShiftBand("Morning", 0, 10 * 60 + 59),
+    ShiftBand("Mid", 11 * 60, 13 * 60 + 59),
+    ShiftBand("Night", 14 * 60, 24 * 60),
+)
+
+# Status -> rota group
+SHIFT_GROUPS = {
+    "morning": (("morning",), ()),
+    "mid": (("mid",), ()),
+    "night": (("night",), ()),
+}
+
 def get_shift_type(shift_str):
     """Classify shift as Morning, Mid, Night, Holiday, Off, or NA"""
     if pd.isna(shift_str) or str(shift_str).strip() == "":
@@ -162,23 +76,7 @@ def get_shift_type(shift_str):
         return SHIFT_LEGENDS[shift_str]['type']
     
     # Check for time-based shifts
-    if '11:30' in shift_str or '11-30' in shift_str:
-        return "Mid"
-    elif '14:00' in shift_str or '14-00' in shift_str or '14:30' in shift_str:
-        return "Night"
-    elif '09:30' in shift_str or '9:30' in shift_str or '8-9:30' in shift_str or '8-' in shift_str:
-        return "Morning"
-    
-    return "NA"
-
-def get_shift_value(row, day_col):
-    """Return the shift status for a row and day column"""
-    val = row.get(day_col, "")
-    if pd.isna(val):
-        return ""
-    if isinstance(val, str):
-        return val.strip()
-    return val
+    return classify_shift(shift_str, SHIFT_BANDS) or "NA"
 
 def extract_dates_from_schedule(df):
     """Automatically extract dates from the uploaded schedule"""
@@ -265,66 +163,15 @@ def select_people_for_slots(tracker, candidates, task_type, current_date, slots=
     Select `slots` people from `candidates` for the given task_type using tracker:
       - prefer people who are eligible (respecting min_days_gap)
       - prefer people with the fewest assignments in the last `weeks_for_count` weeks
-      - enforce soft per-person max based on number of candidates and total_slots (week-level)
-    `total_slots` should reflect the total number of identical slots across the rota (e.g. number of days).
+      - break ties at random; if nobody meets min_days_gap, relax it to 0
+    `total_slots` is kept for callers; fewest-first order already fills from
+    people under the old per-person soft max first.
     Returns list of selected people (length <= slots).
     """
-    candidates = list(candidates)
-    if not candidates:
-        return []
-    
-    num_people = len(candidates)
-    if num_people == 0:
-        return []
-    
-    # Compute soft max per-person across the rota
-    soft_max = max(1, math.ceil(total_slots / num_people))
-    
-    # get eligible sorted by count
-    eligible = tracker.get_eligible_sorted(candidates, task_type, current_date, min_days_gap=min_days_gap, weeks_for_count=weeks_for_count)
-    # ADD THIS SECTION after getting eligible list
-    # Group by count, then shuffle within each group
-    count_groups = {}
-    for person in eligible:
-        count = tracker.get_assignment_count(person, task_type, weeks=weeks_for_count)
-        if count not in count_groups:
-            count_groups[count] = []
-        count_groups[count].append(person)
-
-    # Shuffle each group and rebuild eligible list
-    randomized_eligible = []
-    for count in sorted(count_groups.keys()):
-        group = count_groups[count]
-        random.shuffle(group)  # RANDOMIZE within same count
-        randomized_eligible.extend(group)
-
-    eligible = randomized_eligible
-
-    if not eligible:
-        # if nobody is eligible (because of gap), relax the gap constraint
-        eligible = tracker.get_eligible_sorted(candidates, task_type, current_date, min_days_gap=0, weeks_for_count=weeks_for_count)
-        if not eligible:
-            return []
-    
-    # filter by those below soft_max first
-    under_limit = [p for p in eligible if tracker.get_assignment_count(p, task_type, weeks=weeks_for_count) < soft_max]
-    
-    chosen = []
-    # fill from under_limit first
-    for p in under_limit:
-        if len(chosen) >= slots:
-            break
-        chosen.append(p)
-    
-    # if still slots left, fill from remaining eligible
-    if len(chosen) < slots:
-        remaining = [p for p in eligible if p not in chosen]
-        for p in remaining:
-            if len(chosen) >= slots:
-                break
-            chosen.append(p)
-    
-    return chosen
+    return tracker.select(
+        candidates, task_type, current_date, slots=slots,
+        gaps=(min_days_gap, 0), weeks_for_count=weeks_for_count,
+    )
 
 def create_task_by_day_table_with_tracking(holiday_off_df, hypercare_list, hyd_team, days_of_week, break_table_text, tracker):
     """Creates the rota table with fair rotation tracking"""
@@ -352,6 +199,9 @@ def create_task_by_day_table_with_tracking(holiday_off_df, hypercare_list, hyd_t
     total_sim_am_slots = total_days
     total_sim_pm_slots = total_days
     total_sim_night_slots = total_days  # night coverage attempt each day (weekend fallback allowed)
+
+    # Working people per shift group for every day, in one pass over holiday_off_df
+    day_groups = group_people_by_day(holiday_off_df, SHIFT_GROUPS)
     
     for day_index, day in enumerate(days_of_week):
         day_name = day.split()[0]
@@ -363,11 +213,6 @@ def create_task_by_day_table_with_tracking(holiday_off_df, hypercare_list, hyd_t
         except:
             current_date = datetime.now() + timedelta(days=day_index)
         
-        morning_shift_people = []
-        mid_shift_people = []
-        night_shift_people = []
-        all_working = []
-        
         # find correct column in holiday_off_df
         if day not in holiday_off_df.columns:
             matches = [c for c in holiday_off_df.columns if c.startswith(day_name)]
@@ -379,20 +224,10 @@ def create_task_by_day_table_with_tracking(holiday_off_df, hypercare_list, hyd_t
         else:
             day_col = day
         
-        for _, row in holiday_off_df.iterrows():
-            person = row.name
-            shift_status = get_shift_value(row, day_col)
-            
-            if isinstance(shift_status, str):
-                if shift_status.lower() == 'morning':
-                    morning_shift_people.append(person)
-                    all_working.append(person)
-                elif shift_status.lower() == 'mid':
-                    mid_shift_people.append(person)
-                    all_working.append(person)
-                elif shift_status.lower() == 'night':
-                    night_shift_people.append(person)
-                    all_working.append(person)
+        morning_shift_people = list(day_groups[day_col]["morning"])
+        mid_shift_people = list(day_groups[day_col]["mid"])
+        night_shift_people = list(day_groups[day_col]["night"])
+        all_working = list(day_groups[day_col]["all_working"])
         
         daily_assigned[day] = set()
         assignments = {
@@ -526,29 +361,14 @@ def create_daily_statistics_table(holiday_off_df, task_table, days_of_week):
         if day_col is None:
             continue
         
-        working_count = 0
-        holiday_count = 0
-        off_count = 0
-        morning_count = 0
-        mid_count = 0
-        night_count = 0
-        
-        for idx, row in holiday_off_df.iterrows():
-            shift_type = row.get(day_col, "Off")
-            
-            if shift_type == "Morning":
-                morning_count += 1
-                working_count += 1
-            elif shift_type == "Mid":
-                mid_count += 1
-                working_count += 1
-            elif shift_type == "Night":
-                night_count += 1
-                working_count += 1
-            elif shift_type == "Holiday":
-                holiday_count += 1
-            elif shift_type == "Off":
-                off_count += 1
+        # One vectorised count over the day column instead of a row-by-row loop
+        status_counts = holiday_off_df[day_col].value_counts()
+        morning_count = int(status_counts.get("Morning", 0))
+        mid_count = int(status_counts.get("Mid", 0))
+        night_count = int(status_counts.get("Night", 0))
+        working_count = morning_count + mid_count + night_count
+        holiday_count = int(status_counts.get("Holiday", 0))
+        off_count = int(status_counts.get("Off", 0))
         
         task_row = task_table[task_table['Day'] == day]
         
@@ -620,15 +440,8 @@ uploaded_file = st.sidebar.file_uploader("Upload Schedule CSV", type=['csv', 'xl
 
 if uploaded_file is not None:
     try:
-        if uploaded_file.name.endswith('.csv'):
-            # try default separator
-            try:
-                df = pd.read_csv(uploaded_file)
-            except Exception:
-                uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+        # CSV or Excel, cached by content hash across reruns
+        df = read_dataframe(uploaded_file)
         st.sidebar.success("✅ File loaded successfully!")
     except Exception as e:
         st.sidebar.error(f"❌ Error reading file: {str(e)}")
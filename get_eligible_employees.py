@@ -1,129 +1,798 @@
+import bisect
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 
+from fairness_decay import decayed_add, decayed_from_ordinals, decayed_value, half_life
+
 FILE = "task_data.json"
+# Storage engine: "json" (task_data.json), "sqlite" (task_data.db, see sqlite_store.py)
+# or "journal" (task_data.json snapshot + append-only journal, see journal_store.py)
+STORAGE_ENGINE = os.environ.get("SHIFTSENSE_STORAGE", "json")
+# Fairness order within a cycle: "lifetime" (total_counts) or "decayed" (recent
+# assignments weigh more, see fairness_decay.py for the per-task half-lives)
+FAIRNESS_MODE = os.environ.get("SHIFTSENSE_FAIRNESS", "lifetime")
 TASKS = ["hypercare", "sim", "dor", "wims", "eod"]
+SIM_SLOTS = ["morning", "mid", "night", "midnight"]
+
+# Store shared by every module-level call while a task_store_session() is open
+_active_store = None
+
+
+def _empty_data():
+    return {"employees": {}, "date_assignments": {}, "task_cycles": {}}
+
+
+def _new_employee_record():
+    return {
+        "history": {},  # {date: [tasks]}
+        "total_counts": {t: 0 for t in TASKS},  # Lifetime counts
+        "task_epochs": {},  # {task: task_cycles epoch it was last done in}
+        # "decayed_counts": {task: [score, ordinal, half_life]} is added in
+        # decayed fairness mode only, see fairness_decay.py
+    }
+
+
+def _migrate_task_flags(data):
+    """
+    Convert pre-epoch records in place: task_flags {task: bool} becomes
+    task_epochs, with done-this-cycle mapped to the task's current epoch and
+    not-done to the epoch before it. Returns `data`.
+    """
+    cycles = data.setdefault("task_cycles", {})
+    for record in data.get("employees", {}).values():
+        flags = record.pop("task_flags", None)
+        if flags is None:
+            continue
+        epochs = record.setdefault("task_epochs", {})
+        for task, done in flags.items():
+            cycle = cycles.get(task, 0)
+            epochs.setdefault(task, cycle if done else cycle - 1)
+    return data
+
+
+def _new_day_record():
+    return {
+        "hypercare": [],
+        "sim": {slot: None for slot in SIM_SLOTS},  # ✅ DICT with slots
+        "dor": None,
+        "wims": [],  # List for multiple people
+        "eod": None
+    }
+
+
+def _iter_day_assignments(day):
+    """
+    Yield (task, employee, sim_slot) for every person recorded on one date entry.
+    Handles the list (hypercare, wims), dict (sim) and single value (dor, eod) layouts.
+    """
+    for task, assigned in day.items():
+        if isinstance(assigned, dict):
+            for slot, employee in assigned.items():
+                if employee:
+                    yield task, employee, slot
+        elif isinstance(assigned, list):
+            for employee in assigned:
+                if employee:
+                    yield task, employee, None
+        elif assigned:
+            yield task, assigned, None
+
+
+def _normalise_batch(assignments):
+    """
+    Turn (login, task, date, slot) / (login, task, date) items into 4-tuples.
+
+    Returns:
+        list or None: Normalised tuples, or None if any SIM item has no slot
+    """
+    batch = []
+    for item in assignments:
+        login, task, date_str = item[0], item[1], str(item[2])
+        slot = item[3] if len(item) > 3 else None
+        if task == "sim" and not slot:
+            print(f"❌ ERROR: sim_slot required for SIM task ({login} on {date_str})! Nothing was applied.")
+            return None
+        batch.append((login, task, date_str, slot))
+    return batch
+
+
+def date_to_ordinal(value):
+    """'DD/MM/YYYY' (or a date/datetime) -> proleptic Gregorian ordinal, or None if it is not a date."""
+    if hasattr(value, "toordinal"):
+        return value.toordinal()
+    try:
+        return datetime.strptime(str(value), "%d/%m/%Y").toordinal()
+    except ValueError:
+        return None
+
+
+def _require_ordinal(value):
+    date_ord = date_to_ordinal(value)
+    if date_ord is None:
+        raise ValueError(f"Expected a DD/MM/YYYY date, got {value!r}")
+    return date_ord
+
+
+def _has_assignee(assigned):
+    """True if a date_assignments value (list, slot dict or single login) names anyone."""
+    if isinstance(assigned, dict):
+        return any(assigned.values())
+    return bool(assigned)
+
+
+def _date_span(date_strs):
+    """(earliest, latest) of a non-empty list of DD/MM/YYYY dates, for the *_between queries."""
+    return min(date_strs, key=_require_ordinal), max(date_strs, key=_require_ordinal)
+
+
+class DateIndex:
+    """
+    Sorted index over DD/MM/YYYY keys, so date ranges can be answered with
+    two binary searches instead of parsing every key.
+
+    Keys that are not dates are kept aside in insertion order (`undated`).
+    """
+
+    def __init__(self, date_strs=()):
+        # Parse every key once and sort once; add/discard keep it sorted after
+        keys = set()
+        undated = {}
+        for date_str in date_strs:
+            date_ord = date_to_ordinal(date_str)
+            if date_ord is None:
+                undated[date_str] = None
+            else:
+                keys.add((date_ord, date_str))
+        self.keys = sorted(keys)
+        self.undated = list(undated)
+
+    def add(self, date_str):
+        date_ord = date_to_ordinal(date_str)
+        if date_ord is None:
+            if date_str not in self.undated:
+                self.undated.append(date_str)
+            return
+        key = (date_ord, date_str)
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            self.keys.insert(i, key)
+
+    def discard(self, date_str):
+        date_ord = date_to_ordinal(date_str)
+        if date_ord is None:
+            if date_str in self.undated:
+                self.undated.remove(date_str)
+            return
+        key = (date_ord, date_str)
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def between(self, start=None, end=None):
+        """
+        Date strings from `start` to `end` (both inclusive), oldest first.
+        A missing bound leaves that side of the range open.
+        """
+        lo, hi = 0, len(self.keys)
+        if start is not None:
+            lo = bisect.bisect_left(self.keys, (_require_ordinal(start),))
+        if end is not None:
+            hi = bisect.bisect_left(self.keys, (_require_ordinal(end) + 1,))
+        return [date_str for _ord, date_str in self.keys[lo:hi]]
+
+
+def _atomic_write_json(path, data):
+    """Write JSON to a temp file next to `path` and swap it in, so readers never see a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".task_data.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class TaskStore:
+    """
+    In-memory view of task_data.json.
+
+    The file is read once when the store is created. Every read and mutation
+    after that is served from memory, and flush() writes the result back with
+    a single atomic replace (only if something changed).
+
+    Date range queries go through DateIndex objects over date_assignments and
+    each employee's history. They are built on first use, kept in step by the
+    store's own methods and dropped by replace_data(). Week lookups and
+    clear_week use the same index, so they only visit days inside the week.
+
+    Fairness cycles are epochs: data["task_cycles"][task] is the current
+    epoch and each employee's task_epochs[task] the epoch they last did the
+    task in. An employee has done a task "this cycle" when the two match, so
+    starting a new cycle for everyone is a single increment.
+    """
+
+    def __init__(self, path=None, data=None):
+        """
+        Args:
+            path (str): JSON file backing the store. Defaults to FILE.
+                        Pass path=False for a purely in-memory store.
+            data (dict): Optional already-loaded data (skips reading the file)
+        """
+        self.path = FILE if path is None else path
+        self.data = _migrate_task_flags(data if data is not None else self._load())
+        self.dirty = False
+        self._day_index = None
+        self._history_index = {}
+
+    def _load(self):
+        """Load task data from JSON file, or initialize if file does not exist."""
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                return json.load(f)
+        return _empty_data()
+
+    def flush(self):
+        """
+        Write pending changes to disk.
+
+        Returns:
+            bool: True if the file was written
+        """
+        if not self.dirty or not self.path:
+            return False
+        _atomic_write_json(self.path, self.data)
+        self.dirty = False
+        return True
+
+    def replace_data(self, data):
+        """Swap the whole in-memory document (used by save_data/import/clear)."""
+        self.data = _migrate_task_flags(data)
+        self.dirty = True
+        self._day_index = None
+        self._history_index = {}
+
+    @property
+    def employees(self):
+        return self.data.setdefault("employees", {})
+
+    @property
+    def date_assignments(self):
+        return self.data.setdefault("date_assignments", {})
+
+    def day_index(self):
+        """DateIndex over date_assignments."""
+        if self._day_index is None:
+            self._day_index = DateIndex(self.date_assignments)
+        return self._day_index
+
+    def history_index(self, employee):
+        """DateIndex over one employee's history."""
+        index = self._history_index.get(employee)
+        if index is None:
+            record = self.employees.get(employee, {})
+            index = self._history_index[employee] = DateIndex(record.get("history", {}))
+        return index
+
+    def _history_dates_changed(self, employee, date_str, present):
+        index = self._history_index.get(employee)
+        if index is not None:
+            if present:
+                index.add(date_str)
+            else:
+                index.discard(date_str)
+
+    def _day_dates_changed(self, date_str, present):
+        if self._day_index is not None:
+            if present:
+                self._day_index.add(date_str)
+            else:
+                self._day_index.discard(date_str)
+
+    def cycle(self, task):
+        """Current fairness epoch for `task`."""
+        return self.data.setdefault("task_cycles", {}).get(task, 0)
+
+    def has_done(self, record, task):
+        """True if the employee record has done `task` in the current cycle."""
+        return record.get("task_epochs", {}).get(task, -1) >= self.cycle(task)
+
+    def _set_done(self, record, task, done):
+        cycle = self.cycle(task)
+        record.setdefault("task_epochs", {})[task] = cycle if done else cycle - 1
+
+    def decayed_entry(self, record, task):
+        """
+        record's decayed counter for `task`. Built from history the first time
+        (or when the task's half-life has changed), then kept up to date by
+        mark/unmark.
+        """
+        life = half_life(task)
+        entries = record.setdefault("decayed_counts", {})
+        entry = entries.get(task)
+        if entry is None or entry[2] != life:
+            entry = decayed_from_ordinals(
+                [date_to_ordinal(d) for d, tasks in record["history"].items() if task in tasks], life
+            )
+            entries[task] = entry
+        return entry
+
+    def _bump_decayed(self, record, task, date_str, weight):
+        # Call before history changes, so a first-time rebuild doesn't count date_str twice
+        if FAIRNESS_MODE != "decayed":
+            # Only kept in decayed mode; drop a counter left by an earlier
+            # decayed-mode run so it is rebuilt from history if that mode returns
+            record.get("decayed_counts", {}).pop(task, None)
+            return
+        date_ord = date_to_ordinal(date_str)
+        if date_ord is None:
+            return
+        entry = self.decayed_entry(record, task)
+        record["decayed_counts"][task] = decayed_add(entry, date_ord, entry[2], weight)
+
+    def task_flags(self, record):
+        """{task: done this cycle} for an employee record, as the old task_flags."""
+        epochs = record.get("task_epochs", {})
+        tasks = TASKS + [t for t in epochs if t not in TASKS]
+        return {task: self.has_done(record, task) for task in tasks}
+
+    def ensure_employee(self, employee):
+        """Create an empty record for `employee` if missing. Returns the record."""
+        all_employees = self.employees
+        if employee not in all_employees:
+            all_employees[employee] = _new_employee_record()
+            self.dirty = True
+        return all_employees[employee]
+
+    def _ensure_day(self, date_str):
+        date_assignments = self.date_assignments
+        if date_str not in date_assignments:
+            date_assignments[date_str] = _new_day_record()
+            self._day_dates_changed(date_str, True)
+        return date_assignments[date_str]
+
+    def mark(self, employee, task, date_str, sim_slot=None):
+        """Record one assignment. See mark_employee_assigned for the rules."""
+        date_str = str(date_str)
+
+        if task == "sim" and not sim_slot:
+            print(f"❌ ERROR: sim_slot required for SIM task! Use sim_slot='morning'|'mid'|'night'|'midnight'")
+            return False
+
+        record = self.ensure_employee(employee)
+        day = self._ensure_day(date_str)
+
+        # ✅ Record assignment for this date
+        if task == "sim":
+            # Make sure sim is a dict
+            if not isinstance(day["sim"], dict):
+                day["sim"] = {slot: None for slot in SIM_SLOTS}
+
+            # Assign to specific slot
+            day["sim"][sim_slot] = employee
+            print(f"✅ Marked {employee} for SIM ({sim_slot}) on {date_str}")
+
+        elif task in ("wims", "hypercare"):
+            # WIMS and hypercare are lists of multiple people
+            if not isinstance(day.get(task), list):
+                day[task] = []
+
+            if employee not in day[task]:
+                day[task].append(employee)
+            print(f"✅ Marked {employee} for {task} on {date_str}")
+
+        else:
+            # Other tasks ( dor, eod) are single values
+            day[task] = employee
+            print(f"✅ Marked {employee} for {task} on {date_str}")
+
+        self._bump_decayed(record, task, date_str, 1)
+
+        # Update history
+        if date_str not in record["history"]:
+            self._history_dates_changed(employee, date_str, True)
+        history = record["history"].setdefault(date_str, [])
+        if task not in history:
+            history.append(task)
+
+        # Update lifetime count
+        record["total_counts"][task] = record["total_counts"].get(task, 0) + 1
+
+        # Employee has done this task in the current cycle
+        self._set_done(record, task, True)
+
+        self.dirty = True
+        return True
+
+    def unmark(self, employee, task, date_str, sim_slot=None):
+        """Remove one assignment. See unmark_employee_assigned for the rules."""
+        all_employees = self.employees
+        date_assignments = self.date_assignments
+        date_str = str(date_str)
+
+        # Check if employee exists
+        if employee not in all_employees:
+            print(f"⚠️ Employee {employee} not found in records")
+            return False
+
+        if task == "sim" and not sim_slot:
+            print(f"❌ ERROR: sim_slot required to unmark SIM! Use sim_slot='morning'|'mid'|'night'|'midnight'")
+            return False
+
+        record = all_employees[employee]
+        self._bump_decayed(record, task, date_str, -1)
+
+        # Remove from history
+        if date_str in record["history"]:
+            if task in record["history"][date_str]:
+                record["history"][date_str].remove(task)
+                # If no tasks left for this date, remove the date entry
+                if not record["history"][date_str]:
+                    del record["history"][date_str]
+                    self._history_dates_changed(employee, date_str, False)
+
+        # Decrement lifetime count
+        if record["total_counts"].get(task, 0) > 0:
+            record["total_counts"][task] -= 1
+
+        # They no longer count as having done it this cycle
+        self._set_done(record, task, False)
+
+        # Remove from date_assignments
+        if date_str in date_assignments:
+            day = date_assignments[date_str]
+            if task == "sim":
+                # SIM is a dict with slots
+                if isinstance(day.get("sim"), dict):
+                    if day["sim"].get(sim_slot) == employee:
+                        day["sim"][sim_slot] = None
+            elif task in ("wims", "hypercare"):
+                if isinstance(day.get(task), list):
+                    if employee in day[task]:
+                        day[task].remove(employee)
+            else:
+                # Other tasks are single values
+                if day.get(task) == employee:
+                    day[task] = None
+
+        self.dirty = True
+        print(f"✅ Unmarked {employee} from {task} on {date_str}")
+        return True
+
+    def mark_many(self, assignments):
+        """
+        Mark a batch of (login, task, date, slot) assignments.
+        The batch is validated first, so either every item is applied or none is.
+        """
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+        for login, task, date_str, slot in batch:
+            self.mark(login, task, date_str, sim_slot=slot)
+        return True
+
+    def unmark_many(self, assignments):
+        """Unmark a batch of (login, task, date, slot) assignments."""
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+        for login, task, date_str, slot in batch:
+            self.unmark(login, task, date_str, sim_slot=slot)
+        return True
+
+    def replace_day(self, date_str, assignments):
+        """
+        Make `assignments` the complete set for one date: undo whatever was
+        recorded for it (history, counts, flags) and mark the new set.
+        """
+        date_str = str(date_str)
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+        if any(d != date_str for _login, _task, d, _slot in batch):
+            print(f"❌ ERROR: replace_day({date_str}) got assignments for other dates. Nothing was applied.")
+            return False
+        self.clear_week([date_str])
+        # Keep an (empty) entry even if the new set is empty
+        self._ensure_day(date_str)
+        self.dirty = True
+        for login, task, d, slot in batch:
+            self.mark(login, task, d, sim_slot=slot)
+        return True
+
+    def clear_week(self, week_dates):
+        """Clear assignments (and undo their counts/flags) for the given dates."""
+        all_employees = self.employees
+        date_assignments = self.date_assignments
+
+        week_dates_str = [str(d) for d in week_dates]
+        if not week_dates_str:
+            return week_dates_str
+
+        # Only the recorded days inside the week, found through the date index
+        wanted = set(week_dates_str)
+        recorded = [d for d in self.day_index().between(*_date_span(week_dates_str)) if d in wanted]
+
+        for date_str in recorded:
+            for task, employee, _slot in _iter_day_assignments(date_assignments[date_str]):
+                record = all_employees.get(employee)
+                if record is None:
+                    continue
+                self._bump_decayed(record, task, date_str, -1)
+
+                # Remove from history
+                tasks_on_date = record["history"].get(date_str)
+                if tasks_on_date and task in tasks_on_date:
+                    tasks_on_date.remove(task)
+                    if not tasks_on_date:
+                        del record["history"][date_str]
+                        self._history_dates_changed(employee, date_str, False)
+
+                # Decrement their count
+                if record["total_counts"].get(task, 0) > 0:
+                    record["total_counts"][task] -= 1
+
+                # They no longer count as having done it this cycle
+                self._set_done(record, task, False)
+
+            # Clear this date's assignments
+            del date_assignments[date_str]
+            self._day_dates_changed(date_str, False)
+            self.dirty = True
+
+        return week_dates_str
+
+    def eligible(self, available_today, task, date_str):
+        """Cycle-aware eligibility. See get_eligible_employees for the rules."""
+        all_employees = self.employees
+        for e in available_today:
+            self.ensure_employee(e)
+
+        # Get employees who haven't done this task yet in the current cycle
+        not_done_yet = [
+            e for e in available_today
+            if not self.has_done(all_employees[e], task)
+        ]
+
+        # If everyone available has done it, start them over (only them, so the
+        # rest of the team keeps its place in the cycle)
+        if not not_done_yet:
+            for emp in available_today:
+                self._set_done(all_employees[emp], task, False)
+            if available_today:
+                self.dirty = True
+            # Now everyone is available
+            not_done_yet = available_today[:]
+
+        today = date_to_ordinal(date_str)
+        if FAIRNESS_MODE == "decayed" and today is not None:
+            # Sort by decayed count (least assigned recently first)
+            not_done_yet.sort(
+                key=lambda e: decayed_value(self.decayed_entry(all_employees[e], task), today)
+            )
+        else:
+            # Sort by lifetime count (least assigned first)
+            not_done_yet.sort(
+                key=lambda e: all_employees[e]["total_counts"].get(task, 0)
+            )
+        return not_done_yet
+
+    def date_assignment(self, date_str, task):
+        day = self.date_assignments.get(str(date_str))
+        if day is None:
+            return None
+        return day.get(task, None)
+
+    def clear_date(self, date_str):
+        date_str = str(date_str)
+        if date_str in self.date_assignments:
+            del self.date_assignments[date_str]
+            self._day_dates_changed(date_str, False)
+            self.dirty = True
+
+    def reset_cycle(self, task):
+        # Everyone's task_epochs now lag the current epoch - no per-employee writes
+        cycles = self.data.setdefault("task_cycles", {})
+        cycles[task] = cycles.get(task, 0) + 1
+        self.dirty = True
+
+    def stats(self, task=None):
+        stats = {}
+        for emp, info in self.employees.items():
+            if task:
+                stats[emp] = info["total_counts"].get(task, 0)
+            else:
+                stats[emp] = info["total_counts"]
+        return stats
+
+    def employee_history(self, employee):
+        record = self.employees.get(employee)
+        if record is None:
+            return None
+        return dict(record, task_flags=self.task_flags(record))
+
+    def week_assignments(self, week_dates):
+        week_dates = [str(d) for d in week_dates]
+        if not week_dates:
+            return {}
+        found = self.assignments_between(*_date_span(week_dates))
+        return {d: found[d] for d in week_dates if d in found}
+
+    def assignments_between(self, start=None, end=None, task=None):
+        """
+        Day records from `start` to `end` (inclusive), oldest first.
+        With `task`, only that task's value for days where someone holds it.
+        """
+        date_assignments = self.date_assignments
+        found = {}
+        for date_str in self.day_index().between(start, end):
+            day = date_assignments[date_str]
+            if task is None:
+                found[date_str] = day
+            elif _has_assignee(day.get(task)):
+                found[date_str] = day[task]
+        return found
+
+    def login_assignments_between(self, login, start=None, end=None, task=None):
+        record = self.employees.get(login)
+        if record is None:
+            return []
+        history = record["history"]
+        return [
+            (date_str, t)
+            for date_str in self.history_index(login).between(start, end)
+            for t in history[date_str]
+            if task is None or t == task
+        ]
+
+    def task_counts_between(self, start=None, end=None, task=None):
+        """{login: assignments held from `start` to `end`}, optionally for one task."""
+        counts = {}
+        for day in self.assignments_between(start, end).values():
+            for t, employee, _slot in _iter_day_assignments(day):
+                if task is None or t == task:
+                    counts[employee] = counts.get(employee, 0) + 1
+        return counts
+
+    def search_login(self, login):
+        record = self.employees.get(login)
+        if record is None:
+            return []
+        # Keys that are not dates sort last, as before
+        found = self.login_assignments_between(login)
+        history = record["history"]
+        found.extend((date_str, task) for date_str in self.history_index(login).undated for task in history[date_str])
+        return found
+
+    def close(self):
+        pass
+
+
+def open_task_store(path=None):
+    """
+    Open the store for the configured STORAGE_ENGINE.
+
+    Args:
+        path (str): Optional file override (JSON file or SQLite database)
+    """
+    if STORAGE_ENGINE == "sqlite":
+        from sqlite_store import open_sqlite_store
+        return open_sqlite_store(path)
+    if STORAGE_ENGINE == "journal":
+        from journal_store import JournalTaskStore
+        return JournalTaskStore(path)
+    return TaskStore(path)
+
+
+@contextmanager
+def _writable_store():
+    """
+    Store to overwrite wholesale (save/import/clear) without reading the old
+    JSON first. Outside a session it is flushed and closed when the block exits.
+    """
+    if _active_store is not None or STORAGE_ENGINE != "json":
+        with task_store_session() as store:
+            yield store
+        return
+    store = TaskStore(data=_empty_data())
+    yield store
+    store.flush()
+
+
+@contextmanager
+def task_store_session(path=None, store=None):
+    """
+    Load task_data.json once and serve every call in this module from memory
+    until the block exits, then flush with a single atomic write.
+
+    If the block raises, nothing is written. Nested sessions reuse the outer store.
+
+    Args:
+        path (str): Optional file override (JSON file or SQLite database)
+        store: Serve calls from this store instead (e.g. TaskStore(path=False,
+               data=snapshot) for a trial run). It replaces any outer session's
+               store until the block exits and is flushed but not closed.
+
+    Usage:
+        with task_store_session():
+            assignments = generate_daily_assignments(...)
+    """
+    global _active_store
+    if store is not None:
+        outer = _active_store
+        _active_store = store
+        try:
+            yield store
+            store.flush()
+        finally:
+            _active_store = outer
+        return
+
+    if _active_store is not None:
+        yield _active_store
+        return
+
+    store = open_task_store(path)
+    _active_store = store
+    try:
+        yield store
+        store.flush()
+    finally:
+        _active_store = None
+        store.close()
+
 
 def load_data():
     """Load task data from JSON file, or initialize if file does not exist."""
+    if _active_store is not None:
+        return _active_store.data
+    if STORAGE_ENGINE != "json":
+        with task_store_session() as store:
+            return store.data
     if os.path.exists(FILE):
         with open(FILE, "r") as f:
-            return json.load(f)
-    return {"employees": {}, "date_assignments": {}, "task_cycles": {}}
+            return _migrate_task_flags(json.load(f))
+    return _empty_data()
 
 def save_data(data):
     """Save task data to JSON file."""
-    with open(FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    with _writable_store() as store:
+        store.replace_data(data)
 
 def add_employees_from_list(data, employee_list):
     """
     Ensure all employees in employee_list exist in the JSON.
     """
     all_employees = data["employees"]
-    
+
     for e in employee_list:
         if e not in all_employees:
-            all_employees[e] = {
-                "history": {},  # {date: [tasks]}
-                "total_counts": {t: 0 for t in TASKS},  # Lifetime counts
-                "task_flags": {t: False for t in TASKS}  # Has done task this cycle
-            }
-    
+            all_employees[e] = _new_employee_record()
+
     return data
 def mark_employee_assigned(employee, task, date_str,sim_slot=None):
     """
     After choosing an employee for a task:
     - Record assignment for this date
     - Increment their lifetime task count
-    - Set their flag to True for this task (they've done it this cycle)
-    
+    - Record that they've done this task in the current cycle
+
     Args:
         employee (str): Employee login
         task (str): Task type (hypercare, sim, dor, wims, eod)
         date_str (str): Date in DD/MM/YYYY format
         sim_slot (str): For SIM tasks ONLY - the slot (morning, mid, night, midnight)
     """
-    data = load_data()
-    all_employees = data["employees"]
-    date_assignments = data["date_assignments"]
-    
-    # Ensure employee exists
-    if employee not in all_employees:
-        all_employees[employee] = {
-            "history": {},
-            "total_counts": {t: 0 for t in TASKS},
-            "task_flags": {t: False for t in TASKS}
-        }
-    
-    date_str = str(date_str)
-    
-    # Initialize date if needed
-    if date_str not in date_assignments:
-        date_assignments[date_str] = {
-            "hypercare": [],
-            "sim": {"morning": None, "mid": None, "night": None, "midnight": None},  # ✅ DICT with slots
-            "dor": None,
-            "wims": [],  # List for multiple people
-            "eod": None
-        }
-    
-    # ✅ Record assignment for this date
-    if task == "sim":
-        # SIM MUST have a sim_slot
-        if not sim_slot:
-            print(f"❌ ERROR: sim_slot required for SIM task! Use sim_slot='morning'|'mid'|'night'|'midnight'")
-            return False
-        
-        # Make sure sim is a dict
-        if not isinstance(date_assignments[date_str]["sim"], dict):
-            date_assignments[date_str]["sim"] = {"morning": None, "mid": None, "night": None, "midnight": None}
-        
-        # Assign to specific slot
-        date_assignments[date_str]["sim"][sim_slot] = employee
-        print(f"✅ Marked {employee} for SIM ({sim_slot}) on {date_str}")
-        
-    elif task == "wims":
-        # WIMS is a list of multiple people
-        if not isinstance(date_assignments[date_str]["wims"], list):
-            date_assignments[date_str]["wims"] = []
-        
-        if employee not in date_assignments[date_str]["wims"]:
-            date_assignments[date_str]["wims"].append(employee)
-        print(f"✅ Marked {employee} for WIMS on {date_str}")
-
-    elif task == "hypercare":
-        # WIMS is a list of multiple people
-        if not isinstance(date_assignments[date_str]["hypercare"], list):
-            date_assignments[date_str]["hypercare"] = []
-        
-        if employee not in date_assignments[date_str]["hypercare"]:
-            date_assignments[date_str]["hypercare"].append(employee)
-        print(f"✅ Marked {employee} for hypercare on {date_str}")
-    
-    else:
-        # Other tasks ( dor, eod) are single values
-        date_assignments[date_str][task] = employee
-        print(f"✅ Marked {employee} for {task} on {date_str}")
-    
-    # Update history
-    if date_str not in all_employees[employee]["history"]:
-        all_employees[employee]["history"][date_str] = []
-    
-    if task not in all_employees[employee]["history"][date_str]:
-        all_employees[employee]["history"][date_str].append(task)
-    
-    # Update lifetime count (only once per task per date)
-    if task not in all_employees[employee]["total_counts"]:
-        all_employees[employee]["total_counts"][task] = 0
-    all_employees[employee]["total_counts"][task] += 1
-    
-    # Set flag to True (employee has done this task in current cycle)
-    all_employees[employee]["task_flags"][task] = True
-    
-    save_data(data)
-    return True
+    with task_store_session() as store:
+        result = store.mark(employee, task, date_str, sim_slot=sim_slot)
+    return result
 
 
 def unmark_employee_assigned(employee, task, date_str, sim_slot=None):
@@ -132,76 +801,68 @@ def unmark_employee_assigned(employee, task, date_str, sim_slot=None):
     - Remove from history for that date
     - Decrement their lifetime task count
     - Remove from date_assignments
-    - Reset task flag to False
-    
+    - Mark the task as not done this cycle
+
     Args:
         employee (str): The employee's login name
         task (str): The task type (hypercare, sim, dor, wims, eod)
         date_str (str): Date in DD/MM/YYYY format
         sim_slot (str): For SIM tasks ONLY - the slot (morning, mid, night, midnight)
     """
-    data = load_data()
-    all_employees = data["employees"]
-    date_assignments = data["date_assignments"]
-    
-    date_str = str(date_str)
-    
-    # Check if employee exists
-    if employee not in all_employees:
-        print(f"⚠️ Employee {employee} not found in records")
-        return False
-    
-    # Remove from history
-    if date_str in all_employees[employee]["history"]:
-        if task in all_employees[employee]["history"][date_str]:
-            all_employees[employee]["history"][date_str].remove(task)
-            # If no tasks left for this date, remove the date entry
-            if not all_employees[employee]["history"][date_str]:
-                del all_employees[employee]["history"][date_str]
-    
-    # Decrement lifetime count
-    if task in all_employees[employee]["total_counts"]:
-        if all_employees[employee]["total_counts"][task] > 0:
-            all_employees[employee]["total_counts"][task] -= 1
-    
-    # RESET the task flag to False
-    all_employees[employee]["task_flags"][task] = False
-    
-    # Remove from date_assignments
-    if date_str in date_assignments:
-        if task == "sim":
-            # SIM is a dict with slots
-            if not sim_slot:
-                print(f"❌ ERROR: sim_slot required to unmark SIM!")
-                return False
-            
-            if isinstance(date_assignments[date_str]["sim"], dict):
-                if date_assignments[date_str]["sim"].get(sim_slot) == employee:
-                    date_assignments[date_str]["sim"][sim_slot] = None
-            print(f"✅ Unmarked {employee} from SIM ({sim_slot}) on {date_str}")
-            
-        elif task == "wims":
-            # WIMS is a list
-            if isinstance(date_assignments[date_str]["wims"], list):
-                if employee in date_assignments[date_str]["wims"]:
-                    date_assignments[date_str]["wims"].remove(employee)
-            print(f"✅ Unmarked {employee} from WIMS on {date_str}")
-        elif task == "hypercare":
-            # WIMS is a list
-            if isinstance(date_assignments[date_str]["hypercare"], list):
-                if employee in date_assignments[date_str]["hypercare"]:
-                    date_assignments[date_str]["hypercare"].remove(employee)
-            print(f"✅ Unmarked {employee} from hypercare on {date_str}")
-            
-        else:
-            # Other tasks are single values
-            if date_assignments[date_str].get(task) == employee:
-                date_assignments[date_str][task] = None
-            print(f"✅ Unmarked {employee} from {task} on {date_str}")
-    
-    save_data(data)
-    print(f"✅ Unmarked {employee} from {task} on {date_str}")
-    return True
+    with task_store_session() as store:
+        result = store.unmark(employee, task, date_str, sim_slot=sim_slot)
+    return result
+
+
+def mark_many(assignments):
+    """
+    Mark a whole batch of assignments with a single flush.
+    Keeps history, total_counts, task_epochs and date_assignments consistent,
+    exactly as calling mark_employee_assigned for each item would.
+
+    Args:
+        assignments (list): (login, task, date_str, sim_slot) tuples.
+                            sim_slot may be omitted / None for non-SIM tasks.
+
+    Returns:
+        bool: True if the batch was applied, False if it was rejected
+    """
+    with task_store_session() as store:
+        result = store.mark_many(assignments)
+    return result
+
+
+def unmark_many(assignments):
+    """
+    Unmark a whole batch of assignments with a single flush.
+
+    Args:
+        assignments (list): (login, task, date_str, sim_slot) tuples
+
+    Returns:
+        bool: True if the batch was applied, False if it was rejected
+    """
+    with task_store_session() as store:
+        result = store.unmark_many(assignments)
+    return result
+
+
+def replace_day(date_str, assignments):
+    """
+    Replace everything recorded for one date with a new set of assignments.
+    Previous assignments for the date are undone (history, counts, flags)
+    before the new ones are marked, all in one flush.
+
+    Args:
+        date_str (str): Date in DD/MM/YYYY format
+        assignments (list): (login, task, date_str, sim_slot) tuples for that date
+
+    Returns:
+        bool: True if the day was replaced
+    """
+    with task_store_session() as store:
+        result = store.replace_day(date_str, assignments)
+    return result
 
 
 # ============================================================================
@@ -229,141 +890,87 @@ def unmark_employee_assigned(employee, task, date_str, sim_slot=None):
 
 # Example 6: Unmark a WIMS assignment
 # unmark_employee_assigned("sajidnaz", "wims", "21/12/2025")
+
+# Example 7: Batch a whole generation into one load + one write
+# with task_store_session():
+#     mark_employee_assigned("mariebak", "hypercare", "21/12/2025")
+#     mark_employee_assigned("sajidnaz", "wims", "21/12/2025")
+
+# Example 8: Write a whole day in one call
+# mark_many([("mariebak", "hypercare", "21/12/2025"), ("poshaln", "sim", "21/12/2025", "morning")])
+
+
 def clear_assignments_for_week(week_dates):
     """
     Clear assignments ONLY for the dates in the given week.
     This allows regenerating the same week without clearing other weeks' data.
     Resets employee flags and counts for those specific dates only.
-    
+
     Args:
         week_dates (list): List of date strings in DD/MM/YYYY format
     """
-    data = load_data()
-    all_employees = data["employees"]
-    date_assignments = data["date_assignments"]
-    
-    week_dates_str = [str(d) for d in week_dates]
-    
-    # For each date in this week, clear assignments and reset employee flags
-    for date_str in week_dates_str:
-        if date_str in date_assignments:
-            # Get all employees assigned to this date
-            assignments = date_assignments[date_str]
-            
-            for task, employee in assignments.items():
-                if employee:
-                    # Remove from history
-                    if date_str in all_employees[employee]["history"]:
-                        if task in all_employees[employee]["history"][date_str]:
-                            all_employees[employee]["history"][date_str].remove(task)
-                    
-                    # Decrement their count
-                    if all_employees[employee]["total_counts"][task] > 0:
-                        all_employees[employee]["total_counts"][task] -= 1
-                    
-                    # Reset their flag
-                    all_employees[employee]["task_flags"][task] = False
-            
-            # Clear this date's assignments
-            del date_assignments[date_str]
-    
-    save_data(data)
+    with task_store_session() as store:
+        week_dates_str = store.clear_week(week_dates)
     print(f"✅ Cleared assignments for week: {week_dates_str}")
 
 def get_eligible_employees(available_today, task, date_str):
     """
     Returns a list of employees available today for a specific task.
-    
+
     Logic:
-    1. Filter to employees who haven't done this task YET (flag = False)
-    2. If all have done it (all flags = True), reset flags and use all
+    1. Filter to employees who haven't done this task YET in the current cycle
+    2. If all have done it, start a new cycle for them and use all
     3. Sort by lifetime count (least assigned first)
-    
+
     Args:
         available_today: List of employees working today
         task: The task to assign (hypercare, sim, dor, wims, eod)
         date_str: Date in DD/MM/YYYY format
-    
+
     Returns:
         list: Employees sorted by assignment count (least assigned first)
     """
-    data = load_data()
-    data = add_employees_from_list(data, available_today)
-    
-    all_employees = data["employees"]
-    
-    # Get employees who haven't done this task yet (flag = False)
-    not_done_yet = [
-        e for e in available_today
-        if not all_employees[e]["task_flags"].get(task, True)
-    ]
-    
-    # If everyone has done it (all flags = True), reset all flags for this task
-    if not not_done_yet:
-        for emp in available_today:
-            all_employees[emp]["task_flags"][task] = False
-        # Now everyone is available
-        not_done_yet = available_today[:]
-    
-    # Sort by lifetime count (least assigned first)
-    not_done_yet.sort(
-        key=lambda e: all_employees[e]["total_counts"].get(task, 0)
-    )
-    
-    save_data(data)
-    return not_done_yet
+    with task_store_session() as store:
+        eligible = store.eligible(available_today, task, date_str)
+    return eligible
 
 def get_date_assignment(date_str, task):
     """
     Get who was assigned to a specific task on a specific date.
-    
+
     Args:
         date_str (str): Date in DD/MM/YYYY format
         task (str): Task type (hypercare, sim, dor, wims, eod)
-    
+
     Returns:
         str or None: Employee login name or None if not assigned
     """
-    data = load_data()
-    date_assignments = data["date_assignments"]
-    
-    date_str = str(date_str)
-    if date_str in date_assignments:
-        return date_assignments[date_str].get(task, None)
-    return None
+    with task_store_session() as store:
+        return store.date_assignment(date_str, task)
 
 def clear_date_assignments(date_str):
     """
     Clear all assignments for a specific date.
     Used when regenerating assignments for the same date.
-    
+
     Args:
         date_str (str): Date in DD/MM/YYYY format
     """
-    data = load_data()
-    date_str = str(date_str)
-    
-    if date_str in data["date_assignments"]:
-        del data["date_assignments"][date_str]
-    
-    save_data(data)
+    with task_store_session() as store:
+        store.clear_date(date_str)
     print(f"✅ Cleared all assignments for {date_str}")
 
 def reset_task_cycle(task):
     """
-    Manually reset flags for a specific task across all employees.
+    Manually start a new cycle for a specific task across all employees.
     Used to allow employees to be assigned again in a new cycle.
-    
+    This only bumps the task's epoch in task_cycles, however many employees exist.
+
     Args:
         task (str): Task type (hypercare, sim, dor, wims, eod)
     """
-    data = load_data()
-    all_employees = data["employees"]
-    
-    for emp in all_employees:
-        all_employees[emp]["task_flags"][task] = False
-    
-    save_data(data)
+    with task_store_session() as store:
+        store.reset_cycle(task)
     print(f"✅ Reset cycle flags for task: {task}")
 
 def get_assignment_stats(task=None):
@@ -371,93 +978,127 @@ def get_assignment_stats(task=None):
     Get statistics about task assignments.
     If task is specified, returns counts for that task.
     Otherwise returns all counts.
-    
+
     Args:
         task (str, optional): Specific task to get stats for
-    
+
     Returns:
         dict: Employee assignment statistics
     """
-    data = load_data()
-    all_employees = data["employees"]
-    
-    stats = {}
-    for emp, info in all_employees.items():
-        if task:
-            stats[emp] = info["total_counts"].get(task, 0)
-        else:
-            stats[emp] = info["total_counts"]
-    
-    return stats
+    with task_store_session() as store:
+        return store.stats(task)
 
 def clear_all_task_data():
     """
     Completely clear all task data from task_data.json
     Resets the entire assignment history and cycle tracking.
-    
+
     WARNING: This action cannot be undone!
-    
+
     Returns:
         bool: True if successful
     """
-    data = {
-        "employees": {},
-        "date_assignments": {},
-        "task_cycles": {}
-    }
-    
-    with open(FILE, "w") as f:
-        json.dump(data, f, indent=4)
-    
+    with _writable_store() as store:
+        store.replace_data(_empty_data())
+
     print("✅ All task data cleared successfully!")
     return True
 
 def get_employee_history(employee):
     """
     Get the full assignment history for a specific employee.
-    
+
     Args:
         employee (str): Employee login name
-    
+
     Returns:
         dict: Employee's history and statistics
     """
-    data = load_data()
-    all_employees = data["employees"]
-    
-    if employee not in all_employees:
-        return None
-    
-    return all_employees[employee]
+    with task_store_session() as store:
+        return store.employee_history(employee)
 
 def get_week_assignments(week_dates):
     """
     Get all assignments for a specific week.
-    
+
     Args:
         week_dates (list): List of date strings in DD/MM/YYYY format
-    
+
     Returns:
         dict: All assignments for the week
     """
-    data = load_data()
-    date_assignments = data["date_assignments"]
-    
-    week_assignments = {}
-    for date_str in week_dates:
-        date_str = str(date_str)
-        if date_str in date_assignments:
-            week_assignments[date_str] = date_assignments[date_str]
-    
-    return week_assignments
+    with task_store_session() as store:
+        return store.week_assignments(week_dates)
+
+def get_assignments_between(start, end, task=None):
+    """
+    Get the assignments recorded between two dates, oldest first.
+    Answered from the date index, so only the days in range are touched.
+
+    Args:
+        start (str): First date (DD/MM/YYYY), inclusive. None for no lower bound.
+        end (str): Last date (DD/MM/YYYY), inclusive. None for no upper bound.
+        task (str, optional): Only return this task's assignee(s), skipping days without one
+
+    Returns:
+        dict: {date_str: day record} or, with task, {date_str: assignee(s)}
+    """
+    with task_store_session() as store:
+        return store.assignments_between(start, end, task)
+
+def get_login_assignments_between(login, start, end, task=None):
+    """
+    Get one login's assignments between two dates, oldest first.
+    Useful for fairness windows such as "the last 4 weeks for this person".
+
+    Args:
+        login (str): Employee login name
+        start (str): First date (DD/MM/YYYY), inclusive. None for no lower bound.
+        end (str): Last date (DD/MM/YYYY), inclusive. None for no upper bound.
+        task (str, optional): Only return this task
+
+    Returns:
+        list: [(date_str, task), ...]
+    """
+    with task_store_session() as store:
+        return store.login_assignments_between(login, start, end, task)
+
+def get_task_counts_between(start, end, task=None):
+    """
+    Count how many assignments each login held between two dates.
+
+    Args:
+        start (str): First date (DD/MM/YYYY), inclusive. None for no lower bound.
+        end (str): Last date (DD/MM/YYYY), inclusive. None for no upper bound.
+        task (str, optional): Only count this task
+
+    Returns:
+        dict: {login: count}
+    """
+    with task_store_session() as store:
+        return store.task_counts_between(start, end, task)
+
+def get_login_assignments(login):
+    """
+    Get every recorded assignment for one login, oldest first.
+    Uses the (login, task, date) index when the SQLite engine is active.
+
+    Args:
+        login (str): Employee login name
+
+    Returns:
+        list: [(date_str, task), ...]
+    """
+    with task_store_session() as store:
+        return store.search_login(login)
 
 def export_task_data(filename="task_data_backup.json"):
     """
     Export task data to a backup file.
-    
+
     Args:
         filename (str): Name of backup file to create
-    
+
     Returns:
         bool: True if successful
     """
@@ -475,10 +1116,10 @@ def import_task_data(filename="task_data_backup.json"):
     """
     Import task data from a backup file.
     WARNING: This will overwrite current task data!
-    
+
     Args:
         filename (str): Name of backup file to import
-    
+
     Returns:
         bool: True if successful
     """
@@ -486,15 +1127,14 @@ def import_task_data(filename="task_data_backup.json"):
         if not os.path.exists(filename):
             print(f"❌ Backup file not found: {filename}")
             return False
-        
+
         with open(filename, "r") as f:
             data = json.load(f)
-        
-        with open(FILE, "w") as f:
-            json.dump(data, f, indent=4)
-        
+
+        save_data(data)
+
         print(f"✅ Task data imported from {filename}")
         return True
     except Exception as e:
         print(f"❌ Error importing task data: {str(e)}")
-        return False
\ No newline at end of file
+        return False
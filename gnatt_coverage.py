@@ -1,59 +1,95 @@
 from datetime import datetime, timedelta
 
-def parse_shift_time(shift_str, base_date):
-    """Parse shift time like '11:30-20:00' or '23:30-08:30' (overnight)"""
-    start_str, end_str = shift_str.split('-')
-    start_hour, start_min = map(int, start_str.split(':'))
-    end_hour, end_min = map(int, end_str.split(':'))
+import numpy as np
 
-    start_dt = f"{base_date}T{start_hour:02d}:{start_min:02d}:00"
+from parse_json import DAYS, ShiftCatalog
+from shift_parser import parse_shift
 
-    # If end time is earlier than start time, it's an overnight shift
-    if end_hour < start_hour:
-        next_date = datetime.strptime(base_date, '%Y-%m-%d') + timedelta(days=1)
-        end_dt = f"{next_date.strftime('%Y-%m-%d')}T{end_hour:02d}:{end_min:02d}:00"
-    else:
-        end_dt = f"{base_date}T{end_hour:02d}:{end_min:02d}:00"
+COVERAGE_TASKS = ("hypercare", "sim", "wims")
 
-    return start_dt, end_dt
+def _assigned_logins(assigned):
+    """Logins from one task entry of a day record (list, SIM slot dict or single login)."""
+    if isinstance(assigned, list):
+        return [emp for emp in assigned if emp]
+    if isinstance(assigned, dict):
+        return [emp for emp in assigned.values() if emp]
+    if isinstance(assigned, str):
+        return [assigned]
+    return []
 
-def merge_overlapping_intervals(intervals):
-    """
-    Merge overlapping time intervals into continuous blocks
-    intervals: list of (start_datetime, end_datetime) tuples
-    Returns: list of merged (start_datetime, end_datetime) tuples
-    """
-    if not intervals:
-        return []
-
-    # Sort by start time
-    sorted_intervals = sorted(intervals, key=lambda x: x)
-    merged = [sorted_intervals]
-
-    for current_start, current_end in sorted_intervals[1:]:
-        last_start, last_end = merged[-1]
-
-        # If current interval overlaps or touches the last one, merge them
-        if current_start <= last_end:
-            merged[-1] = (last_start, max(last_end, current_end))
-        else:
-            # No overlap, add as separate block
-            merged.append((current_start, current_end))
-
-    return merged
 
-def generate_coverage_gantt(date_str, day_of_week, task_data, schedule_data):
+def task_coverage_blocks(date_assignments, schedule_data, dates=None, tasks=COVERAGE_TASKS, day_names=None):
     """
-    Generate Gantt chart showing ACTUAL coverage blocks
-    Merges overlapping shifts into continuous bars, shows gaps as separate blocks
+    Merged coverage blocks per task for many days at once.
+
+    Every (date, task, login) contributes one interval per segment of its
+    shift (shift_parser.parse_shift, as in coverage.py), so the gap in a split
+    shift is not counted as covered. All intervals are then merged in one
+    sort/accumulate pass.
+
+    Args:
+        date_assignments (dict): {date_str (DD/MM/YYYY): day record}, e.g.
+                                 task_data['date_assignments']
+        schedule_data: schedule dict or a ShiftCatalog compiled from it
+        dates (list): Dates to cover (default: every date in date_assignments)
+        tasks (tuple): Tasks to report
+        day_names (dict): Optional {date_str: day abbreviation} overrides;
+                          otherwise the weekday of the date is used
+
+    Returns:
+        dict: {date_str: {task: [(start_min, end_min), ...]}} in minutes from
+              00:00 of that date; overnight blocks end after 1440
     """
-    # Convert date to base_date format
+    catalog = ShiftCatalog.of(schedule_data)
+    dates = list(date_assignments) if dates is None else list(dates)
+    day_names = day_names or {}
+    result = {date_str: {task: [] for task in tasks} for date_str in dates}
+
+    group_ids, segment_starts, segment_ends = [], [], []
+    for g, date_str in enumerate(dates):
+        day = day_names.get(date_str) or DAYS[datetime.strptime(date_str, '%d/%m/%Y').weekday()]
+        if catalog.day_ids.get(day) is None:
+            continue
+        record = date_assignments.get(date_str) or {}
+        for t, task in enumerate(tasks):
+            for login in _assigned_logins(record.get(task)):
+                for start, end in parse_shift(catalog.shift_time(login, day)):
+                    group_ids.append(g * len(tasks) + t)
+                    segment_starts.append(start)
+                    segment_ends.append(end)
+
+    if not group_ids:
+        return result
+
+    groups = np.array(group_ids, dtype=np.int64)
+    starts = np.array(segment_starts, dtype=np.int64)
+    ends = np.array(segment_ends, dtype=np.int64)
+    # Segments that end at or before their start run past midnight
+    ends = np.where(ends <= starts, ends + 24 * 60, ends)
+
+    order = np.lexsort((starts, groups))
+    groups, starts, ends = groups[order], starts[order], ends[order]
+
+    # Running max of end within each group; the group offset keeps groups apart
+    offset = groups * (4 * 24 * 60)
+    reach = np.maximum.accumulate(ends + offset) - offset
+    # A block starts at a new group or when a shift starts after everything before it ended
+    new_block = np.ones(len(starts), dtype=bool)
+    new_block[1:] = (groups[1:] != groups[:-1]) | (starts[1:] > reach[:-1])
+    first = np.flatnonzero(new_block)
+    last = np.append(first[1:], len(starts)) - 1
+
+    for g, block_start, block_end in zip(groups[first].tolist(), starts[first].tolist(), reach[last].tolist()):
+        date_index, t = divmod(g, len(tasks))
+        result[dates[date_index]][tasks[t]].append((block_start, block_end))
+    return result
+
+
+def _gantt_config(date_str, blocks, tasks=COVERAGE_TASKS):
+    """Highcharts xrange config for one date from its task_coverage_blocks entry."""
     date_obj = datetime.strptime(date_str, '%d/%m/%Y')
     base_date = date_obj.strftime('%Y-%m-%d')
 
-    # Get assignments for this date
-    assignments = task_data['date_assignments'].get(date_str, {})
-
     # Build Gantt chart configuration
     gantt_config = {
         "chart": {"type": "xrange"},
@@ -67,7 +103,7 @@ def generate_coverage_gantt(date_str, day_of_week, task_data, schedule_data):
         },
         "yAxis": {
             "title": {"text": "Tasks"},
-            "categories": ["HYPERCARE", "SIM", "WIMS"],
+            "categories": [task.upper() for task in tasks],
             "reversed": True
         },
         "legend": {"enabled": True},
@@ -95,59 +131,15 @@ def generate_coverage_gantt(date_str, day_of_week, task_data, schedule_data):
         'wims': '#2ECC71'
     }
 
-    # Task map for y-axis
-    task_map = {'hypercare': 0, 'sim': 1, 'wims': 2}
-
-    # Process each task type
-    tasks_to_show = ['hypercare', 'sim', 'wims']
-
-    for task_type in tasks_to_show:
-        # Collect ALL coverage intervals for this task
-        coverage_intervals = []
-
-        # Get assigned employee(s) for this task
-        assigned = assignments.get(task_type)
-
-        # Handle different assignment formats
-        employees_to_check = []
-
-        if isinstance(assigned, list):
-            # Multiple employees (like hypercare on weekdays)
-            employees_to_check = assigned
-        elif isinstance(assigned, dict):
-            # SIM slots (AM, PM, Night)
-            employees_to_check = [emp for emp in assigned.values() if emp]
-        elif isinstance(assigned, str):
-            # Single employee
-            employees_to_check = [assigned]
-
-        # Collect shift times for all assigned employees
-        for employee in employees_to_check:
-            if employee and employee in schedule_data:
-                shift_time = schedule_data[employee].get(day_of_week)
-
-                if shift_time:
-                    try:
-                        start_dt, end_dt = parse_shift_time(shift_time, base_date)
-                        start_time = datetime.fromisoformat(start_dt)
-                        end_time = datetime.fromisoformat(end_dt)
-                        coverage_intervals.append((start_time, end_time))
-                    except:
-                        pass
-
-        # Merge overlapping intervals
-        merged_intervals = merge_overlapping_intervals(coverage_intervals)
-
+    for y, task_type in enumerate(tasks):
         # Create data blocks for each merged interval
         data_blocks = []
-        for start_time, end_time in merged_intervals:
-            duration_hours = (end_time - start_time).total_seconds() / 3600
-
+        for start_min, end_min in blocks.get(task_type, []):
             data_blocks.append({
-                "x": start_time.isoformat(),
-                "x2": end_time.isoformat(),
-                "y": task_map[task_type],
-                "duration": f"{duration_hours:.1f}h"
+                "x": (date_obj + timedelta(minutes=start_min)).isoformat(),
+                "x2": (date_obj + timedelta(minutes=end_min)).isoformat(),
+                "y": y,
+                "duration": f"{(end_min - start_min) / 60:.1f}h"
             })
 
         # Add series for this task if there's coverage
@@ -160,3 +152,28 @@ def generate_coverage_gantt(date_str, day_of_week, task_data, schedule_data):
 
     return gantt_config
 
+
+def generate_coverage_gantts(task_data, schedule_data, dates=None):
+    """
+    Gantt configs for several dates (e.g. a week or month) from one
+    task_coverage_blocks pass.
+
+    Returns:
+        dict: {date_str: gantt_config}
+    """
+    blocks = task_coverage_blocks(task_data['date_assignments'], schedule_data, dates)
+    return {date_str: _gantt_config(date_str, day_blocks) for date_str, day_blocks in blocks.items()}
+
+
+def generate_coverage_gantt(date_str, day_of_week, task_data, schedule_data):
+    """
+    Generate Gantt chart showing ACTUAL coverage blocks
+    Merges overlapping shifts into continuous bars, shows gaps as separate blocks
+
+    schedule_data may be the schedule dict or a ShiftCatalog compiled from it.
+    Use generate_coverage_gantts for several dates at once.
+    """
+    blocks = task_coverage_blocks(
+        task_data['date_assignments'], schedule_data, [date_str], day_names={date_str: day_of_week}
+    )
+    return _gantt_config(date_str, blocks[date_str])
@@ -0,0 +1,178 @@
+from collections import namedtuple
+
+# Search nodes before settling for the best plan found so far (a week normally needs < 100)
+NODE_LIMIT = 50000
+
+# assignments: list of login lists per day; feasible: every requirement met
+# without back-to-back days; problems: human-readable reasons it wasn't
+HypercarePlan = namedtuple("HypercarePlan", ["assignments", "feasible", "problems"])
+
+
+class _Search:
+    """
+    Branch and bound over days; people are bit positions.
+
+    Finds the plan filling the most seats (up to each day's target) with no one
+    on back-to-back days. Days are taken most constrained first and each day
+    tries its largest teams first, so a week that can be fully staffed is
+    found on the first descent; otherwise the bound (seats so far plus what
+    every open day could still take) prunes plans that can't beat the best.
+    """
+
+    def __init__(self, domains, order_key):
+        self.domains = domains          # per day: bitmask of eligible people
+        self.order_key = order_key      # person -> sort key (lower = preferred)
+        self.n = len(domains)
+        self.nodes = 0
+
+    def available(self, k, chosen):
+        mask = self.domains[k]
+        for j in (k - 1, k + 1):
+            if 0 <= j < self.n and chosen[j] is not None:
+                mask &= ~chosen[j]
+        return mask
+
+    def room(self, k, chosen):
+        return min(self.targets[k], bin(self.available(k, chosen)).count("1"))
+
+    def solve(self, targets):
+        """Best plan (bitmask per day) for `targets`, or None if the node limit hit first."""
+        self.nodes = 0
+        self.targets = targets
+        self.goal = sum(targets)
+        self.load = {}
+        self.best, self.best_filled = None, -1
+        self._search([None] * self.n, 0)
+        return self.best
+
+    def finished(self):
+        return self.best_filled == self.goal or self.nodes > NODE_LIMIT
+
+    def _search(self, chosen, filled):
+        self.nodes += 1
+        if self.nodes > NODE_LIMIT:
+            return
+        open_days = [k for k in range(self.n) if chosen[k] is None]
+        if not open_days:
+            if filled > self.best_filled:
+                self.best, self.best_filled = list(chosen), filled
+            return
+
+        # Most constrained day first (least slack)
+        masks = {k: self.available(k, chosen) for k in open_days}
+        k = min(open_days, key=lambda d: (bin(masks[d]).count("1") - self.targets[d], d))
+        others = [j for j in open_days if j != k]
+        rest = sum(self.room(j, chosen) for j in others)
+
+        people = [p for p in range(masks[k].bit_length()) if masks[k] >> p & 1]
+        people.sort(key=lambda p: (self.load.get(p, 0), self.order_key(p)))
+
+        # People with the same availability on every other open day are
+        # interchangeable for the rest of the search; only try them in
+        # preference order
+        def signature(p):
+            return tuple(masks[j] >> p & 1 for j in others)
+
+        for size in range(min(self.targets[k], len(people)), -1, -1):
+            if filled + size + rest <= self.best_filled:
+                return
+            for combo in _distinct_combinations(people, size, signature):
+                mask = 0
+                for p in combo:
+                    mask |= 1 << p
+                    self.load[p] = self.load.get(p, 0) + 1
+                chosen[k] = mask
+                self._search(chosen, filled + size)
+                chosen[k] = None
+                for p in combo:
+                    self.load[p] -= 1
+                if self.finished():
+                    return
+
+
+def _distinct_combinations(people, size, signature):
+    """Combinations of `people` (in order), skipping ones that only swap same-signature people."""
+    if size == 0:
+        yield ()
+        return
+    seen = set()
+    for i, p in enumerate(people):
+        sig = signature(p)
+        if sig in seen:
+            continue
+        seen.add(sig)
+        for rest in _distinct_combinations(people[i + 1:], size - 1, signature):
+            yield (p,) + rest
+
+
+def solve_hypercare_week(eligible_by_day, requirements, day_names=None, previous=()):
+    """
+    Choose hypercare people for each day with no one on consecutive days.
+
+    Branch-and-bound search, most constrained day first.
+    Within a day, people are tried by how often they are already on this week,
+    then by their order in eligible_by_day (least assigned first, as returned
+    by get_eligible_employees). If the requirements can't all be met, the
+    plan fills as many seats as possible (branch and bound on the seats left
+    empty) and the no-consecutive rule is never broken; `problems` says why.
+
+    Args:
+        eligible_by_day (list): Eligible logins per day, in preference order
+        requirements (list): Seats wanted per day
+        day_names (list): Labels for problem messages (default "day 1", ...)
+        previous (iterable): Logins on hypercare the day before the first day
+                             (e.g. the previous week's last day); they are
+                             not eligible on the first day
+
+    Returns:
+        HypercarePlan
+    """
+    n = len(eligible_by_day)
+    previous = set(previous)
+    if n and previous:
+        eligible_by_day = [[p for p in eligible_by_day[0] if p not in previous]] + list(eligible_by_day[1:])
+    day_names = day_names or [f"day {k + 1}" for k in range(n)]
+
+    people = list(dict.fromkeys(p for day in eligible_by_day for p in day))
+    bit = {p: i for i, p in enumerate(people)}
+    rank = {}
+    for day in eligible_by_day:
+        for pos, p in enumerate(day):
+            rank[bit[p]] = min(rank.get(bit[p], pos), pos)
+    domains = []
+    for day in eligible_by_day:
+        mask = 0
+        for p in day:
+            mask |= 1 << bit[p]
+        domains.append(mask)
+
+    problems = []
+    targets = []
+    for k in range(n):
+        size = bin(domains[k]).count("1")
+        if size < requirements[k]:
+            problems.append(f"{day_names[k]}: needs {requirements[k]}, only {size} eligible")
+        targets.append(min(requirements[k], size))
+    for k in range(n - 1):
+        together = bin(domains[k] | domains[k + 1]).count("1")
+        if together < targets[k] + targets[k + 1]:
+            problems.append(
+                f"{day_names[k]}/{day_names[k + 1]}: need {targets[k] + targets[k + 1]} different people "
+                f"on back-to-back days, only {together} eligible across both"
+            )
+
+    search = _Search(domains, lambda p: rank[p])
+    solution = search.solve(targets)
+    if search.nodes > NODE_LIMIT and search.best_filled < sum(targets):
+        problems.append(f"search stopped after {NODE_LIMIT} nodes; the plan may leave more seats empty than needed")
+    if solution is None:
+        solution = [0] * n
+    assignments = [[people[i] for i in range(len(people)) if mask >> i & 1] for mask in solution]
+    for k in range(n):
+        if len(assignments[k]) < requirements[k] and not any(m.startswith(f"{day_names[k]}:") for m in problems):
+            problems.append(
+                f"{day_names[k]}: filled {len(assignments[k])} of {requirements[k]} "
+                f"without putting anyone on back-to-back days"
+            )
+    feasible = all(len(assignments[k]) >= requirements[k] for k in range(n))
+    return HypercarePlan(assignments=assignments, feasible=feasible, problems=problems)
@@ -0,0 +1,225 @@
+import copy
+import hashlib
+import io
+import json
+import os
+import pickle
+import tempfile
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+from login_to_name_mapper import get_login_to_name_mapping
+from test_dataextraction_holiday import HolidayIndex
+
+# Parsed uploads are kept here between runs (see ParsedInputCache)
+CACHE_DIR = os.environ.get("SHIFTSENSE_CACHE_DIR", ".input_cache")
+MEMORY_ENTRIES = 8
+DISK_ENTRIES = 32
+# Bump when the shape of a cached value changes so old pickles are ignored
+CACHE_VERSION = 1
+
+# Everything derived from one holiday tracker upload
+HolidayTracker = namedtuple("HolidayTracker", ["df", "holidays", "login_to_name"])
+
+
+class ParsedInputCache:
+    """
+    Two-tier LRU cache of parsed uploads, keyed by the SHA-256 of the raw bytes.
+
+    The memory tier holds the last few values for the running process (one
+    Streamlit server serves every rerun). The disk tier pickles each value
+    into cache_dir, so re-uploading the same file after a restart still skips
+    Excel/JSON parsing; file mtimes drive its LRU eviction.
+
+    Cached values are shared between callers - treat them as read-only.
+    Only files this cache wrote are ever unpickled.
+    """
+
+    def __init__(self, cache_dir=None, memory_entries=None, disk_entries=None):
+        """
+        Args:
+            cache_dir (str): Directory for the disk tier. None uses CACHE_DIR,
+                             False disables the disk tier.
+            memory_entries (int): Values kept in memory (default MEMORY_ENTRIES)
+            disk_entries (int): Pickles kept on disk (default DISK_ENTRIES)
+        """
+        self.cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+        self.memory_entries = MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.disk_entries = DISK_ENTRIES if disk_entries is None else disk_entries
+        self.memory = OrderedDict()
+
+    @staticmethod
+    def key_for(kind, raw_bytes):
+        digest = hashlib.sha256(raw_bytes).hexdigest()
+        return f"v{CACHE_VERSION}-{kind}-{digest}"
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def get_or_parse(self, kind, raw_bytes, parse):
+        """
+        Return the cached value for (kind, raw_bytes), calling parse(raw_bytes) on a miss.
+
+        Args:
+            kind (str): What the bytes are parsed into (filename-safe); part of
+                        the key so the same file can be cached under different parsers
+            raw_bytes (bytes): Uploaded file contents
+            parse (callable): bytes -> value
+        """
+        key = self.key_for(kind, raw_bytes)
+
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        value = self._read_disk(key)
+        if value is None:
+            value = parse(raw_bytes)
+            self._write_disk(key, value)
+
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Truncated/incompatible pickle - drop it and reparse
+            print(f"⚠️ Ignoring unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+        except (OSError, pickle.PicklingError) as e:
+            # The disk tier is an optimisation only
+            print(f"⚠️ Could not write input cache entry: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".pkl")
+        ]
+        if len(entries) <= self.disk_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.disk_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drop both tiers."""
+        self.memory.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    self._remove(os.path.join(self.cache_dir, name))
+
+
+_default_cache = None
+
+
+def get_input_cache():
+    """Process-wide cache shared by every Streamlit rerun."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParsedInputCache()
+    return _default_cache
+
+
+def read_upload(uploaded_file):
+    """Raw bytes of a Streamlit UploadedFile (or any binary file object), from the start."""
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+
+def load_schedule(uploaded_file, cache=None):
+    """
+    Parsed schedule.json upload.
+
+    Returns:
+        dict: {login: {day_abbr: shift_time}}. A private copy - the admin
+              tabs edit the schedule in place.
+    """
+    cache = cache or get_input_cache()
+    return copy.deepcopy(cache.get_or_parse("schedule", read_upload(uploaded_file), lambda raw: json.loads(raw)))
+
+
+def _parse_holiday_tracker(raw_bytes):
+    df = pd.read_excel(io.BytesIO(raw_bytes))
+    holidays = HolidayIndex(df)
+    # Build the availability matrix now so it is stored with the entry
+    holidays.available
+    return HolidayTracker(df=df, holidays=holidays, login_to_name=get_login_to_name_mapping(df))
+
+
+def load_holiday_tracker(uploaded_file, cache=None):
+    """
+    Parsed holiday tracker (.xlsx) upload with its derived lookups.
+
+    Returns:
+        HolidayTracker: (df, holidays, login_to_name). Treat df as read-only.
+    """
+    cache = cache or get_input_cache()
+    return cache.get_or_parse("tracker", read_upload(uploaded_file), _parse_holiday_tracker)
+
+
+def read_dataframe(uploaded_file, cache=None, **read_kwargs):
+    """
+    pd.read_csv / pd.read_excel (by file extension) through the cache.
+
+    Args:
+        uploaded_file: Uploaded .csv or .xlsx file
+        **read_kwargs: Passed to the pandas reader; part of the cache key
+
+    Returns:
+        pd.DataFrame: A copy, so callers may modify it freely
+    """
+    cache = cache or get_input_cache()
+    is_csv = getattr(uploaded_file, "name", "").endswith(".csv")
+    kind = "csv" if is_csv else "excel"
+    if read_kwargs:
+        # Keep the key filename-safe: tag the reader options by hash
+        options = json.dumps(read_kwargs, sort_keys=True, default=str).encode()
+        kind += "_" + hashlib.sha256(options).hexdigest()[:12]
+
+    def parse(raw_bytes):
+        if is_csv:
+            return pd.read_csv(io.BytesIO(raw_bytes), **read_kwargs)
+        return pd.read_excel(io.BytesIO(raw_bytes), **read_kwargs)
+
+    return cache.get_or_parse(kind, read_upload(uploaded_file), parse).copy()
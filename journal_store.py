@@ -0,0 +1,193 @@
+import contextlib
+import io
+import json
+import os
+import sys
+
+from get_eligible_employees import TaskStore, _atomic_write_json
+
+# Fold the journal into the snapshot once it holds this many records
+COMPACT_EVERY = 500
+
+# Store methods that change data and are therefore written to the journal
+JOURNALED_OPS = (
+    "mark", "unmark", "mark_many", "unmark_many", "replace_day",
+    "clear_week", "eligible", "clear_date", "reset_cycle",
+)
+
+
+def journal_path_for(snapshot_path):
+    """task_data.json -> task_data.journal.jsonl"""
+    return os.path.splitext(snapshot_path)[0] + ".journal.jsonl"
+
+
+class JournalTaskStore(TaskStore):
+    """
+    TaskStore that appends one small JSONL record per change instead of
+    rewriting task_data.json.
+
+    On open, the snapshot (task_data.json) is loaded and every journal record
+    newer than the snapshot's "journal_seq" is replayed. A torn last line from
+    a crash mid-append is ignored, so at most the change being written is lost.
+    compact() folds the journal into a fresh snapshot; it runs automatically
+    once the journal reaches COMPACT_EVERY records.
+    """
+
+    def __init__(self, path=None, compact_every=None):
+        super().__init__(path)
+        self.journal_path = journal_path_for(self.path)
+        self.compact_every = COMPACT_EVERY if compact_every is None else compact_every
+        self.seq = self.data.get("journal_seq", 0)
+        self.journal_records = 0
+        self._pending = []
+        self._needs_snapshot = False
+        # True while a journaled op runs, so batch ops write one record, not one per item
+        self._in_op = False
+        self._replay()
+
+    # ------------------------------------------------------------------
+    # Startup replay
+    # ------------------------------------------------------------------
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+
+        with open(self.journal_path, "r") as f:
+            lines = f.read().split("\n")
+
+        snapshot_seq = self.seq
+        self._in_op = True
+        # Method prints ("✅ Marked ...") are noise when replaying history
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, line in enumerate(lines):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    if i >= len(lines) - 2:
+                        # Torn final append from a crash - everything before it is intact.
+                        # Cut it off so the next append starts on a clean line.
+                        self._truncate_journal("".join(l + "\n" for l in lines[:i]))
+                        break
+                    raise
+                self.journal_records += 1
+                if record["op"] not in JOURNALED_OPS:
+                    raise ValueError(f"Unknown journal op {record['op']!r} in {self.journal_path}")
+                if record["seq"] <= snapshot_seq:
+                    continue
+                getattr(TaskStore, record["op"])(self, *record["args"], **record.get("kwargs", {}))
+                self.seq = record["seq"]
+
+        self._in_op = False
+        self.data["journal_seq"] = self.seq
+        self.dirty = False
+
+    def _truncate_journal(self, content):
+        with open(self.journal_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"⚠️ Dropped a partially written record at the end of {self.journal_path}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Journaled mutations
+    # ------------------------------------------------------------------
+    def _journaled(self, op, args, kwargs):
+        if self._in_op:
+            return getattr(TaskStore, op)(self, *args, **kwargs)
+
+        was_dirty = self.dirty
+        self.dirty = False
+        self._in_op = True
+        try:
+            result = getattr(TaskStore, op)(self, *args, **kwargs)
+        finally:
+            self._in_op = False
+        if self.dirty:
+            self.seq += 1
+            self.data["journal_seq"] = self.seq
+            self._pending.append({"seq": self.seq, "op": op, "args": list(args), "kwargs": kwargs})
+        self.dirty = self.dirty or was_dirty
+        return result
+
+    def mark(self, *args, **kwargs):
+        return self._journaled("mark", args, kwargs)
+
+    def unmark(self, *args, **kwargs):
+        return self._journaled("unmark", args, kwargs)
+
+    def mark_many(self, *args, **kwargs):
+        return self._journaled("mark_many", args, kwargs)
+
+    def unmark_many(self, *args, **kwargs):
+        return self._journaled("unmark_many", args, kwargs)
+
+    def replace_day(self, *args, **kwargs):
+        return self._journaled("replace_day", args, kwargs)
+
+    def clear_week(self, *args, **kwargs):
+        return self._journaled("clear_week", args, kwargs)
+
+    def eligible(self, *args, **kwargs):
+        return self._journaled("eligible", args, kwargs)
+
+    def clear_date(self, *args, **kwargs):
+        return self._journaled("clear_date", args, kwargs)
+
+    def reset_cycle(self, *args, **kwargs):
+        return self._journaled("reset_cycle", args, kwargs)
+
+    def replace_data(self, data):
+        # Wholesale replacement cannot be expressed as a small record - snapshot it
+        super().replace_data(data)
+        self._pending = []
+        self._needs_snapshot = True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def flush(self):
+        """
+        Append pending records to the journal (one write + fsync).
+        Compacts instead when the data was replaced or the journal is full.
+
+        Returns:
+            bool: True if anything was written
+        """
+        if not self.dirty:
+            return False
+
+        if self._needs_snapshot or self.journal_records + len(self._pending) >= self.compact_every:
+            self.compact()
+            return True
+
+        if self._pending:
+            payload = "".join(json.dumps(r) + "\n" for r in self._pending)
+            with open(self.journal_path, "a") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_records += len(self._pending)
+            self._pending = []
+
+        self.dirty = False
+        return True
+
+    def compact(self):
+        """
+        Fold the journal into a new snapshot and start an empty journal.
+
+        The snapshot records the last sequence number it contains, so a crash
+        between writing it and truncating the journal is harmless: the old
+        records are skipped on the next replay.
+        """
+        self.data["journal_seq"] = self.seq
+        _atomic_write_json(self.path, self.data)
+        with open(self.journal_path, "w"):
+            pass
+        self.journal_records = 0
+        self._pending = []
+        self._needs_snapshot = False
+        self.dirty = False
+        print(f"✅ Compacted journal into {self.path} (seq {self.seq})")
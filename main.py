@@ -1,6 +1,7 @@
 import sys
 import os
 import importlib.metadata
+import multiprocessing
 
 # ⚠️ CRITICAL: Apply metadata patch BEFORE importing streamlit
 if getattr(sys, 'frozen', False):
@@ -63,4 +64,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Best-of-K rota search (rota_search.py) runs candidates in worker
+    # processes; in the frozen exe each worker re-launches this entry point
+    multiprocessing.freeze_support()
     main()
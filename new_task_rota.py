@@ -6,6 +6,9 @@ from datetime import datetime
 import random
 from collections import deque
 import io
+from input_cache import read_dataframe
+from shift_parser import ShiftBand, classify_shift
+from shift_groups import group_people_by_day
 # Page configuration
 st.set_page_config(
     page_title="Amazon Rota System",
@@ -47,6 +50,18 @@ SHIFT_LEGENDS = {
     'AEW': {'description': 'Associate Experience week', 'time': 'Variable', 'type': 'NA'}
 }
 
+# Classes for custom shift times not in the legend, by start time (minutes since midnight)
+SHIFT_BANDS = (
+    ShiftBand("Morning", 0, 11 * 60 + 59),
+    ShiftBand("Evening", 12 * 60, 24 * 60),
+)
+
+# Status -> rota group; any other status containing 11:30 counts as evening
+SHIFT_GROUPS = {
+    "morning": (("morning",), ()),
+    "evening": (("evening",), ("11:30",)),
+}
+
 def extract_shift_time(shift_str):
     """Extract time from shift string"""
     if not isinstance(shift_str, str):
@@ -81,21 +96,7 @@ def get_shift_type(shift_str):
         return SHIFT_LEGENDS[shift_str]['type']
     
     # Try time-based detection for custom formats
-    match = re.search(r"(\d{1,2}):(\d{2})", shift_str)
-    if match:
-        hour = int(match.group(1))
-        return "Morning" if hour < 12 else "Evening"
-    
-    return "NA"
-
-def get_shift_value(row, day_col):
-    """Return the shift status for a row and day column, safely handling NaN."""
-    val = row.get(day_col, "")
-    if pd.isna(val):
-        return ""
-    if isinstance(val, str):
-        return val.strip()
-    return val
+    return classify_shift(shift_str, SHIFT_BANDS) or "NA"
 
 def process_schedule_csv(df):
     """Process the uploaded schedule CSV/Excel with proper column handling"""
@@ -177,6 +178,9 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
     }
     table_data.append(wims_status_row)
     
+    # Working people per shift group for every day, in one pass over holiday_off_df
+    day_groups = group_people_by_day(holiday_off_df, SHIFT_GROUPS)
+    
     previous_day_hypercare = set()
     hc_deque = deque(hypercare_list)
     random.shuffle(hc_deque)
@@ -189,10 +193,6 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
         is_weekend = day_name in ["Sun", "Mon", "Sat"]
         no_dor = day_name in ["Sun", "Sat"]
         
-        morning_shift_people = []
-        evening_shift_people = []
-        all_working = []
-        
         if day not in holiday_off_df.columns:
             matches = [c for c in holiday_off_df.columns if c.startswith(day_name)]
             if matches:
@@ -203,20 +203,10 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
         else:
             day_col = day
         
-        for _, row in holiday_off_df.iterrows():
-            person = row.name  # ✅ Use row.name to get the index value
-
-            shift_status = get_shift_value(row, day_col)
-            if isinstance(shift_status, str) and shift_status.lower() == 'morning':
-                morning_shift_people.append(person)
-                all_working.append(person)
-            elif isinstance(shift_status, str) and shift_status.lower() == 'evening':
-                evening_shift_people.append(person)
-                all_working.append(person)
-            else:
-                if isinstance(shift_status, str) and "11:30" in shift_status:
-                    evening_shift_people.append(person)
-                    all_working.append(person)
+        # Fresh copies: they are shuffled in place below
+        morning_shift_people = list(day_groups[day_col]["morning"])
+        evening_shift_people = list(day_groups[day_col]["evening"])
+        all_working = list(day_groups[day_col]["all_working"])
         
         random.shuffle(morning_shift_people)
         random.shuffle(evening_shift_people)
@@ -349,28 +339,14 @@ def create_daily_statistics_table(holiday_off_df, task_table, days_of_week):
         if day_col is None:
             continue
         
-        # Count people by status from holiday_off_df
-        working_count = 0
-        holiday_count = 0
-        off_count = 0
-        morning_count = 0
-        evening_count = 0
+        # Count people by status from holiday_off_df (one vectorised count over the day column)
+        status_counts = holiday_off_df[day_col].value_counts()
+        morning_count = int(status_counts.get("Morning", 0))
+        evening_count = int(status_counts.get("Evening", 0))
+        working_count = morning_count + evening_count
+        holiday_count = int(status_counts.get("Holiday", 0))
+        off_count = int(status_counts.get("Off", 0))
         
-        for idx, row in holiday_off_df.iterrows():
-            shift_type = row.get(day_col, "Off")
-            
-            if shift_type == "Morning":
-                morning_count += 1
-                working_count += 1
-            elif shift_type == "Evening":
-                evening_count += 1
-                working_count += 1
-            elif shift_type == "Holiday":
-                holiday_count += 1
-            elif shift_type == "Off":
-                off_count += 1
-        
-        # Get actual task counts from the generated rota table
         task_row = task_table[task_table['Day'] == day]
         
         if not task_row.empty and task_row.iloc[0]['Day'] != 'WIMS Status':
@@ -472,11 +448,8 @@ random_seed = st.sidebar.number_input("Random Seed (for reproducibility)", value
 # Main content
 if uploaded_file is not None:
     try:
-        # Read the uploaded file (CSV or Excel)
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
+        # Read the uploaded file (CSV or Excel), cached by content hash across reruns
+        df = read_dataframe(uploaded_file)
         
         st.success("✅ Schedule file uploaded successfully!")
         
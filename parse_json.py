@@ -1,123 +1,189 @@
-
-
 import json
-import re
-def get_shift_groups_for_day(schedule_data, day):
-    morning_times = ["06:30-15:00"]
-    morning_fallback_times = ["08:00-16:10", "09:30-18:00", "10:30-18:00"]
-    mid_times = ["10:30-18:00", "08:00-16:10", "09:30-18:00", "11:30-20:00", "13:00-21:10"]
-    night_times = ["14:30-23:00"]
-    night_fallback_times = ["23:30-08:30"]
-    midnight_times = ["23:30-08:30"]
-
-    morning = []
-    mid = []
-    morning_fallback = []
-    night_fallback = []
-    night = []
-    midnight = []
-
-    morning_shifts = []
-    mid_shifts=[]
-    midnight_shifts = []
-    night_shifts = []
-
-    for login, days in schedule_data.items():
-        # Fix for trailing spaces in day keys
-        shift = None
-        for k in days.keys():
-            if k.strip() == day.strip():
-                shift = days[k].strip()
-                break
-        if not shift:
-            continue
-
-        if shift in morning_times:
-            morning.append(login)
-            morning_shifts.append(shift)
-        
-        elif shift in mid_times:
-            mid.append(login)
-            mid_shifts.append(shift)
-
-        elif shift in night_times:
-            night.append(login)
-            night_shifts.append(shift)
-
-        
-        elif shift in midnight_times:
-            midnight.append(login)
-            midnight_shifts.append(shift)
-            pass
-
-    for login, days in schedule_data.items():
-        shift = None
-        for k in days.keys():
-            if k.strip() == day.strip():
-                shift = days[k].strip()
-                break
-        if not shift:
-            continue
-        if shift in morning_fallback_times:
-            morning_fallback.append(login)
-            pass
-        elif shift in night_fallback_times:
-            night_fallback.append(login)
-            pass
+
+import numpy as np
+
+from shift_parser import ShiftBand, classify_shift, parse_shift
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# Primary shift classes by start time, checked in this order
+SHIFT_CLASS_BANDS = (
+    ShiftBand("morning", 0, 7 * 60 + 59),
+    ShiftBand("mid", 8 * 60, 13 * 60 + 59),
+    ShiftBand("night", 14 * 60, 21 * 60 + 59),
+    ShiftBand("midnight", 22 * 60, 24 * 60),
+)
+SHIFT_CLASSES = [band.name for band in SHIFT_CLASS_BANDS]
+
+# Fallback pools, checked independently of the primary class
+FALLBACK_CLASS_BANDS = (
+    ShiftBand("morning_fallback", 8 * 60, 10 * 60 + 59),
+    ShiftBand("night_fallback", 22 * 60, 24 * 60),
+)
+FALLBACK_CLASSES = [band.name for band in FALLBACK_CLASS_BANDS]
+
+
+def _class_of(shift, bands, names):
+    name = classify_shift(shift, bands)
+    return names.index(name) if name is not None else -1
+
+
+def _minutes_to_str(m):
+    h = m // 60
+    mi = m % 60
+    return f"{h:02d}:{mi:02d}"
+
+
+class ShiftCatalog:
+    """
+    schedule.json compiled once into per-login, per-day arrays.
+
+    Logins are interned to row numbers (schedule order) and day keys are
+    normalised (stripped), so looking at one day is a column selection:
+
+        start[i, d], end[i, d]   shift start/end in minutes since midnight (-1 = no shift)
+        shift_class[i, d]        index into SHIFT_CLASSES (-1 = none)
+        fallback_class[i, d]     index into FALLBACK_CLASSES (-1 = none)
+
+    Classes come from the start-time bands above (SHIFT_CLASS_BANDS /
+    FALLBACK_CLASS_BANDS), so a shift time that is not in the usual list still
+    lands in a group instead of being dropped.
+
+    Build it once per schedule and pass it wherever schedule_data is
+    accepted by get_shift_groups_for_day / get_filtered_shifts.
+    """
+
+    def __init__(self, schedule_data):
+        self.logins = np.array(list(schedule_data), dtype=object)
+        self.login_ids = {login: i for i, login in enumerate(self.logins)}
+
+        # Normalised day keys -> column; the usual seven first, anything else after
+        self.days = list(DAYS)
+        for days in schedule_data.values():
+            for k in days:
+                key = str(k).strip()
+                if key not in self.days:
+                    self.days.append(key)
+        self.day_ids = {day: d for d, day in enumerate(self.days)}
+
+        shape = (len(self.logins), len(self.days))
+        self.shifts = np.full(shape, None, dtype=object)
+        self.start = np.full(shape, -1, dtype=np.int16)
+        self.end = np.full(shape, -1, dtype=np.int16)
+        self.shift_class = np.full(shape, -1, dtype=np.int8)
+        self.fallback_class = np.full(shape, -1, dtype=np.int8)
+
+        for i, days in enumerate(schedule_data.values()):
+            seen = set()
+            for k, shift in days.items():
+                d = self.day_ids[str(k).strip()]
+                # The first key that normalises to a day wins, as before
+                if d in seen:
+                    continue
+                seen.add(d)
+                if not isinstance(shift, str):
+                    continue
+                shift = shift.strip()
+                if not shift:
+                    continue
+                self.shifts[i, d] = shift
+                segments = parse_shift(shift)
+                if not segments:
+                    continue
+                self.shift_class[i, d] = _class_of(shift, SHIFT_CLASS_BANDS, SHIFT_CLASSES)
+                self.fallback_class[i, d] = _class_of(shift, FALLBACK_CLASS_BANDS, FALLBACK_CLASSES)
+                # Split shifts run from the first start to the last end
+                self.start[i, d] = segments[0][0]
+                self.end[i, d] = segments[-1][1]
+
+    @classmethod
+    def of(cls, schedule):
+        """Return `schedule` if it is already a catalog, else compile it."""
+        return schedule if isinstance(schedule, cls) else cls(schedule)
+
+    def _day(self, day):
+        return self.day_ids.get(str(day).strip())
+
+    def shift_time(self, login, day):
+        """Shift string (e.g. "06:30-15:00") for login on day, or None."""
+        i, d = self.login_ids.get(login), self._day(day)
+        if i is None or d is None:
+            return None
+        return self.shifts[i, d]
+
+    def shift_minutes(self, login, day):
+        """(start, end) in minutes for login on day, or None if there is no parseable shift."""
+        i, d = self.login_ids.get(login), self._day(day)
+        if i is None or d is None or self.start[i, d] < 0:
+            return None
+        return int(self.start[i, d]), int(self.end[i, d])
+
+    def in_class(self, day, shift_class):
+        """Logins (schedule order) whose shift on `day` is in a primary or fallback class."""
+        d = self._day(day)
+        if d is None:
+            return []
+        if shift_class in FALLBACK_CLASSES:
+            mask = self.fallback_class[:, d] == FALLBACK_CLASSES.index(shift_class)
         else:
-            continue
-    
-
-    def get_start_time(shifts):
-        times = []
-        for s in shifts:
-            match = re.match(r"(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})", s)
-            if match:
-                start = int(match.group(1)) * 60 + int(match.group(2))
-                times.append(start)
-        return min(times) if times else None
-
-    def get_end_time(shifts):
-        times = []
-        for s in shifts:
-            match = re.match(r"(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})", s)
-            if match:
-                end = int(match.group(3)) * 60 + int(match.group(4))
-                times.append(end)
-        return max(times) if times else None
-
-    def minutes_to_str(m):
-        h = m // 60
-        mi = m % 60
-        return f"{h:02d}:{mi:02d}"
-
-    # Coverage calculation
-    start_time = get_start_time(morning_shifts)
-    # Prefer midnight shifts for end time, else night shifts
-    if midnight_shifts: end_time = get_end_time(midnight_shifts) 
-    else:
-        if night_shifts: end_time=get_end_time(night_shifts)
-
-        else: end_time=get_end_time(mid_shifts)
-
-    coverage = None
-    if start_time is not None and end_time is not None:
-        coverage = {
-            "start": minutes_to_str(start_time),
-            "end": minutes_to_str(end_time)
+            mask = self.shift_class[:, d] == SHIFT_CLASSES.index(shift_class)
+        return self.logins[mask].tolist()
+
+    def groups(self, day):
+        """Same result as get_shift_groups_for_day(schedule_data, day)."""
+        d = self._day(day)
+        result = {name: self.in_class(day, name) for name in SHIFT_CLASSES + FALLBACK_CLASSES}
+
+        coverage = None
+        if d is not None:
+            classes = self.shift_class[:, d]
+            # Only parseable shifts are classified, so start/end are set for every class
+            starts = self.start[:, d]
+            ends = self.end[:, d]
+
+            morning = classes == SHIFT_CLASSES.index("morning")
+            start_time = int(starts[morning].min()) if morning.any() else None
+            # Prefer midnight shifts for end time, else night shifts, else mid
+            end_time = None
+            for name in ("midnight", "night", "mid"):
+                mask = classes == SHIFT_CLASSES.index(name)
+                if mask.any():
+                    end_time = int(ends[mask].max())
+                    break
+
+            if start_time is not None and end_time is not None:
+                coverage = {
+                    "start": _minutes_to_str(start_time),
+                    "end": _minutes_to_str(end_time)
+                }
+
+        return {
+            "morning": result["morning"],
+            "mid": result["mid"],
+            "morning_fallback": result["morning_fallback"],
+            "night": result["night"],
+            "night_fallback": result["night_fallback"],
+            "midnight": result["midnight"],
+            "coverage": coverage
         }
 
-    return {
-        "morning": morning,
-        "mid": mid,
-        "morning_fallback": morning_fallback,
-        "night": night,
-        "night_fallback": night_fallback,
-        "midnight": midnight,
-        "coverage": coverage
-    }
+
+def get_shift_groups_for_day(schedule_data, day):
+    """
+    Group logins by shift class for one day.
+
+    Args:
+        schedule_data: schedule.json dict, or a ShiftCatalog built from it
+                       (pass a catalog when grouping several days)
+        day (str): Day abbreviation (Mon, Tue, ...)
+
+    Returns:
+        dict: morning/mid/morning_fallback/night/night_fallback/midnight login
+              lists plus "coverage" ({"start", "end"} or None)
+    """
+    return ShiftCatalog.of(schedule_data).groups(day)
 # # Example usage:
 # with open(r"C:\Users\avikann\rota\schedule.json") as f:
 #     schedule_data = json.load(f)
 # result = get_shift_groups_for_day(schedule_data, "Sat")
-# print(result)
\ No newline at end of file
+# print(result)
@@ -2,10 +2,12 @@
 import streamlit as st
 import pandas as pd
 import re
-from datetime import datetime
 import random
 from collections import deque
 import io
+from input_cache import read_dataframe
+from shift_parser import ShiftBand, classify_shift
+from shift_groups import group_people_by_day
 
 # Page configuration
 st.set_page_config(
@@ -17,6 +19,18 @@ st.set_page_config(
 st.title("📅 Amazon Rota System Generator")
 st.markdown("Generate weekly task assignments for your team")
 
+# Time-based shift classes by start time (minutes since midnight)
+SHIFT_BANDS = (
+    ShiftBand("Morning", 0, 9 * 60 + 59),
+    ShiftBand("Evening", 10 * 60, 24 * 60),
+)
+
+# Status -> rota group; any other status containing 11:30 counts as evening
+SHIFT_GROUPS = {
+    "morning": (("morning",), ()),
+    "evening": (("evening",), ("11:30",)),
+}
+
 # === Functions ===
 def extract_shift_time(shift_str):
     if not isinstance(shift_str, str):
@@ -36,25 +50,15 @@ def get_shift_type(shift_str):
         return "Holiday"
     
     # Try time-based detection
-    match = re.search(r"(\d{1,2}:\d{2})", shift_str)
-    if match:
-        start_time = datetime.strptime(match.group(1), "%H:%M")
-        return "Morning" if start_time.hour < 10 else "Evening"
+    shift_type = classify_shift(shift_str, SHIFT_BANDS)
+    if shift_type:
+        return shift_type
     
     # Explicit morning codes
-    elif any(code in shift_str for code in ["FBH0730", "FP0730"]):
+    if any(code in shift_str for code in ["FBH0730", "FP0730"]):
         return "Morning"
     return "NA"
 
-def get_shift_value(row, day_col):
-    """Return the shift status for a row and day column, safely handling NaN."""
-    val = row.get(day_col, "")
-    if pd.isna(val):
-        return ""
-    if isinstance(val, str):
-        return val.strip()
-    return val
-
 def process_schedule_csv(df):
     """Process the uploaded schedule CSV"""
     # Melt DataFrame so each person-day is a row
@@ -105,6 +109,9 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
     }
     table_data.append(wims_status_row)
     
+    # Working people per shift group for every day, in one pass over holiday_off_df
+    day_groups = group_people_by_day(holiday_off_df, SHIFT_GROUPS)
+    
     previous_day_hypercare = set()
     hc_deque = deque(hypercare_list)
     random.shuffle(hc_deque)
@@ -117,10 +124,6 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
         is_weekend = day_name in ["Sun", "Mon", "Sat"]
         no_dor = day_name in ["Sun", "Sat"]
         
-        morning_shift_people = []
-        evening_shift_people = []
-        all_working = []
-        
         if day not in holiday_off_df.columns:
             matches = [c for c in holiday_off_df.columns if c.startswith(day_name)]
             if matches:
@@ -131,20 +134,10 @@ def create_task_by_day_table(holiday_off_df, hypercare_list, hyd_team, days_of_w
         else:
             day_col = day
         
-        for _, row in holiday_off_df.iterrows():
-            person = row.name  # ✅ Use row.name to get the index value
-
-            shift_status = get_shift_value(row, day_col)
-            if isinstance(shift_status, str) and shift_status.lower() == 'morning':
-                morning_shift_people.append(person)
-                all_working.append(person)
-            elif isinstance(shift_status, str) and shift_status.lower() == 'evening':
-                evening_shift_people.append(person)
-                all_working.append(person)
-            else:
-                if isinstance(shift_status, str) and "11:30" in shift_status:
-                    evening_shift_people.append(person)
-                    all_working.append(person)
+        # Fresh copies: they are shuffled in place below
+        morning_shift_people = list(day_groups[day_col]["morning"])
+        evening_shift_people = list(day_groups[day_col]["evening"])
+        all_working = list(day_groups[day_col]["all_working"])
         
         random.shuffle(morning_shift_people)
         random.shuffle(evening_shift_people)
@@ -285,8 +278,8 @@ random_seed = st.sidebar.number_input("Random Seed (for reproducibility)", value
 # Main content
 if uploaded_file is not None:
     try:
-        # Read the uploaded CSV
-        df = pd.read_csv(uploaded_file)
+        # Read the uploaded CSV (cached by content hash across reruns)
+        df = read_dataframe(uploaded_file)
         
         st.success("✅ Schedule CSV uploaded successfully!")
         
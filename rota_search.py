@@ -0,0 +1,125 @@
+import copy
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from assignment_optimizer import FAIRNESS_TASKS, W_CONSECUTIVE, W_COUNT, W_MAX_COUNT, W_UNFILLED
+from daily_assignment import HYPERCARE_REQUIREMENTS, generate_daily_assignments, generate_horizon_assignments
+from get_eligible_employees import TaskStore, task_store_session
+
+# Candidate rotas generated by best-of-K search
+DEFAULT_CANDIDATES = 4
+
+
+def score_assignments(daily_assignments, employees, hypercare_list=(), custom_requirements=None):
+    """
+    Score a generated rota; lower is better.
+
+    Uses the assignment_optimizer weights: W_UNFILLED per empty hypercare,
+    SIM, DOR or EOD seat, W_CONSECUTIVE per person on hypercare two days
+    running, then per task W_MAX_COUNT times the spread of total_counts
+    (highest minus lowest) plus W_COUNT times their variance across the
+    people working in the rota (hypercare: only hypercare_list members).
+
+    Args:
+        daily_assignments (list): Output of generate_daily_assignments
+        employees (dict): task data "employees" after the rota was marked
+        hypercare_list (iterable): People eligible for hypercare
+        custom_requirements (dict): Hypercare seats per day name, as for
+                                    generate_daily_assignments
+
+    Returns:
+        float
+    """
+    requirements = dict(HYPERCARE_REQUIREMENTS, **(custom_requirements or {}))
+    score = 0.0
+    team = set()
+    previous = set()
+    for day in daily_assignments:
+        hypercare = set(day["hypercare"])
+        score += W_UNFILLED * max(requirements.get(day["day"], 2) - len(hypercare), 0)
+        score += W_UNFILLED * sum(1 for person in day["sim"].values() if person in (None, "NA"))
+        score += W_UNFILLED * ((day["dor"] is None) + (day["eod"] is None))
+        score += W_CONSECUTIVE * len(hypercare & previous)
+        previous = hypercare
+
+        team.update(hypercare, day["wims"], day["sim"].values(), (day["dor"], day["eod"]))
+    team -= {None, "NA", "No DOR"}
+
+    hypercare_team = team & set(hypercare_list)
+    for task in FAIRNESS_TASKS:
+        people = hypercare_team if task == "hypercare" else team
+        if not people:
+            continue
+        counts = np.array([employees.get(p, {}).get("total_counts", {}).get(task, 0) for p in people], dtype=float)
+        score += W_MAX_COUNT * (counts.max() - counts.min()) + W_COUNT * counts.var()
+    return float(score)
+
+
+def _run_candidate(seed, data, schedule_data, df, hypercare_list, weeks, custom_requirements, holidays, engine):
+    """Generate one candidate against an in-memory copy of the task data (runs in a worker)."""
+    random.seed(seed)
+    store = TaskStore(path=False, data=data)
+    with task_store_session(store=store):
+        if weeks is None:
+            assignments = generate_daily_assignments(
+                schedule_data, df, hypercare_list, custom_requirements, holidays=holidays, engine=engine
+            )
+        else:
+            assignments = generate_horizon_assignments(
+                schedule_data, df, hypercare_list, weeks, custom_requirements, holidays=holidays, engine=engine
+            )
+    score = score_assignments(assignments, store.employees, hypercare_list, custom_requirements)
+    return score, assignments, store.data
+
+
+def generate_best_assignments(schedule_data, df, hypercare_list, candidates=DEFAULT_CANDIDATES, weeks=None,
+                              custom_requirements=None, holidays=None, engine="greedy", seed=None, max_workers=None):
+    """
+    Best-of-K rota: generate `candidates` independently seeded rotas in
+    parallel and keep only the one with the lowest score_assignments().
+
+    Every candidate starts from the same snapshot of the task data and marks
+    its choices in its own in-memory store, so nothing is written until the
+    winner's data replaces the store at the end (one write, as for a single
+    run). Candidates run in a ProcessPoolExecutor, so on a multi-core machine
+    the wall-clock time stays close to one generation.
+
+    Args:
+        schedule_data, df, hypercare_list, custom_requirements, holidays, engine:
+            As for generate_daily_assignments (engine defaults to "greedy",
+            the most randomised one)
+        candidates (int): Number of rotas to generate (K)
+        weeks (int): Generate this many weeks with generate_horizon_assignments
+                     (default: one run of generate_daily_assignments)
+        seed (int): Base seed; candidate i uses seed + i (default: random)
+        max_workers (int): Worker processes (default: one per CPU); 1 runs the
+                           candidates one after another in this process
+
+    Returns:
+        list: The winning rota's daily assignment dicts
+    """
+    if candidates < 1:
+        raise ValueError(f"candidates must be at least 1, got {candidates}")
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    seeds = [seed + i for i in range(candidates)]
+
+    with task_store_session() as store:
+        snapshot = store.data
+        args = (schedule_data, df, hypercare_list, weeks, custom_requirements, holidays, engine)
+        if max_workers == 1 or candidates == 1:
+            results = [_run_candidate(s, copy.deepcopy(snapshot), *args) for s in seeds]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(_run_candidate, s, snapshot, *args) for s in seeds]
+                results = [future.result() for future in futures]
+
+        best = min(range(candidates), key=lambda i: (results[i][0], i))
+        score, assignments, data = results[best]
+        store.replace_data(data)
+
+    print(f"✅ Best of {candidates} rotas: seed {seeds[best]}, score {score:.1f} "
+          f"(worst {max(r[0] for r in results):.1f})")
+    return assignments
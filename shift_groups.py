@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def group_people_by_day(holiday_off_df, groups):
+    """
+    Working people per shift group for every day column of holiday_off_df,
+    from one vectorised pass over the whole table (no row iteration).
+
+    A person is in a group on a day if their status there (stripped,
+    lowercased; non-strings count as empty) equals one of the group's
+    statuses or contains one of its substrings. Groups are tried in order and
+    the first match wins, like an if/elif chain.
+
+    Args:
+        holiday_off_df (pd.DataFrame): people (index) x day columns of shift types
+        groups (dict): {group name: (statuses, substrings)}, e.g.
+                       {"morning": (("morning",), ()), "evening": (("evening",), ("11:30",))}
+
+    Returns:
+        dict: {day column: {group: [people], ..., "all_working": [people]}},
+              every list in holiday_off_df row order
+    """
+    people = holiday_off_df.index.to_numpy()
+    values = holiday_off_df.to_numpy(dtype=object)
+    is_text = np.frompyfunc(lambda v: isinstance(v, str), 1, 1)(values).astype(bool)
+    text = np.char.lower(np.char.strip(np.where(is_text, values, "").astype(str)))
+
+    unassigned = np.ones(text.shape, dtype=bool)
+    masks = {}
+    for name, (statuses, substrings) in groups.items():
+        mask = np.isin(text, list(statuses))
+        for sub in substrings:
+            mask |= np.char.find(text, sub.lower()) >= 0
+        mask &= unassigned
+        unassigned &= ~mask
+        masks[name] = mask
+    working = ~unassigned
+
+    result = {}
+    for j, column in enumerate(holiday_off_df.columns):
+        day = {name: people[mask[:, j]].tolist() for name, mask in masks.items()}
+        day["all_working"] = people[working[:, j]].tolist()
+        result[column] = day
+    return result
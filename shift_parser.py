@@ -0,0 +1,107 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# One time range inside a shift string: "8-9:30", "14:30–18:00", "23:30 - 8:30"
+_TIME = r"(\d{1,2})(?:[:.](\d{2}))?"
+_RANGE_RE = re.compile(r"(?<![\d:.\-])" + _TIME + r"\s*[-–—]\s*" + _TIME + r"(?![\d:])")
+_LONE_TIME_RE = re.compile(r"(?<!\d)(\d{1,2})[:.](\d{2})(?!\d)")
+# NBSP, narrow NBSP, thin space, figure space
+_ODD_SPACES = dict.fromkeys(map(ord, "\xa0   "), " ")
+
+# A shift belongs to the first band whose start range contains the shift's
+# first start (and, if given, whose end range contains its last end).
+# Minutes since midnight, bounds inclusive, None = unbounded.
+ShiftBand = namedtuple("ShiftBand", ["name", "start_from", "start_to", "end_from", "end_to"],
+                       defaults=(None, None))
+
+
+def _minutes(hours, minutes):
+    h = int(hours)
+    m = int(minutes) if minutes else 0
+    if h > 24 or m > 59 or (h == 24 and m):
+        return None
+    return h * 60 + m
+
+
+@lru_cache(maxsize=None)
+def parse_shift(shift_str):
+    """
+    Parse a shift string into its time segments.
+
+    Handles NBSP/thin spaces, en/em dashes, single-digit and bare hours
+    ("8-9:30") and split shifts ("8-9:30/14:30-18:00"). Results are cached,
+    so each distinct string is parsed once per process.
+
+    Args:
+        shift_str (str): Shift text from schedule.json or a rota sheet
+
+    Returns:
+        tuple: ((start_min, end_min), ...) in the order written; empty if the
+               string holds no time range. end_min <= start_min means the
+               segment runs past midnight.
+    """
+    if not isinstance(shift_str, str):
+        return ()
+    text = shift_str.translate(_ODD_SPACES)
+    segments = []
+    for match in _RANGE_RE.finditer(text):
+        start = _minutes(match.group(1), match.group(2))
+        end = _minutes(match.group(3), match.group(4))
+        if start is not None and end is not None:
+            segments.append((start, end))
+    return tuple(segments)
+
+
+@lru_cache(maxsize=None)
+def shift_start(shift_str):
+    """Start minute of the first segment, or of a lone "HH:MM" time; None if there is none."""
+    segments = parse_shift(shift_str)
+    if segments:
+        return segments[0][0]
+    if not isinstance(shift_str, str):
+        return None
+    match = _LONE_TIME_RE.search(shift_str.translate(_ODD_SPACES))
+    return _minutes(match.group(1), match.group(2)) if match else None
+
+
+def shift_span(shift_str):
+    """
+    (start_min, end_min) from the first start to the last end, with end_min
+    moved past 1440 when the shift ends after midnight; None if unparseable.
+    """
+    segments = parse_shift(shift_str)
+    if not segments:
+        return None
+    start = segments[0][0]
+    end = segments[-1][1]
+    if end <= start:
+        end += 24 * 60
+    return start, end
+
+
+def _in_range(value, low, high):
+    if value is None:
+        return low is None and high is None
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+@lru_cache(maxsize=None)
+def classify_shift(shift_str, bands):
+    """
+    Name of the first band in `bands` that matches the shift, or None.
+
+    Args:
+        shift_str (str): Shift text
+        bands (tuple): ShiftBand rows (must be a tuple so results can be cached)
+    """
+    start = shift_start(shift_str)
+    if start is None:
+        return None
+    segments = parse_shift(shift_str)
+    end = segments[-1][1] if segments else None
+    for band in bands:
+        if _in_range(start, band.start_from, band.start_to) and \
+                (band.end_from is None and band.end_to is None or _in_range(end, band.end_from, band.end_to)):
+            return band.name
+    return None
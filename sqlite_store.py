@@ -0,0 +1,680 @@
+import json
+import os
+import sqlite3
+
+import get_eligible_employees
+from fairness_decay import decayed_add, decayed_from_ordinals, decayed_value, half_life
+from get_eligible_employees import (
+    TASKS, SIM_SLOTS, _empty_data, _new_day_record, _normalise_batch, _has_assignee, _require_ordinal,
+    _migrate_task_flags, _date_span, date_to_ordinal,
+)
+
+DB_FILE = "task_data.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    login TEXT PRIMARY KEY,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS counts (
+    login TEXT NOT NULL,
+    task TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    served INTEGER NOT NULL DEFAULT -1,
+    PRIMARY KEY (login, task)
+);
+CREATE TABLE IF NOT EXISTS history (
+    login TEXT NOT NULL,
+    task TEXT NOT NULL,
+    date TEXT NOT NULL,
+    date_ord INTEGER
+);
+CREATE TABLE IF NOT EXISTS day_assignments (
+    date TEXT NOT NULL,
+    date_ord INTEGER,
+    task TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    slot TEXT,
+    login TEXT
+);
+CREATE TABLE IF NOT EXISTS decayed (
+    login TEXT NOT NULL,
+    task TEXT NOT NULL,
+    score REAL NOT NULL,
+    ord INTEGER NOT NULL,
+    half_life REAL NOT NULL,
+    PRIMARY KEY (login, task)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_login_task_date ON history (login, task, date_ord);
+CREATE INDEX IF NOT EXISTS idx_history_date ON history (date_ord);
+CREATE INDEX IF NOT EXISTS idx_history_login_date ON history (login, date_ord);
+CREATE INDEX IF NOT EXISTS idx_day_login_task_date ON day_assignments (login, task, date_ord);
+CREATE INDEX IF NOT EXISTS idx_day_date ON day_assignments (date, date_ord);
+CREATE INDEX IF NOT EXISTS idx_day_ord ON day_assignments (date_ord);
+"""
+
+
+def _range_clause(start, end):
+    """SQL condition + params for date_ord between two optional inclusive bounds."""
+    clause, params = "date_ord IS NOT NULL", []
+    if start is not None:
+        clause += " AND date_ord >= ?"
+        params.append(_require_ordinal(start))
+    if end is not None:
+        clause += " AND date_ord <= ?"
+        params.append(_require_ordinal(end))
+    return clause, params
+
+
+class SqliteTaskStore:
+    """
+    SQLite storage engine with the same interface as TaskStore.
+
+    Assignments, per-employee history and counts live in indexed tables,
+    so per-login and per-date lookups do not parse the whole history.
+    Changes are committed by flush(); inside task_store_session() that
+    happens once when the session closes.
+
+    The day layout of task_data.json (lists for hypercare/wims, a slot
+    dict for sim, single values for dor/eod) is kept row by row, so
+    export_data() gives back the same content import_data() was given.
+    Key order is not guaranteed to round-trip.
+    """
+
+    def __init__(self, path=None):
+        self.path = DB_FILE if path is None else path
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self._migrate_flag_column()
+        self.dirty = False
+
+    def _migrate_flag_column(self):
+        """Databases created before epochs have counts.flag (bool) instead of counts.served."""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(counts)")]
+        if "served" in columns:
+            return
+        self.conn.execute("ALTER TABLE counts ADD COLUMN served INTEGER NOT NULL DEFAULT -1")
+        cycles = self._cycles()
+        for (task,) in self.conn.execute("SELECT DISTINCT task FROM counts").fetchall():
+            cycle = cycles.get(task, 0)
+            self.conn.execute(
+                "UPDATE counts SET served = CASE WHEN flag THEN ? ELSE ? END WHERE task = ?",
+                (cycle, cycle - 1, task)
+            )
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def flush(self):
+        """Commit pending changes. Returns True if anything was written."""
+        if not self.dirty:
+            return False
+        self.conn.commit()
+        self.dirty = False
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM employees LIMIT 1").fetchone() is None and \
+            self.conn.execute("SELECT 1 FROM day_assignments LIMIT 1").fetchone() is None
+
+    def import_data(self, data):
+        """Replace the database contents with a task_data.json document."""
+        data = _migrate_task_flags(data)
+        cur = self.conn
+        for table in ("employees", "counts", "history", "day_assignments", "decayed", "meta"):
+            cur.execute(f"DELETE FROM {table}")
+
+        for login, record in data.get("employees", {}).items():
+            extra = {k: v for k, v in record.items()
+                     if k not in ("history", "total_counts", "task_epochs", "decayed_counts")}
+            cur.execute("INSERT INTO employees (login, extra) VALUES (?, ?)",
+                        (login, json.dumps(extra) if extra else None))
+
+            for task, entry in record.get("decayed_counts", {}).items():
+                cur.execute("INSERT INTO decayed (login, task, score, ord, half_life) VALUES (?, ?, ?, ?, ?)",
+                            (login, task, *entry))
+
+            counts = record.get("total_counts", {})
+            epochs = record.get("task_epochs", {})
+            for task in list(counts) + [t for t in epochs if t not in counts]:
+                cur.execute("INSERT INTO counts (login, task, total, served) VALUES (?, ?, ?, ?)",
+                            (login, task, counts.get(task, 0), epochs.get(task, -1)))
+
+            for date_str, tasks in record.get("history", {}).items():
+                date_ord = date_to_ordinal(date_str)
+                if not tasks:
+                    cur.execute("INSERT INTO history (login, task, date, date_ord) VALUES (?, '', ?, ?)",
+                                (login, date_str, date_ord))
+                for task in tasks:
+                    cur.execute("INSERT INTO history (login, task, date, date_ord) VALUES (?, ?, ?, ?)",
+                                (login, task, date_str, date_ord))
+
+        for date_str, day in data.get("date_assignments", {}).items():
+            self._insert_day(date_str, day)
+
+        for key, value in data.items():
+            if key not in ("employees", "date_assignments"):
+                cur.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+        self.dirty = True
+
+    def _insert_day(self, date_str, day):
+        date_ord = date_to_ordinal(date_str)
+        rows = []
+        for task, assigned in day.items():
+            if isinstance(assigned, dict):
+                for slot, login in assigned.items():
+                    rows.append((date_str, date_ord, task, "slot", slot, login))
+            elif isinstance(assigned, list):
+                # An empty list still needs a row so the key survives the round trip
+                rows.append((date_str, date_ord, task, "list", None, None))
+                for login in assigned:
+                    rows.append((date_str, date_ord, task, "item", None, login))
+            else:
+                rows.append((date_str, date_ord, task, "value", None, assigned))
+        self.conn.executemany(
+            "INSERT INTO day_assignments (date, date_ord, task, kind, slot, login) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def export_data(self):
+        """Rebuild the full task_data.json document from the tables."""
+        data = {}
+        meta = dict(self.conn.execute("SELECT key, value FROM meta ORDER BY rowid"))
+        for key, value in meta.items():
+            data[key] = json.loads(value)
+
+        employees = {}
+        for login, extra in self.conn.execute("SELECT login, extra FROM employees ORDER BY rowid"):
+            employees[login] = self._employee_record(login, extra)
+        data["employees"] = employees
+
+        date_assignments = {}
+        for row in self.conn.execute(
+            "SELECT date, task, kind, slot, login FROM day_assignments ORDER BY rowid"
+        ):
+            self._apply_day_row(date_assignments, *row)
+        data["date_assignments"] = date_assignments
+
+        for key in _empty_data():
+            data.setdefault(key, {})
+        return data
+
+    @property
+    def data(self):
+        return self.export_data()
+
+    def replace_data(self, data):
+        self.import_data(data)
+
+    # ------------------------------------------------------------------
+    # Row helpers
+    # ------------------------------------------------------------------
+    def _employee_record(self, login, extra=None):
+        history = {}
+        for date_str, task in self.conn.execute(
+            "SELECT date, task FROM history WHERE login = ? ORDER BY rowid", (login,)
+        ):
+            tasks = history.setdefault(date_str, [])
+            if task:
+                tasks.append(task)
+
+        total_counts = {}
+        task_epochs = {}
+        for task, total, served in self.conn.execute(
+            "SELECT task, total, served FROM counts WHERE login = ? ORDER BY rowid", (login,)
+        ):
+            total_counts[task] = total
+            task_epochs[task] = served
+
+        record = {"history": history, "total_counts": total_counts, "task_epochs": task_epochs}
+        decayed_counts = {
+            task: [score, ord_, life] for task, score, ord_, life in self.conn.execute(
+                "SELECT task, score, ord, half_life FROM decayed WHERE login = ? ORDER BY rowid", (login,)
+            )
+        }
+        if decayed_counts:
+            record["decayed_counts"] = decayed_counts
+        if extra:
+            record.update(json.loads(extra))
+        return record
+
+    @staticmethod
+    def _apply_day_row(date_assignments, date_str, task, kind, slot, login):
+        day = date_assignments.setdefault(date_str, {})
+        if kind == "slot":
+            day.setdefault(task, {})[slot] = login
+        elif kind == "list":
+            day.setdefault(task, [])
+        elif kind == "item":
+            day.setdefault(task, []).append(login)
+        else:
+            day[task] = login
+
+    def _day(self, date_str):
+        rows = self.conn.execute(
+            "SELECT date, task, kind, slot, login FROM day_assignments WHERE date = ? ORDER BY rowid",
+            (date_str,)
+        ).fetchall()
+        if not rows:
+            return None
+        date_assignments = {}
+        for row in rows:
+            self._apply_day_row(date_assignments, *row)
+        return date_assignments[date_str]
+
+    def _write_day(self, date_str, day):
+        self.conn.execute("DELETE FROM day_assignments WHERE date = ?", (date_str,))
+        self._insert_day(date_str, day)
+
+    def ensure_employee(self, employee):
+        inserted = self.conn.execute(
+            "INSERT OR IGNORE INTO employees (login, extra) VALUES (?, NULL)", (employee,)
+        ).rowcount
+        if inserted:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO counts (login, task, total, served) VALUES (?, ?, 0, -1)",
+                [(employee, t) for t in TASKS]
+            )
+            self.dirty = True
+
+    def _employee_exists(self, employee):
+        return self.conn.execute("SELECT 1 FROM employees WHERE login = ?", (employee,)).fetchone() is not None
+
+    def _cycles(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'task_cycles'").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def cycle(self, task):
+        """Current fairness epoch for `task` (see TaskStore)."""
+        return self._cycles().get(task, 0)
+
+    def _bump_count(self, employee, task, delta, done):
+        cycle = self.cycle(task)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO counts (login, task, total, served) VALUES (?, ?, 0, -1)", (employee, task)
+        )
+        self.conn.execute(
+            "UPDATE counts SET total = MAX(total + ?, 0), served = ? WHERE login = ? AND task = ?",
+            (delta, cycle if done else cycle - 1, employee, task)
+        )
+
+    def decayed_entry(self, employee, task):
+        """Decayed counter for (employee, task); built from history the first time. See TaskStore."""
+        life = half_life(task)
+        row = self.conn.execute(
+            "SELECT score, ord, half_life FROM decayed WHERE login = ? AND task = ?", (employee, task)
+        ).fetchone()
+        if row is not None and row[2] == life:
+            return list(row)
+        entry = decayed_from_ordinals(
+            [o for (o,) in self.conn.execute(
+                "SELECT date_ord FROM history WHERE login = ? AND task = ?", (employee, task)
+            )], life
+        )
+        self._write_decayed(employee, task, entry)
+        return entry
+
+    def _write_decayed(self, employee, task, entry):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO decayed (login, task, score, ord, half_life) VALUES (?, ?, ?, ?, ?)",
+            (employee, task, *entry)
+        )
+
+    def _bump_decayed(self, employee, task, date_str, weight):
+        # Call before the history row changes (see TaskStore._bump_decayed)
+        if get_eligible_employees.FAIRNESS_MODE != "decayed":
+            self.conn.execute("DELETE FROM decayed WHERE login = ? AND task = ?", (employee, task))
+            return
+        date_ord = date_to_ordinal(date_str)
+        if date_ord is None:
+            return
+        entry = self.decayed_entry(employee, task)
+        self._write_decayed(employee, task, decayed_add(entry, date_ord, entry[2], weight))
+
+    def _remove_history(self, employee, task, date_str):
+        self.conn.execute(
+            "DELETE FROM history WHERE rowid IN "
+            "(SELECT rowid FROM history WHERE login = ? AND task = ? AND date = ? LIMIT 1)",
+            (employee, task, date_str)
+        )
+
+    # ------------------------------------------------------------------
+    # TaskStore interface
+    # ------------------------------------------------------------------
+    def mark(self, employee, task, date_str, sim_slot=None):
+        date_str = str(date_str)
+
+        if task == "sim" and not sim_slot:
+            print(f"❌ ERROR: sim_slot required for SIM task! Use sim_slot='morning'|'mid'|'night'|'midnight'")
+            return False
+
+        self.ensure_employee(employee)
+        day = self._day(date_str) or _new_day_record()
+
+        if task == "sim":
+            if not isinstance(day.get("sim"), dict):
+                day["sim"] = {slot: None for slot in SIM_SLOTS}
+            day["sim"][sim_slot] = employee
+            print(f"✅ Marked {employee} for SIM ({sim_slot}) on {date_str}")
+        elif task in ("wims", "hypercare"):
+            if not isinstance(day.get(task), list):
+                day[task] = []
+            if employee not in day[task]:
+                day[task].append(employee)
+            print(f"✅ Marked {employee} for {task} on {date_str}")
+        else:
+            day[task] = employee
+            print(f"✅ Marked {employee} for {task} on {date_str}")
+        self._write_day(date_str, day)
+        self._bump_decayed(employee, task, date_str, 1)
+
+        already = self.conn.execute(
+            "SELECT 1 FROM history WHERE login = ? AND task = ? AND date = ?", (employee, task, date_str)
+        ).fetchone()
+        if not already:
+            self.conn.execute(
+                "INSERT INTO history (login, task, date, date_ord) VALUES (?, ?, ?, ?)",
+                (employee, task, date_str, date_to_ordinal(date_str))
+            )
+
+        self._bump_count(employee, task, 1, True)
+        self.dirty = True
+        return True
+
+    def unmark(self, employee, task, date_str, sim_slot=None):
+        date_str = str(date_str)
+
+        if not self._employee_exists(employee):
+            print(f"⚠️ Employee {employee} not found in records")
+            return False
+
+        if task == "sim" and not sim_slot:
+            print(f"❌ ERROR: sim_slot required to unmark SIM! Use sim_slot='morning'|'mid'|'night'|'midnight'")
+            return False
+
+        day = self._day(date_str)
+
+        self._bump_decayed(employee, task, date_str, -1)
+        self._remove_history(employee, task, date_str)
+        self._bump_count(employee, task, -1, False)
+
+        if day is not None:
+            if task == "sim":
+                if isinstance(day.get("sim"), dict) and day["sim"].get(sim_slot) == employee:
+                    day["sim"][sim_slot] = None
+            elif task in ("wims", "hypercare"):
+                if isinstance(day.get(task), list) and employee in day[task]:
+                    day[task].remove(employee)
+            elif day.get(task) == employee:
+                day[task] = None
+            self._write_day(date_str, day)
+
+        self.dirty = True
+        print(f"✅ Unmarked {employee} from {task} on {date_str}")
+        return True
+
+    def _apply_batch(self, apply):
+        """Run `apply()` inside a savepoint so a failing batch leaves no partial rows."""
+        self.conn.execute("SAVEPOINT batch")
+        try:
+            apply()
+        except Exception:
+            self.conn.execute("ROLLBACK TO batch")
+            self.conn.execute("RELEASE batch")
+            raise
+        self.conn.execute("RELEASE batch")
+
+    def mark_many(self, assignments):
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+
+        def apply():
+            for login, task, date_str, slot in batch:
+                self.mark(login, task, date_str, sim_slot=slot)
+
+        self._apply_batch(apply)
+        return True
+
+    def unmark_many(self, assignments):
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+
+        def apply():
+            for login, task, date_str, slot in batch:
+                self.unmark(login, task, date_str, sim_slot=slot)
+
+        self._apply_batch(apply)
+        return True
+
+    def replace_day(self, date_str, assignments):
+        date_str = str(date_str)
+        batch = _normalise_batch(assignments)
+        if batch is None:
+            return False
+        if any(d != date_str for _login, _task, d, _slot in batch):
+            print(f"❌ ERROR: replace_day({date_str}) got assignments for other dates. Nothing was applied.")
+            return False
+
+        def apply():
+            self.clear_week([date_str])
+            self._write_day(date_str, _new_day_record())
+            for login, task, d, slot in batch:
+                self.mark(login, task, d, sim_slot=slot)
+
+        self._apply_batch(apply)
+        self.dirty = True
+        return True
+
+    def clear_week(self, week_dates):
+        week_dates_str = [str(d) for d in week_dates]
+        if not week_dates_str:
+            return week_dates_str
+        wanted = set(week_dates_str)
+        clause, params = _range_clause(*_date_span(week_dates_str))
+        rows = self.conn.execute(
+            f"SELECT date, task, login FROM day_assignments "
+            f"WHERE {clause} AND kind != 'list' AND login IS NOT NULL ORDER BY date_ord, rowid",
+            params
+        ).fetchall()
+        for date_str, task, employee in rows:
+            if date_str not in wanted or not self._employee_exists(employee):
+                continue
+            self._bump_decayed(employee, task, date_str, -1)
+            self._remove_history(employee, task, date_str)
+            self._bump_count(employee, task, -1, False)
+        deleted = self.conn.execute(
+            f"DELETE FROM day_assignments WHERE {clause} AND date IN ({','.join('?' * len(week_dates_str))})",
+            params + week_dates_str
+        ).rowcount
+        if deleted:
+            self.dirty = True
+        return week_dates_str
+
+    def eligible(self, available_today, task, date_str):
+        for e in available_today:
+            self.ensure_employee(e)
+
+        cycle = self.cycle(task)
+        state = {}
+        if available_today:
+            placeholders = ",".join("?" * len(available_today))
+            for login, total, served in self.conn.execute(
+                f"SELECT login, total, served FROM counts WHERE task = ? AND login IN ({placeholders})",
+                [task] + list(available_today)
+            ):
+                state[login] = (total, served >= cycle)
+
+        # A missing counts row behaves like the JSON default (not done, count 0)
+        not_done_yet = [e for e in available_today if not state.get(e, (0, False))[1]]
+
+        if not not_done_yet:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO counts (login, task, total, served) VALUES (?, ?, 0, -1)",
+                [(e, task) for e in available_today]
+            )
+            self.conn.executemany(
+                "UPDATE counts SET served = ? WHERE login = ? AND task = ?",
+                [(cycle - 1, e, task) for e in available_today]
+            )
+            if available_today:
+                self.dirty = True
+            not_done_yet = available_today[:]
+
+        today = date_to_ordinal(date_str)
+        if get_eligible_employees.FAIRNESS_MODE == "decayed" and today is not None:
+            not_done_yet.sort(key=lambda e: decayed_value(self.decayed_entry(e, task), today))
+        else:
+            not_done_yet.sort(key=lambda e: state.get(e, (0, False))[0])
+        return not_done_yet
+
+    def date_assignment(self, date_str, task):
+        day = self._day(str(date_str))
+        if day is None:
+            return None
+        return day.get(task, None)
+
+    def clear_date(self, date_str):
+        if self.conn.execute("DELETE FROM day_assignments WHERE date = ?", (str(date_str),)).rowcount:
+            self.dirty = True
+
+    def reset_cycle(self, task):
+        cycles = self._cycles()
+        cycles[task] = cycles.get(task, 0) + 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('task_cycles', ?)", (json.dumps(cycles),)
+        )
+        self.dirty = True
+
+    def stats(self, task=None):
+        stats = {}
+        if task:
+            for (login,) in self.conn.execute("SELECT login FROM employees ORDER BY rowid"):
+                stats[login] = 0
+            for login, total in self.conn.execute("SELECT login, total FROM counts WHERE task = ?", (task,)):
+                stats[login] = total
+        else:
+            for (login,) in self.conn.execute("SELECT login FROM employees ORDER BY rowid"):
+                stats[login] = {}
+            for login, t, total in self.conn.execute("SELECT login, task, total FROM counts ORDER BY rowid"):
+                stats.setdefault(login, {})[t] = total
+        return stats
+
+    def employee_history(self, employee):
+        row = self.conn.execute("SELECT extra FROM employees WHERE login = ?", (employee,)).fetchone()
+        if row is None:
+            return None
+        record = self._employee_record(employee, row[0])
+        cycles = self._cycles()
+        flags = {t: record["task_epochs"].get(t, -1) >= cycles.get(t, 0) for t in TASKS}
+        flags.update((t, e >= cycles.get(t, 0)) for t, e in record["task_epochs"].items())
+        return dict(record, task_flags=flags)
+
+    def week_assignments(self, week_dates):
+        week_dates = [str(d) for d in week_dates]
+        if not week_dates:
+            return {}
+        found = self.assignments_between(*_date_span(week_dates))
+        return {d: found[d] for d in week_dates if d in found}
+
+    def assignments_between(self, start=None, end=None, task=None):
+        clause, params = _range_clause(start, end)
+        if task is not None:
+            clause += " AND task = ?"
+            params.append(task)
+        found = {}
+        for row in self.conn.execute(
+            f"SELECT date, task, kind, slot, login FROM day_assignments WHERE {clause} ORDER BY date_ord, rowid",
+            params
+        ):
+            self._apply_day_row(found, *row)
+        if task is None:
+            return found
+        return {d: day[task] for d, day in found.items() if _has_assignee(day[task])}
+
+    def login_assignments_between(self, login, start=None, end=None, task=None):
+        clause, params = _range_clause(start, end)
+        clause += " AND task != ''"
+        if task is not None:
+            clause += " AND task = ?"
+            params.append(task)
+        return self.conn.execute(
+            f"SELECT date, task FROM history WHERE login = ? AND {clause} ORDER BY date_ord, rowid",
+            [login] + params
+        ).fetchall()
+
+    def task_counts_between(self, start=None, end=None, task=None):
+        clause, params = _range_clause(start, end)
+        if task is not None:
+            clause += " AND task = ?"
+            params.append(task)
+        return dict(self.conn.execute(
+            f"SELECT login, COUNT(*) FROM day_assignments "
+            f"WHERE {clause} AND kind != 'list' AND login IS NOT NULL GROUP BY login",
+            params
+        ))
+
+    def search_login(self, login):
+        """
+        Every (date, task) recorded for `login`, oldest first, straight from the index.
+
+        Returns:
+            list: [(date_str, task), ...]
+        """
+        return self.conn.execute(
+            "SELECT date, task FROM history WHERE login = ? AND task != '' "
+            "ORDER BY date_ord IS NULL, date_ord, rowid",
+            (login,)
+        ).fetchall()
+
+
+def migrate_json_to_sqlite(json_path=None, db_path=None):
+    """
+    Import an existing task_data.json into the SQLite engine.
+
+    Args:
+        json_path (str): Source JSON file (defaults to get_eligible_employees.FILE)
+        db_path (str): Target database file (defaults to DB_FILE)
+
+    Returns:
+        bool: True if successful
+    """
+    json_path = json_path or get_eligible_employees.FILE
+    try:
+        with open(json_path, "r") as f:
+            data = json.load(f)
+        store = SqliteTaskStore(db_path)
+        store.import_data(data)
+        store.flush()
+        store.close()
+        print(f"✅ Imported {json_path} into {store.path}")
+        return True
+    except Exception as e:
+        print(f"❌ Error importing {json_path}: {str(e)}")
+        return False
+
+
+def open_sqlite_store(db_path=None, json_path=None):
+    """
+    Open the SQLite store, seeding it from task_data.json the first time.
+    """
+    db_path = DB_FILE if db_path is None else db_path
+    is_new = not os.path.exists(db_path)
+    store = SqliteTaskStore(db_path)
+    if is_new and store.is_empty():
+        json_path = json_path or get_eligible_employees.FILE
+        if os.path.exists(json_path):
+            with open(json_path, "r") as f:
+                store.import_data(json.load(f))
+            store.flush()
+    return store
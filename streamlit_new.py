@@ -5,24 +5,20 @@ import json
 import os
 import sys
 from datetime import datetime,timedelta
-from daily_assignment import generate_daily_assignments
-from coverage import calculate_coverage_from_shifts
-from get_eligible_employees import clear_all_task_data
+from daily_assignment import ENGINES, generate_daily_assignments, generate_horizon_assignments
+from coverage import rolling_coverage
+from coverage_gaps import find_coverage_gaps, describe_gap
+from get_eligible_employees import (
+    clear_all_task_data, get_date_assignment, get_login_assignments, get_task_counts_between, get_week_assignments,
+    task_store_session,
+)
+from rota_search import generate_best_assignments
 from debugger import get_debug_logs, clear_logs, get_all_logs
-from parse_json import get_shift_groups_for_day
-from test_dataextraction_holiday import check_if_person_working_today
+from parse_json import ShiftCatalog
+from test_dataextraction_holiday import HolidayIndex
+from input_cache import load_schedule, load_holiday_tracker, read_dataframe
 
 # working_code = ["S1", "S2", "S3", "S4", "wfh", "Wfh", "WFH"]
-def _ensure_employee_exists(person, all_employees):
-    """Ensure employee exists in records"""
-    TASKS = ["hypercare", "sim", "dor", "wims", "eod"]
-    if person not in all_employees:
-        all_employees[person] = {
-            "history": {},
-            "total_counts": {t: 0 for t in TASKS},
-            "task_flags": {t: False for t in TASKS}
-        }
-
 def parse_shift_time(shift_str, base_date):
     """Parse shift time like '11:30-20:00' or '23:30-08:30' (overnight)"""
     start_str, end_str = shift_str.split('-')
@@ -41,6 +37,26 @@ def parse_shift_time(shift_str, base_date):
     return start_dt, end_dt
 
 
+def show_coverage_gaps(date_str):
+    """Show coverage gaps for one date, with suggested fixes, after a manual mark/unmark."""
+    if "schedule_data" not in st.session_state:
+        return
+    try:
+        fixes = find_coverage_gaps(
+            get_week_assignments([date_str]),
+            st.session_state.schedule_data,
+            [date_str],
+            working=st.session_state.get("holidays"),
+        ).get(date_str, [])
+    except ValueError:
+        # Not a DD/MM/YYYY date
+        return
+    if not fixes:
+        st.info(f"No coverage gaps on {date_str}")
+    for fix in fixes:
+        st.warning(describe_gap(fix))
+
+
 
 # Page configuration
 st.set_page_config(
@@ -222,6 +238,7 @@ with st.sidebar:
                         from get_eligible_employees import mark_employee_assigned
                         mark_employee_assigned(employee, task, date_str, sim_slot=sim_slot)
                         st.success(f"✅ Marked {employee} for {task} on {date_str}")
+                        show_coverage_gaps(date_str)
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
         
@@ -245,6 +262,7 @@ with st.sidebar:
                         from get_eligible_employees import unmark_employee_assigned
                         unmark_employee_assigned(employee_u, task_u, date_u, sim_slot=sim_slot_u)
                         st.success(f"✅ Unmarked {employee_u} from {task_u} on {date_u}")
+                        show_coverage_gaps(date_u)
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
 
@@ -255,7 +273,7 @@ with st.sidebar:
             
             if uploaded_file:
                 # Read CSV
-                df = pd.read_csv(uploaded_file)
+                df = read_dataframe(uploaded_file)
                 
                 st.markdown("### 📊 Preview & Edit")
                 st.info("Edit the table below, then click 'Save Changes'")
@@ -270,91 +288,76 @@ with st.sidebar:
                 
                 if st.button("💾 Save Changes to task_data.json", type="primary", use_container_width=True, key="save_rota"):
                     try:
-                        from get_eligible_employees import load_data, save_data
-                        
-                        data = load_data()
-                        all_employees = data["employees"]
-                        date_assignments = data["date_assignments"]
+                        from get_eligible_employees import replace_day
                         
                         processed_count = 0
+                        slot_map = {"am": "morning", "pm": "mid", "night": "night"}
                         
-                        for idx, row in edited_df.iterrows():
-                            date_str = str(row.get("Day", "")).strip()
-                            
-                            # Skip header/status rows
-                            if "WIMS Status" in date_str or "status" in date_str.lower():
-                                continue
-                            
-                            # Extract date
-                            if "(" in date_str:
-                                date_str = date_str.split("(")[0].strip()
-                            
-                            if not date_str or date_str.lower() == "day":
-                                continue
-                            
-                            # Initialize date
-                            if date_str not in date_assignments:
-                                date_assignments[date_str] = {
-                                    "hypercare": None,
-                                    "sim": {"morning": None, "mid": None, "night": None, "midnight": None},
-                                    "dor": None,
-                                    "wims": [],
-                                    "eod": None
-                                }
-                            
-                            # Process Hypercare
-                            hypercare = str(row.get("Hypercare", "")).strip()
-                            if hypercare and hypercare.lower() not in ["na", "nan", ""]:
-                                _ensure_employee_exists(hypercare, all_employees)
-                                date_assignments[date_str]["hypercare"] = hypercare
-                                processed_count += 1
-                            
-                            # Process SIM
-                            sim_str = str(row.get("SIMs", "")).strip()
-                            if sim_str and sim_str.lower() != "na":
-                                parts = sim_str.split("|")
-                                for part in parts:
-                                    part = part.strip()
-                                    if ":" in part:
-                                        slot, person = part.split(":", 1)
-                                        slot = slot.strip().lower()
-                                        person = person.strip()
-                                        
-                                        slot_map = {"am": "morning", "pm": "mid", "night": "night"}
-                                        slot = slot_map.get(slot, slot)
-                                        
-                                        if person and person.lower() not in ["na", "hyd"]:
-                                            _ensure_employee_exists(person, all_employees)
-                                            date_assignments[date_str]["sim"][slot] = person
-                                            processed_count += 1
-                            
-                            # Process DOR
-                            dor = str(row.get("DOR Call", "")).strip()
-                            if dor and dor.lower() not in ["na", "nan", "no dor", ""]:
-                                _ensure_employee_exists(dor, all_employees)
-                                date_assignments[date_str]["dor"] = dor
-                                processed_count += 1
-                            
-                            # Process EOD
-                            eod = str(row.get("EOD Report", "")).strip()
-                            if eod and eod.lower() not in ["na", "nan", ""]:
-                                _ensure_employee_exists(eod, all_employees)
-                                date_assignments[date_str]["eod"] = eod
-                                processed_count += 1
-                            
-                            # Process WIMS
-                            wims_str = str(row.get("WIMS Cases", "")).strip()
-                            if wims_str and wims_str.lower() != "na":
-                                people = [p.strip() for p in wims_str.split(",")]
-                                date_assignments[date_str]["wims"] = []
-                                for person in people:
-                                    if person and person.lower() not in ["na", "nan", ""]:
-                                        _ensure_employee_exists(person, all_employees)
-                                        if person not in date_assignments[date_str]["wims"]:
-                                            date_assignments[date_str]["wims"].append(person)
-                                        processed_count += 1
+                        def _people(cell, skip=("na", "nan", "")):
+                            """Split a comma separated cell (Hypercare, WIMS) into logins, dropping placeholders"""
+                            cell = str(cell).strip()
+                            return [p.strip() for p in cell.split(",") if p.strip().lower() not in skip]
+
+                        def _person(cell, column, date_str, skip=("na", "nan", "")):
+                            """Login of a one-person cell (DOR, EOD): the first one, with a warning if there are more"""
+                            people = _people(cell, skip)
+                            if len(people) > 1:
+                                st.warning(f"⚠️ {date_str}: {column} takes one person - keeping {people[0]}, "
+                                           f"ignoring {', '.join(people[1:])}")
+                            return people[:1]
+                        
+                        # One load and one write for the whole sheet
+                        with task_store_session():
+                            for idx, row in edited_df.iterrows():
+                                date_str = str(row.get("Day", "")).strip()
+                                
+                                # Skip header/status rows
+                                if "WIMS Status" in date_str or "status" in date_str.lower():
+                                    continue
+                                
+                                # Extract date
+                                if "(" in date_str:
+                                    date_str = date_str.split("(")[0].strip()
+                                
+                                if not date_str or date_str.lower() == "day":
+                                    continue
+                                
+                                day_assignments = []
+                                
+                                # Process Hypercare
+                                for person in _people(row.get("Hypercare", "")):
+                                    day_assignments.append((person, "hypercare", date_str, None))
+                                
+                                # Process SIM
+                                sim_str = str(row.get("SIMs", "")).strip()
+                                if sim_str and sim_str.lower() != "na":
+                                    for part in sim_str.split("|"):
+                                        part = part.strip()
+                                        if ":" in part:
+                                            slot, person = part.split(":", 1)
+                                            slot = slot_map.get(slot.strip().lower(), slot.strip().lower())
+                                            person = person.strip()
+                                            
+                                            if person and person.lower() not in ["na", "hyd"]:
+                                                day_assignments.append((person, "sim", date_str, slot))
+                                
+                                # Process DOR
+                                for person in _person(row.get("DOR Call", ""), "DOR Call", date_str, skip=("na", "nan", "no dor", "")):
+                                    day_assignments.append((person, "dor", date_str, None))
+                                
+                                # Process EOD
+                                for person in _person(row.get("EOD Report", ""), "EOD Report", date_str):
+                                    day_assignments.append((person, "eod", date_str, None))
+                                
+                                # Process WIMS
+                                for person in dict.fromkeys(_people(row.get("WIMS Cases", ""))):
+                                    day_assignments.append((person, "wims", date_str, None))
+                                
+                                # Replacing the day undoes the old history/counts/flags before
+                                # marking the edited set, so the two never drift apart
+                                if replace_day(date_str, day_assignments):
+                                    processed_count += len(day_assignments)
                         
-                        save_data(data)
                         st.success(f"✅ Saved {processed_count} assignments to task_data.json!")
                         st.balloons()
                         
@@ -397,6 +400,37 @@ excel_file = st.file_uploader(
     help="Upload your holiday_tracker.xlsx file"
 )
 
+# Rota options
+ENGINE_LABELS = {
+    "auto": "Auto (optimiser if available)",
+    "milp": "Whole-week optimiser",
+    "matching": "Weekly hypercare + daily matching",
+    "greedy": "Random rotation",
+}
+with st.expander("⚙️ Rota Options"):
+    engine = st.selectbox(
+        "Assignment engine",
+        ENGINES,
+        format_func=lambda e: ENGINE_LABELS[e],
+        help="How seats are filled. The optimiser and matching engines need scipy; without it they use the random rotation.",
+    )
+    weeks = st.number_input(
+        "Weeks to generate",
+        min_value=0,
+        value=0,
+        step=1,
+        help="0 plans every date in the holiday tracker in one go. N plans the first N calendar weeks "
+             "(Sunday to Saturday) one after another, so nobody gets hypercare on a Saturday and the next Sunday.",
+    )
+    candidates = st.number_input(
+        "Candidate rotas",
+        min_value=1,
+        max_value=16,
+        value=1,
+        step=1,
+        help="Generate this many rotas in parallel and keep the fairest one (fewest empty seats, most even task counts).",
+    )
+
 st.markdown("---")
 
 # Generate button
@@ -407,9 +441,22 @@ generate_button = st.button("🚀 Generate Assignments", use_container_width=Tru
 if schedule_file and excel_file:
     if generate_button:
         try:
-            schedule_data = json.load(schedule_file)
-            df = pd.read_excel(excel_file)
-            assignments = generate_daily_assignments(schedule_data, df, hypercare_list)
+            # Parsed uploads are cached by content hash, so regenerating the
+            # same week (or re-uploading the same files) skips Excel parsing
+            schedule_data = load_schedule(schedule_file)
+            tracker = load_holiday_tracker(excel_file)
+            df = tracker.df
+            if candidates > 1:
+                assignments = generate_best_assignments(
+                    schedule_data, df, hypercare_list, int(candidates), weeks=int(weeks) or None,
+                    holidays=tracker.holidays, engine=engine
+                )
+            elif weeks:
+                assignments = generate_horizon_assignments(
+                    schedule_data, df, hypercare_list, int(weeks), holidays=tracker.holidays, engine=engine
+                )
+            else:
+                assignments = generate_daily_assignments(schedule_data, df, hypercare_list, holidays=tracker.holidays, engine=engine)
             # # Get name mapping
             # login_to_name = get_login_to_name_mapping(df)
 
@@ -419,6 +466,8 @@ if schedule_file and excel_file:
             st.session_state.assignments = assignments
             st.session_state.schedule_data = schedule_data
             st.session_state.df = df
+            st.session_state.holidays = tracker.holidays
+            st.session_state.login_to_name = tracker.login_to_name
             st.session_state.assignment_dates = [
                 datetime.strptime(a['date'], "%d/%m/%Y").strftime("%a") 
                 for a in assignments
@@ -510,29 +559,14 @@ if hasattr(st.session_state, 'assignments'):
         st.subheader("Daily Coverage Summary")
         
         coverage_rows = []
-        next_day_hours = 0
-        for a in assignments:
-            cov = a.get("coverage", "No Coverage")
-            
-            # Use the coverage calculation function
-            if cov != "No Coverage":
-                all_shift_times = [cov]
-                coverage_str, hours_breakdown = calculate_coverage_from_shifts(all_shift_times, test=False)
-            else:
-                coverage_str = "No Coverage"
-                hours_breakdown = {"current_day": 0, "next_day": 0}
-            
-            total_hours = hours_breakdown["current_day"] + next_day_hours
-            if total_hours > 24:
-                total_hours = 24
-            pct = total_hours / 24 * 100 if total_hours > 0 else 0
-            next_day_hours = hours_breakdown["next_day"]
-            
+        # One sweep over the whole range; overnight shifts count on the day they spill into
+        day_coverage = rolling_coverage([(a["date"], a.get("shift_times", [])) for a in assignments])
+        for a, cov in zip(assignments, day_coverage):
             coverage_rows.append({
                 "Day": f"{a['date']} ({a['day']})",
-                "Coverage Window": coverage_str,
-                "Hours Covered": f"{total_hours:.1f}h",
-                "Coverage %": f"{pct:.1f}%"
+                "Coverage Window": a.get("coverage", "No Coverage"),
+                "Hours Covered": f"{cov['hours']:.1f}h",
+                "Coverage %": f"{cov['pct']:.1f}%"
             })
         
         df_coverage = pd.DataFrame(coverage_rows)
@@ -559,14 +593,17 @@ if hasattr(st.session_state, 'assignments'):
        
         
         stats_rows = []
+        holidays = st.session_state.get("holidays") or HolidayIndex(df)
+        catalog = ShiftCatalog(schedule_data)
         
         for i, a in enumerate(assignments):
             day_abbr = assignment_dates[i]
-            shift_lists = get_shift_groups_for_day(schedule_data, day_abbr)
+            shift_lists = catalog.groups(day_abbr)
             
             shift_types_to_include = ["morning", "mid", "night", "midnight"]
             row_data = {"Day": f"{a['date']} ({a['day']})"}
             daily_total = 0
+            working_today = set(holidays.working_on(a['date']))
             
             for shift_type in shift_types_to_include:
                 if shift_type not in shift_lists:
@@ -574,12 +611,7 @@ if hasattr(st.session_state, 'assignments'):
                     continue
                 
                 names = shift_lists[shift_type]
-                working_count = 0
-                
-                for login in names:
-                    status = check_if_person_working_today(a['date'], login, df,WorkingCodes)
-                    if status == "Working":
-                        working_count += 1
+                working_count = sum(1 for login in names if login in working_today)
                 
                 daily_total += working_count
                 row_data[shift_type.upper()] = working_count
@@ -617,34 +649,25 @@ if hasattr(st.session_state, 'assignments'):
         
         search_login = st.text_input("Enter login name to search:")
         if search_login:
-            # Search through assignments
+            # Every recorded assignment for the login, oldest first, from the
+            # store's per-login index (not just the rota generated above)
+            role_labels = {"hypercare": "Hypercare", "sim": "SIM", "dor": "DOR Call", "wims": "WIMS", "eod": "EOD Report"}
+            login = search_login.strip().lower()
             found_assignments = []
-            for a in assignments:
-                # Check Hypercare
-                if search_login.lower() in [x.lower() for x in a.get("hypercare", [])]:
-                    found_assignments.append({"Date": a['date'], "Day": a['day'], "Role": "Hypercare"})
-                
-                # Check WIMS
-                if search_login.lower() in [x.lower() for x in a.get("wims", [])]:
-                    found_assignments.append({"Date": a['date'], "Day": a['day'], "Role": "WIMS"})
-                
-                # Check SIMs (dict with slots)
-                sims_list = a.get("sim", {})
-                if isinstance(sims_list, dict):
-                    for slot, person in sims_list.items():
-                        if person and search_login.lower() == person.lower():
-                            found_assignments.append({"Date": a['date'], "Day": a['day'], "Role": f"SIM - {slot}"})
-                
-                # Check DOR (Direct on Rota)
-                dor = a.get("dor", "")
-                if dor and search_login.lower() == dor.lower():
-                    found_assignments.append({"Date": a['date'], "Day": a['day'], "Role": "DOR Call"})
-                
-                # Check EOD Report
-                eod = a.get("eod", "")
-                if eod and search_login.lower() == eod.lower():
-                    found_assignments.append({"Date": a['date'], "Day": a['day'], "Role": "EOD Report"})
-            
+            with task_store_session():
+                for date_str, task in get_login_assignments(login):
+                    try:
+                        day_name = datetime.strptime(date_str, "%d/%m/%Y").strftime("%a")
+                    except ValueError:
+                        day_name = ""
+                    role = role_labels.get(task, task)
+                    if task == "sim":
+                        slots = get_date_assignment(date_str, "sim") or {}
+                        slot = next((name for name, person in slots.items() if person == login), None)
+                        if slot:
+                            role = f"SIM - {slot}"
+                    found_assignments.append({"Date": date_str, "Day": day_name, "Role": role})
+
             if found_assignments:
                 st.success(f"✅ Found {len(found_assignments)} assignments for {search_login}")
                 df_history = pd.DataFrame(found_assignments)
@@ -860,6 +883,11 @@ if hasattr(st.session_state, 'assignments'):
                 
                 with st.expander("📈 Employee Assignment Counts", expanded=False):
                     if data.get("employees"):
+                        # Recent load, read from the date index rather than every day on record
+                        today = datetime.now()
+                        last_4_weeks = get_task_counts_between(
+                            (today - timedelta(weeks=4)).strftime('%d/%m/%Y'), today.strftime('%d/%m/%Y')
+                        )
                         stats_list = []
                         for emp, info in data["employees"].items():
                             stats_list.append({
@@ -869,7 +897,8 @@ if hasattr(st.session_state, 'assignments'):
                                 "DOR": info["total_counts"].get("dor", 0),
                                 "EOD": info["total_counts"].get("eod", 0),
                                 "WIMS": info["total_counts"].get("wims", 0),
-                                "Total": sum(info["total_counts"].values())
+                                "Total": sum(info["total_counts"].values()),
+                                "Last 4 Weeks": last_4_weeks.get(emp, 0),
                             })
                         
                         stats_df = pd.DataFrame(stats_list).sort_values("Total", ascending=False)
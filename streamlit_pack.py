@@ -1,9 +1,9 @@
 # app.py or wherever your Streamlit code is
 import streamlit as st
 import pandas as pd
-import json
 from daily_assignment import generate_daily_assignments
-from coverage import calculate_coverage_from_shifts
+from coverage import rolling_coverage
+from input_cache import load_schedule, load_holiday_tracker
 
 st.title("Daily Assignment Generator")
 
@@ -20,9 +20,10 @@ hypercare_input = st.text_area(
 hypercare_list = [x.strip().lower() for x in hypercare_input.split(",") if x.strip()]
 
 if schedule_file and excel_file:
-    schedule_data = json.load(schedule_file)
-    df = pd.read_excel(excel_file)
-    assignments = generate_daily_assignments(schedule_data, df, hypercare_list)
+    schedule_data = load_schedule(schedule_file)
+    tracker = load_holiday_tracker(excel_file)
+    df = tracker.df
+    assignments = generate_daily_assignments(schedule_data, df, hypercare_list, holidays=tracker.holidays)
     
     # -----------------------------
     # Display formatted table
@@ -74,31 +75,14 @@ if schedule_file and excel_file:
     # ---------------------------------------
     st.subheader("Daily Coverage Summary")
     coverage_rows = []
-    next_day_hours = 0
-    for a in assignments:
-        cov = a.get("coverage", "No Coverage")
-  
-        # Use the coverage calculation function
-        # Convert coverage string back to shift times list for calculation
-        if cov != "No Coverage":
-            all_shift_times = [cov]
-            coverage_str, hours_breakdown = calculate_coverage_from_shifts(all_shift_times, test=False)
-        else:
-            coverage_str = "No Coverage"
-            hours_breakdown = {"current_day": 0, "next_day": 0}
-        
-        total_hours = hours_breakdown["current_day"] + next_day_hours
-        if total_hours >24:
-            total_hours =24
-
-        next_day_hours = hours_breakdown["next_day"]
-        pct = total_hours / 24 * 100 if total_hours > 0 else 0
-        
+    # One sweep over the whole range; overnight shifts count on the day they spill into
+    day_coverage = rolling_coverage([(a["date"], a.get("shift_times", [])) for a in assignments])
+    for a, cov in zip(assignments, day_coverage):
         coverage_rows.append({
             "Day": f"{a['date']} ({a['day']})",
-            "Coverage Window": coverage_str,
-            "Hours Covered": f"{total_hours:.1f}",
-            "Coverage %": f"{pct:.1f}%"
+            "Coverage Window": a.get("coverage", "No Coverage"),
+            "Hours Covered": f"{cov['hours']:.1f}",
+            "Coverage %": f"{cov['pct']:.1f}%"
         })
     
     # Display the coverage table
@@ -2,15 +2,13 @@ import streamlit as st
 import pandas as pd
 import re
 from datetime import datetime, timedelta
-import random
 from collections import deque
 import io
 import json
 from pathlib import Path
-import math
 import copy
-import os
-import io
+from shift_parser import ShiftBand, classify_shift
+from assignment_tracker import AssignmentTracker
 
 # Page configuration
 st.set_page_config(
@@ -22,102 +20,6 @@ st.set_page_config(
 st.title("📅 Amazon Rota System Generator")
 st.markdown("Generate weekly task assignments with fair rotation tracking")
 
-# === ASSIGNMENT HISTORY MANAGEMENT ===
-class AssignmentTracker:
-    """Track assignment history to ensure fair rotation"""
-    
-    def __init__(self, history_file='assignment_history.json'):
-        self.history_file = history_file
-        self.history = self.load_history()
-    
-    def load_history(self):
-        """Load assignment history from file"""
-        if Path(self.history_file).exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    def save_history(self):
-        """Save assignment history to file"""
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
-    
-    def _key(self, person, task_type):
-        return f"{person}_{task_type}"
-    
-    def get_last_assignment(self, person, task_type):
-        """Get the last assignment date for a person and task type"""
-        key = self._key(person, task_type)
-        if key in self.history and 'last_date' in self.history[key]:
-            try:
-                return datetime.fromisoformat(self.history[key]['last_date'])
-            except:
-                return None
-        return None
-    
-    def get_assignment_count(self, person, task_type, weeks=52):
-        """Get assignment count for a person in the last N weeks (default 52 weeks)"""
-        key = self._key(person, task_type)
-        if key not in self.history:
-            return 0
-        
-        cutoff_date = datetime.now() - timedelta(weeks=weeks)
-        count = 0
-        for date_str in self.history[key].get('dates', []):
-            try:
-                if datetime.fromisoformat(date_str) > cutoff_date:
-                    count += 1
-            except:
-                pass
-        return count
-    
-    def record_assignment(self, person, task_type, date):
-        """Record a new assignment"""
-        key = self._key(person, task_type)
-        if key not in self.history:
-            self.history[key] = {'dates': [], 'total_count': 0}
-        
-        date_str = date.isoformat() if isinstance(date, datetime) else date
-        self.history[key]['dates'].append(date_str)
-        self.history[key]['last_date'] = date_str
-        self.history[key]['total_count'] = self.history[key].get('total_count', 0) + 1
-        
-        cutoff_date = datetime.now() - timedelta(weeks=52)
-        self.history[key]['dates'] = [
-            d for d in self.history[key]['dates']
-            if (lambda ds: (datetime.fromisoformat(ds) > cutoff_date) if isinstance(ds, str) and ds.count("-")>=2 else False)(d)
-        ]
-    
-    def can_assign(self, person, task_type, current_date, min_days_gap=5):
-        """Check if a person can be assigned to a task (enforces min days gap)"""
-        last_assignment = self.get_last_assignment(person, task_type)
-        if last_assignment is None:
-            return True
-        
-        if isinstance(current_date, str):
-            try:
-                current_date = datetime.strptime(current_date, "%a %m/%d/%Y")
-            except:
-                return True
-        
-        days_since_last = (current_date - last_assignment).days
-        return days_since_last >= min_days_gap
-    
-    def get_eligible_sorted(self, people_list, task_type, current_date, min_days_gap=5, weeks_for_count=52):
-        """Get eligible people sorted by assignment count (fairness)"""
-        eligible = []
-        for person in people_list:
-            if self.can_assign(person, task_type, current_date, min_days_gap):
-                count = self.get_assignment_count(person, task_type, weeks=weeks_for_count)
-                eligible.append((person, count))
-        
-        eligible.sort(key=lambda x: (x[1], x[0]))
-        return [person for person, count in eligible]
-
-
 # === SHIFT LEGENDS (kept for compatibility) ===
 SHIFT_LEGENDS = {
     'S1': {'description': 'Early Morning Shift', 'time': '05:00-08:30', 'type': 'Morning'},
@@ -133,6 +35,13 @@ SHIFT_LEGENDS = {
     'M/P': {'description': 'Maternity/Paternity leave', 'time': 'Off', 'type': 'Holiday'}
 }
 
+# Classes for raw shift times, by start time (minutes since midnight)
+SHIFT_BANDS = (
+    ShiftBand("Morning", 0, 8 * 60 + 59),
+    ShiftBand("Mid", 9 * 60, 18 * 60 + 59),
+    ShiftBand("Night", 19 * 60, 24 * 60),
+)
+
 
 # functions to load fixed schedule JSON and rota_holiday.xlsx, then merge ===
 def load_schedule_and_holiday_data(schedule_path='schedule.json', holiday_file=None):
@@ -189,8 +98,7 @@ def try_load_holiday_file(uploaded_file):
             content = content.decode('utf-8')
 
         # Try to detect the delimiter by checking the first few lines
-        lines = content.split('
-')[:3]
+        lines = content.split('\n')[:3]
 
         # Check if it's tab-separated or comma-separated
         if '\t' in lines:  # Row 3 should have tabs
@@ -382,7 +290,8 @@ def get_shift_type(shift_str):
     if shift_str in SHIFT_LEGENDS:
         return SHIFT_LEGENDS[shift_str]['type']
     
-    return "NA"
+    # Raw shift times
+    return classify_shift(shift_str, SHIFT_BANDS) or "NA"
 
 def get_shift_value(row, day_col):
     """Return the shift status for a row and day column"""
@@ -521,57 +430,10 @@ def select_people_for_slots(tracker, candidates, task_type, current_date, slots=
     """
     Select people with RANDOMIZATION for variety across regenerations
     """
-    candidates = list(candidates)
-    if not candidates:
-        return []
-    
-    num_people = len(candidates)
-    if num_people == 0:
-        return []
-    
-    soft_max = max(1, math.ceil(total_slots / num_people))
-    
-    eligible = tracker.get_eligible_sorted(candidates, task_type, current_date, min_days_gap=min_days_gap, weeks_for_count=weeks_for_count)
-    
-    if not eligible:
-        eligible = tracker.get_eligible_sorted(candidates, task_type, current_date, min_days_gap=max(1, min_days_gap-1), weeks_for_count=weeks_for_count)
-        if not eligible:
-            eligible = tracker.get_eligible_sorted(candidates, task_type, current_date, min_days_gap=0, weeks_for_count=weeks_for_count)
-            if not eligible:
-                return []
-    
-    # ADD RANDOMIZATION: shuffle people with the same assignment count
-    count_groups = {}
-    for person in eligible:
-        count = tracker.get_assignment_count(person, task_type, weeks=weeks_for_count)
-        if count not in count_groups:
-            count_groups[count] = []
-        count_groups[count].append(person)
-    
-    randomized_eligible = []
-    for count in sorted(count_groups.keys()):
-        group = count_groups[count]
-        random.shuffle(group)
-        randomized_eligible.extend(group)
-    
-    eligible = randomized_eligible
-    
-    under_limit = [p for p in eligible if tracker.get_assignment_count(p, task_type, weeks=weeks_for_count) < soft_max]
-    
-    chosen = []
-    for p in under_limit:
-        if len(chosen) >= slots:
-            break
-        chosen.append(p)
-    
-    if len(chosen) < slots:
-        remaining = [p for p in eligible if p not in chosen]
-        for p in remaining:
-            if len(chosen) >= slots:
-                break
-            chosen.append(p)
-    
-    return chosen
+    return tracker.select(
+        candidates, task_type, current_date, slots=slots,
+        gaps=(min_days_gap, max(1, min_days_gap - 1), 0), weeks_for_count=weeks_for_count,
+    )
 
 def generate_rota_from_availability(availability, hypercare_list, hyd_team, days_of_week, break_schedule, tracker):
     """Generate rota assignments from availability matrix with fair rotation"""
@@ -742,29 +604,14 @@ def create_daily_statistics_table(holiday_off_df, task_table, days_of_week):
         if day_col is None:
             continue
         
-        working_count = 0
-        holiday_count = 0
-        off_count = 0
-        morning_count = 0
-        mid_count = 0
-        night_count = 0
-        
-        for idx, row in holiday_off_df.iterrows():
-            shift_type = row.get(day_col, "Off")
-            
-            if shift_type == "Morning":
-                morning_count += 1
-                working_count += 1
-            elif shift_type == "Mid":
-                mid_count += 1
-                working_count += 1
-            elif shift_type == "Night":
-                night_count += 1
-                working_count += 1
-            elif shift_type == "Holiday":
-                holiday_count += 1
-            elif shift_type == "Off":
-                off_count += 1
+        # One vectorised count over the day column instead of a row-by-row loop
+        status_counts = holiday_off_df[day_col].value_counts()
+        morning_count = int(status_counts.get("Morning", 0))
+        mid_count = int(status_counts.get("Mid", 0))
+        night_count = int(status_counts.get("Night", 0))
+        working_count = morning_count + mid_count + night_count
+        holiday_count = int(status_counts.get("Holiday", 0))
+        off_count = int(status_counts.get("Off", 0))
         
         task_row = task_table[task_table['Day'] == day]
         
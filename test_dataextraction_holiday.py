@@ -1,4 +1,5 @@
 
+import numpy as np
 import pandas as pd
 
 # Load the file
@@ -8,66 +9,111 @@ import pandas as pd
 # --- STEP 1: Identify the row that contains dates (Sunday, Monday, ...) ---
 
 
-def check_if_person_working_today(date,login,df):
-    working_code = ["S1", "S2", "S3", "S4", "wfh", "Wfh", "WFH"]
-    date_row = df.iloc[1]   # The first row contains dates
+WORKING_CODES = ["S1", "S2", "S3", "S4", "wfh", "Wfh", "WFH"]
 
-    # Extract the mapping: column_name → actual date
-    date_columns = {
-        col: date_row[col]
-        for col in df.columns
-        if isinstance(date_row[col], pd.Timestamp)
-    }
 
-    # --- STEP 2: Extract login-name pairs ---
-    people_df = df.iloc[2:,:2]   # Data starts from row index 2
+class HolidayIndex:
+    """
+    Holiday tracker parsed once into date -> column and login -> row lookups.
 
+    Layout of the sheet:
+        row 0      dates (one column per day)
+        rows 2..   login in column 0, name in column 1, a shift/leave code per date column
 
-    shift_schedule_df = df  # Shift schedule starts from row index 2 and column index 2
-    # shift_schedule_df = shift_schedule_df.rename(columns={
-    #     "Unnamed: 0": "Login",
-    #     "Unnamed: 1": "Name"
-    # })
+    Build it once per tracker and reuse it for every (login, date) question;
+    status() is then two dict lookups and one cell read. The DataFrame is not
+    modified. Any number of date columns works, so a month-long tracker is
+    handled the same way as a single week.
 
-    dates_raw = pd.to_datetime(df.iloc[0], errors="coerce",dayfirst=True)  # Dates are in the second row and columns 7 
-    # date formatting 
-    def format_date(d):
-        if pd.isna(d):
+    For whole-day questions use the availability matrix: one isin() over the
+    sheet gives a logins x dates boolean array, and working_on(date) is a
+    single column slice of it.
+    """
+
+    def __init__(self, df, working_codes=None):
+        """
+        Args:
+            df (pd.DataFrame): Holiday tracker sheet
+            working_codes (list): Codes that count as working. Defaults to WORKING_CODES.
+        """
+        self.df = df
+        self.working_codes = set(working_codes or WORKING_CODES)
+
+        # 'DD/MM/YYYY' -> column position (first column wins, as before)
+        self.date_columns = {}
+        dates_raw = pd.to_datetime(df.iloc[0], errors="coerce", dayfirst=True)
+        for col_idx, d in enumerate(dates_raw):
+            if not pd.isna(d):
+                self.date_columns.setdefault(d.strftime("%d/%m/%Y"), col_idx)
+
+        # login -> row position (first row wins, as before)
+        self.login_rows = {}
+        for row_offset, login in enumerate(df.iloc[2:, 0]):
+            self.login_rows.setdefault(login, row_offset + 2)
+
+        self.logins = np.array(list(self.login_rows), dtype=object)
+        self.dates = list(self.date_columns)
+        self._date_pos = {date: i for i, date in enumerate(self.dates)}
+        self._available = None
+
+    @property
+    def available(self):
+        """Boolean array [login, date] in the order of self.logins / self.dates."""
+        if self._available is None:
+            codes = self.df.iloc[list(self.login_rows.values()), list(self.date_columns.values())]
+            self._available = codes.isin(self.working_codes).to_numpy(dtype=bool)
+        return self._available
+
+    def availability_matrix(self):
+        """
+        Returns:
+            pd.DataFrame: logins x dates (DD/MM/YYYY) of booleans, True = working
+        """
+        return pd.DataFrame(self.available, index=self.logins, columns=self.dates)
+
+    def working_on(self, date):
+        """
+        Logins working on `date` (DD/MM/YYYY), in tracker order.
+
+        Returns:
+            list: Empty if the date is not in the tracker
+        """
+        pos = self._date_pos.get(date)
+        if pos is None:
+            return []
+        return self.logins[self.available[:, pos]].tolist()
+
+    def code(self, login, date):
+        """Raw tracker code for `login` on `date` (DD/MM/YYYY), or None if either is unknown."""
+        col_idx = self.date_columns.get(date)
+        row_idx = self.login_rows.get(login)
+        if col_idx is None or row_idx is None:
             return None
-        return d.strftime("%d/%m/%Y")
-
-    dates_df = dates_raw.apply(format_date)
-    shift_schedule_df.iloc[0]=dates_df
-        
-    # Find the column index for the given date in the 0th row
-    date_row = shift_schedule_df.iloc[0]
-    col_idx = None
-    for idx, val in enumerate(date_row):
-        if val == date:
-            col_idx = idx
-            break
-    if col_idx is None:
-        return "Date not found"
-
-    # Find the row index for the given login
-    login_row_idx = None
-    # print(shift_schedule_df.head(5))
-    people_row = people_df.iloc[:, 0]
-    for idx, val in enumerate(people_row):
-        if val == login:
-            login_row_idx = idx
-            break
-    if login_row_idx is None:
-        return "login not found"
-    
-    code = shift_schedule_df.iloc[login_row_idx+2, col_idx]
-    if code in working_code:
-        # print("Working")
-        return "Working"
-        
-    else:
+        return self.df.iat[row_idx, col_idx]
+
+    def status(self, login, date):
+        """
+        Returns:
+            str: "Working", "Not Working", "Date not found" or "login not found"
+        """
+        if date not in self.date_columns:
+            return "Date not found"
+        if login not in self.login_rows:
+            return "login not found"
+        if self.code(login, date) in self.working_codes:
+            return "Working"
         return "Not Working"
-        # print("Not Working")
+
+    def is_working(self, login, date):
+        return self.status(login, date) == "Working"
+
+
+def check_if_person_working_today(date, login, df, working_codes=None):
+    """
+    One-off lookup. Callers checking many logins/dates should build a
+    HolidayIndex once and call status() instead.
+    """
+    return HolidayIndex(df, working_codes).status(login, date)
 
 
 
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+# The app's modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from get_eligible_employees import TaskStore, _empty_data, task_store_session  # noqa: E402
+from journal_store import JournalTaskStore  # noqa: E402
+from parse_json import DAYS  # noqa: E402
+from sqlite_store import SqliteTaskStore  # noqa: E402
+
+SHIFT_TIMES = [
+    "06:30-15:00", "08:00-16:10", "09:30-18:00", "11:30-20:00",
+    "13:00-21:10", "14:30-23:00", "23:30-08:30",
+]
+
+
+@pytest.fixture
+def rota_inputs():
+    """
+    Factory for a synthetic (schedule_data, holiday tracker df) pair.
+
+    Everyone works the same shift every day; `holiday_rate` of the tracker
+    cells are "H" (off), the rest "S1" (working).
+    """
+    def make(people=30, start="31/05/2026", days=7, holiday_rate=0.0, seed=0):
+        rnd = random.Random(seed)
+        logins = [f"l{i}" for i in range(people)]
+        schedule = {login: dict.fromkeys(DAYS, SHIFT_TIMES[i % len(SHIFT_TIMES)]) for i, login in enumerate(logins)}
+        dates = pd.date_range(pd.to_datetime(start, dayfirst=True), periods=days)
+        rows = [["", ""] + list(dates), ["login", "name"] + [""] * days]
+        for login in logins:
+            rows.append([login, login.upper()] + ["H" if rnd.random() < holiday_rate else "S1" for _ in dates])
+        return schedule, pd.DataFrame(rows)
+    return make
+
+
+@pytest.fixture
+def memory_store():
+    """An empty in-memory task store serving every get_eligible_employees call."""
+    store = TaskStore(path=False, data=_empty_data())
+    with task_store_session(store=store):
+        yield store
+
+
+@pytest.fixture(params=["json", "sqlite", "journal"])
+def store(request, tmp_path):
+    """An empty task store for each storage engine (in-memory JSON, SQLite, journal)."""
+    if request.param == "json":
+        store = TaskStore(path=False, data=_empty_data())
+    elif request.param == "sqlite":
+        store = SqliteTaskStore(str(tmp_path / "task_data.db"))
+    else:
+        store = JournalTaskStore(str(tmp_path / "task_data.json"))
+    yield store
+    store.close()
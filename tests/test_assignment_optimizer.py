@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from assignment_optimizer import _FORBIDDEN, _hungarian
+
+linear_sum_assignment = pytest.importorskip("scipy.optimize").linear_sum_assignment
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 3), (4, 9), (6, 10), (12, 12)])
+def test_hungarian_matches_linear_sum_assignment(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(20):
+        cost = rng.random(shape) * 100
+        # Seats a person can't take, as match_day builds them
+        cost[rng.random(shape) < 0.3] = _FORBIDDEN
+
+        columns = _hungarian(cost)
+        rows, expected = linear_sum_assignment(cost)
+
+        assert len(set(columns)) == shape[0]
+        assert cost[np.arange(shape[0]), columns].sum() == pytest.approx(cost[rows, expected].sum())
@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("scipy")
+# daily_assignment logs through the streamlit debug console
+pytest.importorskip("debugger", reason="streamlit is not installed")
+
+from daily_assignment import calendar_weeks, generate_horizon_assignments  # noqa: E402
+
+EVERY_DAY = ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+
+def _back_to_back(assignments):
+    """(date, login) for everyone on hypercare the day before too."""
+    found = []
+    for before, day in zip(assignments, assignments[1:]):
+        found.extend((day["date"], login) for login in set(before["hypercare"]) & set(day["hypercare"]))
+    return found
+
+
+@pytest.mark.parametrize("engine", ["milp", "matching", "greedy"])
+def test_seats_left_empty_rather_than_back_to_back(rota_inputs, memory_store, engine):
+    random.seed(0)
+    schedule, df = rota_inputs(days=28)
+    # Three people can't cover two seats every day without repeating
+    hypercare_list = ["l0", "l1", "l2"]
+
+    assignments = generate_horizon_assignments(
+        schedule, df, hypercare_list, custom_requirements=dict.fromkeys(EVERY_DAY, 2), engine=engine
+    )
+
+    assert len(assignments) == 28
+    assert _back_to_back(assignments) == []
+    assert any(len(day["hypercare"]) < 2 for day in assignments)
+
+
+def test_milp_rotates_hypercare_over_several_weeks(rota_inputs, memory_store):
+    random.seed(0)
+    schedule, df = rota_inputs(days=42)
+    hypercare_list = [f"l{i}" for i in range(9)]
+
+    assignments = generate_horizon_assignments(schedule, df, hypercare_list, engine="milp")
+
+    assert _back_to_back(assignments) == []
+    totals = Counter(login for day in assignments for login in day["hypercare"])
+    assert set(totals) == set(hypercare_list)
+    assert max(totals.values()) - min(totals.values()) <= 1
+    weeks = [assignments[i:i + 7] for i in range(0, 42, 7)]
+    # Cycles restart, so the weekly pattern does not simply repeat
+    patterns = {tuple(tuple(sorted(day["hypercare"])) for day in week) for week in weeks}
+    assert len(patterns) == len(weeks)
+
+
+def test_calendar_weeks_start_on_sunday():
+    # 03/06/2026 is a Wednesday
+    dates = [f"{day:02d}/06/2026" for day in range(3, 18)]
+
+    weeks = calendar_weeks(dates)
+
+    assert [len(week) for week in weeks] == [4, 7, 4]
+    assert weeks[1][0] == "07/06/2026"
+    assert [d for week in weeks for d in week] == dates
+
+
+def test_horizon_weeks_follow_the_calendar(rota_inputs, memory_store):
+    schedule, df = rota_inputs(start="03/06/2026", days=21)
+
+    assignments = generate_horizon_assignments(schedule, df, ["l0", "l1", "l2", "l3"], weeks=2, engine="greedy")
+
+    assert [day["day"] for day in assignments] == ["Wed", "Thu", "Fri", "Sat"] + EVERY_DAY
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pytest
+
+import get_eligible_employees
+from assignment_tracker import AssignmentTracker
+from fairness_decay import decayed_from_ordinals, half_life
+
+
+def _ordinal(date_str):
+    return datetime.strptime(date_str, "%d/%m/%Y").toordinal()
+
+
+def _decayed_counts(store, login):
+    return store.data["employees"][login].get("decayed_counts", {})
+
+
+def test_lifetime_mode_keeps_no_decayed_counters(store, monkeypatch):
+    monkeypatch.setattr(get_eligible_employees, "FAIRNESS_MODE", "lifetime")
+    store.mark("a", "dor", "01/06/2026")
+    store.mark("a", "dor", "03/06/2026")
+    store.unmark("a", "dor", "03/06/2026")
+    store.eligible(["a", "b"], "dor", "04/06/2026")
+
+    assert _decayed_counts(store, "a") == {}
+
+
+def test_decayed_mode_follows_history_across_mode_switches(store, monkeypatch):
+    monkeypatch.setattr(get_eligible_employees, "FAIRNESS_MODE", "decayed")
+    store.mark("a", "dor", "01/06/2026")
+    # A lifetime-mode mark drops the counter rather than leaving it stale
+    monkeypatch.setattr(get_eligible_employees, "FAIRNESS_MODE", "lifetime")
+    store.mark("a", "dor", "03/06/2026")
+    assert "dor" not in _decayed_counts(store, "a")
+
+    monkeypatch.setattr(get_eligible_employees, "FAIRNESS_MODE", "decayed")
+    store.mark("a", "dor", "05/06/2026")
+    expected = decayed_from_ordinals([_ordinal(d) for d in ("01/06/2026", "03/06/2026", "05/06/2026")], half_life("dor"))
+    assert _decayed_counts(store, "a")["dor"] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("fairness", ["window", "decayed"])
+def test_tracker_builds_decayed_counts_only_in_decayed_mode(tmp_path, fairness):
+    tracker = AssignmentTracker(str(tmp_path / "history.json"), fairness=fairness)
+    tracker.record_assignment("a", "Hypercare", datetime.now())
+    tracker.history = dict(tracker.history)
+
+    assert ("decayed" in tracker.history["a_Hypercare"]) == (fairness == "decayed")
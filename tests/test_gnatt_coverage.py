@@ -0,0 +1,17 @@
+from gnatt_coverage import task_coverage_blocks
+
+
+def test_split_shift_gap_is_not_covered():
+    schedule = {
+        "a": {"Mon": "08:00-10:00/14:00-18:00"},
+        "b": {"Mon": "09:00-11:00"},
+        "c": {"Mon": "23:30-08:30"},
+    }
+    # 01/06/2026 is a Monday
+    date_assignments = {"01/06/2026": {"hypercare": ["a", "b"], "sim": {"morning": "c"}, "wims": []}}
+
+    blocks = task_coverage_blocks(date_assignments, schedule)["01/06/2026"]
+
+    assert blocks["hypercare"] == [(8 * 60, 11 * 60), (14 * 60, 18 * 60)]
+    assert blocks["sim"] == [(23 * 60 + 30, 24 * 60 + 8 * 60 + 30)]
+    assert blocks["wims"] == []
@@ -0,0 +1,77 @@
+import itertools
+import random
+
+from hypercare_solver import solve_hypercare_week
+
+
+def _back_to_back(assignments):
+    return [(k, p) for k in range(len(assignments) - 1) for p in set(assignments[k]) & set(assignments[k + 1])]
+
+
+def _most_seats(eligible_by_day, requirements):
+    """Brute force: most seats fillable with no one on back-to-back days."""
+    options = [
+        [set(team) for size in range(min(need, len(day)) + 1) for team in itertools.combinations(day, size)]
+        for day, need in zip(eligible_by_day, requirements)
+    ]
+    best = 0
+    for plan in itertools.product(*options):
+        if not _back_to_back(plan):
+            best = max(best, sum(len(team) for team in plan))
+    return best
+
+
+def test_feasible_week_meets_every_requirement():
+    eligible = [["a", "b", "c", "d"]] * 7
+    plan = solve_hypercare_week(eligible, [1, 2, 2, 2, 1, 2, 1])
+
+    assert plan.feasible
+    assert plan.problems == []
+    assert [len(day) for day in plan.assignments] == [1, 2, 2, 2, 1, 2, 1]
+    assert _back_to_back(plan.assignments) == []
+
+
+def test_infeasible_week_fills_the_most_seats():
+    plan = solve_hypercare_week([["a"], ["a"], ["a", "b"], ["a", "b"]], [1, 1, 2, 2])
+
+    assert not plan.feasible
+    assert sum(len(day) for day in plan.assignments) == 3
+    assert _back_to_back(plan.assignments) == []
+    assert plan.problems
+
+
+def test_short_day_is_reported():
+    plan = solve_hypercare_week([["a", "b"], ["c"], ["a", "b"]], [1, 2, 1], day_names=["Mon", "Tue", "Wed"])
+
+    assert not plan.feasible
+    assert plan.assignments[1] == ["c"]
+    assert "Tue: needs 2, only 1 eligible" in plan.problems
+
+
+def test_previous_day_is_kept_off_the_first_day():
+    plan = solve_hypercare_week([["a", "b", "c"], ["a", "b", "c"]], [2, 1], previous=["a"])
+
+    assert plan.feasible
+    assert "a" not in plan.assignments[0]
+    assert plan.assignments[1] == ["a"]
+
+
+def test_previous_day_can_leave_the_first_day_short():
+    plan = solve_hypercare_week([["a"], ["a", "b"]], [1, 1], day_names=["Sun", "Mon"], previous=["a"])
+
+    assert not plan.feasible
+    assert plan.assignments == [[], ["a"]]
+    assert "Sun: needs 1, only 0 eligible" in plan.problems
+
+
+def test_matches_brute_force_on_small_weeks():
+    rnd = random.Random(7)
+    people = ["a", "b", "c"]
+    for _ in range(200):
+        eligible = [[p for p in people if rnd.random() < 0.6] for _ in range(5)]
+        requirements = [rnd.choice([1, 2]) for _ in range(5)]
+        plan = solve_hypercare_week(eligible, requirements)
+
+        assert _back_to_back(plan.assignments) == []
+        assert all(set(day) <= set(allowed) for day, allowed in zip(plan.assignments, eligible))
+        assert sum(len(day) for day in plan.assignments) == _most_seats(eligible, requirements)
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from get_eligible_employees import DateIndex
+
+
+def test_date_index_sorts_by_date_not_text():
+    dates = [f"{day:02d}/{month:02d}/2026" for month in (1, 2, 3) for day in (1, 15, 28)]
+    shuffled = dates + ["notes", "01/02/2026"]
+    random.Random(0).shuffle(shuffled)
+
+    index = DateIndex(shuffled)
+
+    assert index.between() == dates
+    assert index.between("15/01/2026", "01/03/2026") == dates[1:7]
+    assert index.undated == ["notes"]
+    index.add("10/02/2026")
+    index.discard("01/02/2026")
+    assert index.between("01/02/2026", "28/02/2026") == ["10/02/2026", "15/02/2026", "28/02/2026"]
+
+
+
+def test_range_queries_follow_the_date_index(store):
+    # Text order would put 02/06 before 30/05
+    for date_str, login in (("30/05/2026", "a"), ("31/05/2026", "b"), ("02/06/2026", "a"), ("09/06/2026", "c")):
+        store.mark(login, "dor", date_str)
+    store.mark("b", "wims", "02/06/2026")
+
+    assert list(store.assignments_between("31/05/2026", "06/06/2026")) == ["31/05/2026", "02/06/2026"]
+    assert store.assignments_between(None, "02/06/2026", task="wims") == {"02/06/2026": ["b"]}
+    assert store.task_counts_between("31/05/2026", None, task="dor") == {"b": 1, "a": 1, "c": 1}
+
+    week = ["02/06/2026", "31/05/2026", "01/06/2026"]
+    assert list(store.week_assignments(week)) == ["02/06/2026", "31/05/2026"]
+
+    store.clear_week(week)
+
+    assert list(store.assignments_between()) == ["30/05/2026", "09/06/2026"]
+    assert store.data["employees"]["a"]["total_counts"]["dor"] == 1
+    assert not any(store.data["employees"]["b"]["total_counts"].values())
+    store.mark("c", "eod", "01/06/2026")
+    assert list(store.assignments_between()) == ["30/05/2026", "01/06/2026", "09/06/2026"]
+
+def test_search_login_is_oldest_first(store):
+    for date_str in ("03/02/2026", "25/01/2026", "01/02/2026"):
+        store.mark("a", "dor", date_str)
+    store.mark("a", "eod", "25/01/2026")
+    store.mark("b", "dor", "26/01/2026")
+
+    assert store.search_login("a") == [
+        ("25/01/2026", "dor"), ("25/01/2026", "eod"), ("01/02/2026", "dor"), ("03/02/2026", "dor"),
+    ]
+    assert store.search_login("nobody") == []
+
+
+
+def test_mid_sim_swap_reverts_the_old_assignee(store):
+    # The greedy engine's morning fallback: mid SIM is handed to someone else
+    store.mark("a", "sim", "01/06/2026", sim_slot="mid")
+    store.mark("b", "sim", "01/06/2026", sim_slot="morning")
+
+    assert store.unmark("a", "sim", "01/06/2026") is False
+    assert store.data["employees"]["a"]["total_counts"]["sim"] == 1
+
+    assert store.unmark("a", "sim", "01/06/2026", sim_slot="mid") is True
+    store.mark("c", "sim", "01/06/2026", sim_slot="mid")
+
+    record = store.data["employees"]["a"]
+    assert record["total_counts"]["sim"] == 0
+    assert "01/06/2026" not in record["history"]
+    assert store.eligible(["a", "c"], "sim", "02/06/2026") == ["a"]
+    assert store.data["date_assignments"]["01/06/2026"]["sim"]["mid"] == "c"
+
+def test_one_shot_calls_close_the_sqlite_store(tmp_path, monkeypatch):
+    import sqlite3
+
+    import get_eligible_employees
+    import sqlite_store
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_eligible_employees, "STORAGE_ENGINE", "sqlite")
+    connections = []
+    real_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        connections.append(real_connect(*args, **kwargs))
+        return connections[-1]
+
+    monkeypatch.setattr(sqlite_store.sqlite3, "connect", connect)
+
+    get_eligible_employees.mark_employee_assigned("a", "dor", "01/06/2026")
+    assert get_eligible_employees.get_employee_history("a")["total_counts"]["dor"] == 1
+    get_eligible_employees.save_data(get_eligible_employees.load_data())
+    assert get_eligible_employees.get_login_assignments("a") == [("01/06/2026", "dor")]
+
+    assert len(connections) == 5
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")